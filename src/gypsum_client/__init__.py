@@ -19,8 +19,9 @@ finally:
 from ._utils import BUCKET_CACHE_NAME
 from .auth import access_token, set_access_token
 from .cache_directory import cache_directory
-from .clone_operations import clone_version
-from .config import REQUESTS_MOD
+from .cache_operations import cache_usage, is_version_cached, prune_cache
+from .clone_operations import clone_version, open_clone_file
+from .config import CACHE_MOD, DOWNLOAD_MOD, REQUESTS_MOD, UPLOAD_MOD
 from .create_operations import create_project
 from .fetch_metadata_database import fetch_metadata_database
 from .fetch_metadata_schema import fetch_metadata_schema
@@ -32,17 +33,28 @@ from .fetch_operations import (
     fetch_summary,
     fetch_usage,
 )
-from .list_operations import list_assets, list_files, list_projects, list_versions
-from .prepare_directory_for_upload import prepare_directory_upload
+from .list_operations import (
+    invalidate_list_cache,
+    iter_assets,
+    iter_files,
+    iter_projects,
+    iter_versions,
+    list_assets,
+    list_files,
+    list_projects,
+    list_versions,
+)
+from .prepare_directory_for_upload import link_unchanged_files, prepare_directory_upload
 from .probation_operations import approve_probation, reject_probation
 from .refresh_operations import refresh_latest, refresh_usage
 from .remove_operations import remove_asset, remove_project, remove_version
 from .resolve_links import resolve_links
 from .rest_url import rest_url
 from .s3_config import public_s3_config
-from .save_operations import save_file, save_version
+from .save_operations import prefetch, save_file, save_version
 from .search_metadata import define_text_query, search_metadata_text
 from .set_operations import set_permissions, set_quota
+from .sync_operations import sync_version
 from .upload_api_operations import abort_upload, complete_upload, start_upload
-from .upload_file_actions import upload_directory, upload_files
+from .upload_file_actions import resume_upload, upload_directory, upload_files
 from .validate_metadata import validate_metadata
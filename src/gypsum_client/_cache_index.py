@@ -0,0 +1,338 @@
+"""Index of the contents of the cache directory.
+
+Finding out what is in the cache would otherwise require checking for
+files or walking the ``bucket`` and ``status`` directories, which is slow
+on network filesystems. Instead, a SQLite database in the cache directory
+records the files of each saved version, with their sizes and MD5
+checksums, along with the completeness of each version. The database is
+created from the contents of the cache directory on first use, and is then
+updated by the functions that save or remove versions. Only the files of
+each version are indexed; internal files like ``..manifest`` and staged
+downloads are not. Accesses are not recorded here, see the ``ACCESSED``
+marker in :py:mod:`~gypsum_client.cache_operations`.
+
+The index uses SQLite's default rollback journal rather than write-ahead
+logging, which is not safe when the cache directory is on a network
+filesystem shared by several hosts. Several processes can still use it at
+the same time, as lookups only take a shared lock. It is controlled by the
+``index`` key in :py:data:`~gypsum_client.config.CACHE_MOD`. If the
+database cannot be used, callers fall back to inspecting the cache directory.
+"""
+
+import os
+import sqlite3
+import threading
+from typing import Iterable, Optional, Tuple
+
+from ._hash_cache import _transaction
+from ._utils import BUCKET_CACHE_NAME
+from .config import CACHE_MOD
+
+__author__ = "Jayaram Kancherla"
+__copyright__ = "Jayaram Kancherla"
+__license__ = "MIT"
+
+INDEX_CACHE_NAME = "index.sqlite3"
+
+_STAGING_SUFFIXES = (".LOCK", ".tmp", ".partial", ".multipart", ".multipart.done")
+
+# Databases whose schema has already been checked by this process.
+_READY = set()
+_READY_LOCK = threading.Lock()
+
+
+def _is_indexed_file(name: str) -> bool:
+    return not name.startswith("..") and not name.endswith(_STAGING_SUFFIXES)
+
+
+def _index_enabled(cache: Optional[str]) -> bool:
+    return cache is not None and CACHE_MOD["index"]
+
+
+def _connect(cache: str) -> sqlite3.Connection:
+    os.makedirs(cache, exist_ok=True)
+    path = os.path.join(cache, INDEX_CACHE_NAME)
+    conn = sqlite3.connect(path, timeout=60, isolation_level=None)
+
+    try:
+        # Also converts any index that was created with write-ahead logging.
+        conn.execute("PRAGMA journal_mode=DELETE")
+        # The index can be rebuilt, so it need not survive a power loss.
+        conn.execute("PRAGMA synchronous=NORMAL")
+    except sqlite3.DatabaseError:
+        pass
+
+    key = os.path.abspath(path)
+    with _READY_LOCK:
+        ready = key in _READY
+
+    if not ready:
+        try:
+            _create_index(conn, cache)
+        except BaseException:
+            conn.close()
+            raise
+
+        with _READY_LOCK:
+            _READY.add(key)
+
+    return conn
+
+
+def _has_tables(conn: sqlite3.Connection) -> bool:
+    (exists,) = conn.execute(
+        "SELECT COUNT(*) FROM sqlite_master WHERE name = 'versions'"
+    ).fetchone()
+    return exists > 0
+
+
+def _create_index(conn: sqlite3.Connection, cache: str):
+    # Only take the write lock if the tables are missing.
+    if _has_tables(conn):
+        return
+
+    with _transaction(conn):
+        if _has_tables(conn):
+            return
+
+        conn.execute(
+            "CREATE TABLE versions ("
+            "project TEXT, asset TEXT, version TEXT, complete INTEGER DEFAULT 0, "
+            "bytes INTEGER DEFAULT 0, "
+            "PRIMARY KEY (project, asset, version))"
+        )
+        conn.execute(
+            "CREATE TABLE files ("
+            "project TEXT, asset TEXT, version TEXT, path TEXT, "
+            "size INTEGER, md5sum TEXT, "
+            "PRIMARY KEY (project, asset, version, path))"
+        )
+        _populate_index(conn, cache)
+
+
+def _forget_ready(cache: str):
+    # The database was removed or replaced since its schema was checked.
+    with _READY_LOCK:
+        _READY.discard(os.path.abspath(os.path.join(cache, INDEX_CACHE_NAME)))
+
+
+def _populate_index(conn: sqlite3.Connection, cache: str):
+    # Versions that were saved before the index existed.
+    bucket = os.path.join(cache, BUCKET_CACHE_NAME)
+    for root, _, files in os.walk(bucket):
+        parts = os.path.relpath(root, bucket).split(os.sep)
+        if len(parts) < 3:
+            continue
+
+        project, asset, version = parts[:3]
+        prefix = "/".join(parts[3:])
+        rows = []
+        for name in files:
+            if not _is_indexed_file(name):
+                continue
+            try:
+                size = os.path.getsize(os.path.join(root, name))
+            except OSError:
+                continue
+            path = f"{prefix}/{name}" if prefix else name
+            rows.append((project, asset, version, path, size, None))
+
+        conn.executemany("INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?, ?)", rows)
+        if len(parts) == 3:
+            status = os.path.join(cache, "status", project, asset, version)
+            conn.execute(
+                "INSERT OR IGNORE INTO versions (project, asset, version, complete) "
+                "VALUES (?, ?, ?, ?)",
+                (
+                    project,
+                    asset,
+                    version,
+                    int(os.path.exists(os.path.join(status, "COMPLETE"))),
+                ),
+            )
+
+    conn.execute(
+        "UPDATE versions SET bytes = (SELECT COALESCE(SUM(size), 0) FROM files "
+        "WHERE files.project = versions.project AND files.asset = versions.asset "
+        "AND files.version = versions.version)"
+    )
+
+
+def _update(cache: str, fun) -> bool:
+    if not _index_enabled(cache):
+        return False
+
+    try:
+        conn = _connect(cache)
+    except sqlite3.Error:
+        return False
+
+    try:
+        with _transaction(conn):
+            fun(conn)
+        return True
+    except sqlite3.Error:
+        _forget_ready(cache)
+        return False
+    finally:
+        conn.close()
+
+
+def _query(cache: str, sql: str, params: tuple) -> Optional[list]:
+    if not _index_enabled(cache):
+        return None
+
+    try:
+        conn = _connect(cache)
+    except sqlite3.Error:
+        return None
+
+    # Reads run in autocommit mode, so they only take a shared lock.
+    try:
+        return conn.execute(sql, params).fetchall()
+    except sqlite3.Error:
+        _forget_ready(cache)
+        return None
+    finally:
+        conn.close()
+
+
+def _ensure_version(conn: sqlite3.Connection, key: tuple):
+    conn.execute(
+        "INSERT OR IGNORE INTO versions (project, asset, version) VALUES (?, ?, ?)",
+        key,
+    )
+
+
+def _record_files(
+    cache: str,
+    project: str,
+    asset: str,
+    version: str,
+    files: Iterable[Tuple[str, Optional[int], Optional[str]]],
+    complete: bool = False,
+):
+    """Record files of a version in the index.
+
+    Args:
+        cache:
+            Path to the cache directory.
+
+        project:
+            Project name.
+
+        asset:
+            Asset name.
+
+        version:
+            Version name.
+
+        files:
+            Iterable of tuples, each containing the relative path of a file
+            in the version, its size in bytes and its MD5 checksum.
+
+        complete:
+            Whether all files of the version are now in the cache.
+    """
+    key = (project, asset, version)
+    rows = [(*key, path, size, md5sum) for path, size, md5sum in files]
+
+    def fun(conn):
+        _ensure_version(conn, key)
+
+        # The total is updated with the change in size of each file,
+        # rather than summing over all files of the version.
+        delta = 0
+        for row in rows:
+            previous = conn.execute(
+                "SELECT size FROM files "
+                "WHERE project = ? AND asset = ? AND version = ? AND path = ?",
+                row[:4],
+            ).fetchone()
+            if previous is not None:
+                delta -= previous[0] or 0
+            delta += row[4] or 0
+            conn.execute("INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?, ?)", row)
+
+        conn.execute(
+            "UPDATE versions SET bytes = bytes + ? "
+            "WHERE project = ? AND asset = ? AND version = ?",
+            (delta, *key),
+        )
+        if complete:
+            conn.execute(
+                "UPDATE versions SET complete = 1 "
+                "WHERE project = ? AND asset = ? AND version = ?",
+                key,
+            )
+
+    _update(cache, fun)
+
+
+def _record_manifest(
+    cache: str,
+    project: str,
+    asset: str,
+    version: str,
+    manifest: dict,
+    complete: bool = False,
+):
+    _record_files(
+        cache,
+        project,
+        asset,
+        version,
+        (
+            (path, entry.get("size"), entry.get("md5sum"))
+            for path, entry in manifest.items()
+        ),
+        complete=complete,
+    )
+
+
+def _forget_version(cache: str, project: str, asset: str, version: str):
+    key = (project, asset, version)
+
+    def fun(conn):
+        for table in ("files", "versions"):
+            conn.execute(
+                f"DELETE FROM {table} WHERE project = ? AND asset = ? AND version = ?",
+                key,
+            )
+
+    _update(cache, fun)
+
+
+def _indexed_complete(
+    cache: str, project: str, asset: str, version: str
+) -> Optional[bool]:
+    rows = _query(
+        cache,
+        "SELECT complete FROM versions WHERE project = ? AND asset = ? AND version = ?",
+        (project, asset, version),
+    )
+    if not rows:
+        # Versions may also have been saved without updating the index.
+        return None
+    return bool(rows[0][0])
+
+
+def _indexed_usage(
+    cache: str,
+    project: Optional[str] = None,
+    asset: Optional[str] = None,
+    version: Optional[str] = None,
+) -> Optional[int]:
+    clauses = []
+    params = []
+    for name, value in (("project", project), ("asset", asset), ("version", version)):
+        if value is not None:
+            clauses.append(f"{name} = ?")
+            params.append(value)
+
+    sql = "SELECT COALESCE(SUM(bytes), 0) FROM versions"
+    if clauses:
+        sql += " WHERE " + " AND ".join(clauses)
+
+    rows = _query(cache, sql, tuple(params))
+    return None if rows is None else rows[0][0]
@@ -0,0 +1,111 @@
+"""Content-addressed store inside the cache directory.
+
+Files are stored under ``{cache}/objects/{md5[:2]}/{md5}``, keyed by the
+``md5sum`` reported in each version's manifest. The same file often
+appears in many versions of an asset, so a file that is already stored can
+be reflinked (copy-on-write, where supported), hard-linked or copied into
+its destination instead of being downloaded again.
+
+Entries are themselves hard links to downloaded files, so the store costs
+no extra disk space. It is controlled by the ``deduplicate`` key in
+:py:data:`~gypsum_client.config.CACHE_MOD`.
+"""
+
+import os
+import shutil
+import uuid
+from typing import Optional
+
+from .config import CACHE_MOD
+
+__author__ = "Jayaram Kancherla"
+__copyright__ = "Jayaram Kancherla"
+__license__ = "MIT"
+
+OBJECTS_CACHE_NAME = "objects"
+
+# From linux/fs.h, used to create copy-on-write clones on btrfs/XFS.
+_FICLONE = 0x40049409
+
+
+def _store_enabled(cache: Optional[str], md5sum: Optional[str]) -> bool:
+    return cache is not None and md5sum is not None and CACHE_MOD["deduplicate"]
+
+
+def _object_path(cache: str, md5sum: str) -> str:
+    return os.path.join(cache, OBJECTS_CACHE_NAME, md5sum[:2], md5sum)
+
+
+def _reflink(src: str, dest: str):
+    import fcntl
+
+    with open(src, "rb") as fsrc, open(dest, "wb") as fdest:
+        fcntl.ioctl(fdest.fileno(), _FICLONE, fsrc.fileno())
+
+
+def _clone_file(src: str, dest: str):
+    try:
+        _reflink(src, dest)
+        return
+    except Exception:
+        try:
+            os.unlink(dest)
+        except OSError:
+            pass
+
+    try:
+        os.link(src, dest)
+    except Exception:
+        shutil.copy(src, dest)
+
+
+def _restore_from_store(
+    cache: str, md5sum: str, size: Optional[int], destination: str
+) -> bool:
+    obj = _object_path(cache, md5sum)
+
+    try:
+        stored_size = os.path.getsize(obj)
+    except OSError:
+        return False
+
+    if size is not None and stored_size != size:
+        # Cached files may have been modified in place, in which case
+        # the entry is no longer trustworthy.
+        try:
+            os.unlink(obj)
+        except OSError:
+            pass
+        return False
+
+    os.makedirs(os.path.dirname(destination), exist_ok=True)
+    tmp = f"{destination}.{uuid.uuid4().hex}.tmp"
+    try:
+        _clone_file(obj, tmp)
+        os.replace(tmp, destination)
+    except Exception:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        return False
+
+    return True
+
+
+def _add_to_store(cache: str, md5sum: str, path: str):
+    obj = _object_path(cache, md5sum)
+    if os.path.exists(obj):
+        return
+
+    os.makedirs(os.path.dirname(obj), exist_ok=True)
+    tmp = f"{obj}.{uuid.uuid4().hex}.tmp"
+    try:
+        # Only hard links are used here, as a copy would double the disk usage.
+        os.link(path, tmp)
+        os.replace(tmp, obj)
+    except OSError:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
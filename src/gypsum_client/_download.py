@@ -0,0 +1,144 @@
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import List, Optional, Tuple
+
+from ._content_store import _store_enabled
+from ._utils import _restore_download, _save_file
+
+__author__ = "Jayaram Kancherla"
+__copyright__ = "Jayaram Kancherla"
+__license__ = "MIT"
+
+
+def _download_files(
+    tasks: List[Tuple[str, str, Optional[int], Optional[str]]],
+    overwrite: bool,
+    url: str,
+    concurrent: int = 1,
+    executor: Optional[ThreadPoolExecutor] = None,
+    cache: Optional[str] = None,
+    check_md5: bool = False,
+) -> dict:
+    """Download many files from the gypsum bucket.
+
+    Downloads are I/O bound, so they are run in threads that share the
+    pooled HTTP session; connections stay warm across files. Files are
+    scheduled from largest to smallest so that a few large files do not
+    end up running alone at the end.
+
+    Args:
+        tasks:
+            List of tuples, each containing the object key, the destination
+            path, the size of the file in bytes and its MD5 checksum
+            (either of which may be None, if unknown).
+
+        overwrite:
+            Whether to overwrite existing files.
+
+        url:
+            URL to the gypsum compatible API.
+
+        concurrent:
+            Number of concurrent downloads.
+            Ignored if ``executor`` is provided.
+
+        executor:
+            Thread pool to run the downloads. This is not shut down on
+            completion, so that it can be re-used across calls. If None, a
+            thread pool with ``concurrent`` workers is created for this call.
+            Other executors are not supported as the downloads are closures
+            that cannot be sent to another process.
+
+        cache:
+            Path to the cache directory, used to look up files in the
+            content-addressed store. If None, the store is not used.
+
+        check_md5:
+            Whether to verify each download against its MD5 checksum,
+            retrying on a mismatch.
+
+    Returns:
+        Dictionary of throughput statistics, containing ``files``, the number
+        of downloaded files; ``skipped``, the number of files already in the
+        cache; ``deduplicated``, the number of files restored from the
+        content-addressed store; ``bytes``, the number of downloaded bytes; ``elapsed``, the
+        wall time in seconds; and ``throughput``, in bytes per second.
+    """
+    if executor is not None and not isinstance(executor, ThreadPoolExecutor):
+        raise TypeError(
+            "'executor' should be a 'ThreadPoolExecutor', "
+            f"not '{type(executor).__name__}'."
+        )
+
+    ordered = sorted(
+        tasks, key=lambda t: t[2] if t[2] is not None else -1, reverse=True
+    )
+
+    stats = {
+        "files": 0,
+        "skipped": 0,
+        "deduplicated": 0,
+        "bytes": 0,
+        "elapsed": 0.0,
+        "throughput": 0.0,
+    }
+    stats_lock = threading.Lock()
+
+    def _download_one(task):
+        object_key, destination, size, md5sum = task
+        if not overwrite and os.path.exists(destination):
+            with stats_lock:
+                stats["skipped"] += 1
+            return
+
+        if (
+            not overwrite
+            and _store_enabled(cache, md5sum)
+            and _restore_download(cache, md5sum, size, destination)
+        ):
+            with stats_lock:
+                stats["deduplicated"] += 1
+            return
+
+        _save_file(
+            object_key,
+            destination=destination,
+            overwrite=overwrite,
+            url=url,
+            size=size,
+            md5sum=md5sum,
+            cache=cache,
+            check_md5=check_md5,
+        )
+        received = os.path.getsize(destination)
+        with stats_lock:
+            stats["files"] += 1
+            stats["bytes"] += received
+
+    start = time.perf_counter()
+
+    if executor is None and concurrent <= 1:
+        for task in ordered:
+            _download_one(task)
+    else:
+        owned = executor is None
+        if owned:
+            executor = ThreadPoolExecutor(max_workers=concurrent)
+
+        futures = [executor.submit(_download_one, task) for task in ordered]
+        try:
+            for fut in as_completed(futures):
+                fut.result()
+        finally:
+            for fut in futures:
+                fut.cancel()
+            if owned:
+                executor.shutdown(wait=True)
+
+    stats["elapsed"] = time.perf_counter() - start
+    if stats["elapsed"] > 0:
+        stats["throughput"] = stats["bytes"] / stats["elapsed"]
+
+    return stats
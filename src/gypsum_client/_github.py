@@ -2,8 +2,7 @@ import threading
 import webbrowser
 from http.server import BaseHTTPRequestHandler, HTTPServer
 
-import requests
-
+from ._session import _get_session
 from .config import REQUESTS_MOD
 
 __author__ = "Jayaram Kancherla"
@@ -61,7 +60,7 @@ def github_access_token(client_id, client_secret, authorization_url, token_url):
         "client_secret": client_secret,
         "code": AUTH_CODE,
     }
-    token_req = requests.post(
+    token_req = _get_session().post(
         token_url, headers=headers, json=parameters, verify=REQUESTS_MOD["verify"]
     )
 
@@ -0,0 +1,228 @@
+"""On-disk cache of file checksums.
+
+Directories are often uploaded again with only a few changes,
+e.g., when uploading a new version of an asset. Rather than re-hashing
+every file, the MD5 checksum of each file is stored in a SQLite database
+inside the cache directory, keyed by the device, inode, size and
+modification time of the file. A file that has not changed since it
+was last hashed is looked up instead of being read again.
+
+The database uses write-ahead logging so that several processes can read
+and update it at the same time. It is controlled by the ``hash_cache`` and
+``hash_cache_max_entries`` keys in :py:data:`~gypsum_client.config.CACHE_MOD`;
+the least recently used entries are evicted once the database holds more
+than ``hash_cache_max_entries`` files.
+"""
+
+import os
+import sqlite3
+import time
+from contextlib import contextmanager
+from typing import List, Optional, Tuple
+
+from .config import CACHE_MOD
+
+__author__ = "Jayaram Kancherla"
+__copyright__ = "Jayaram Kancherla"
+__license__ = "MIT"
+
+HASH_CACHE_NAME = "hashes.sqlite3"
+
+# Files modified this recently are not cached, as a later modification
+# within the timestamp resolution of the filesystem would go unnoticed.
+_RACY_INTERVAL_NS = 2 * 10**9
+
+# Number of files to look up per query, well within SQLite's default limit
+# of 999 parameters.
+_LOOKUP_BATCH = 400
+
+
+def _hash_cache_enabled(cache: Optional[str]) -> bool:
+    return cache is not None and CACHE_MOD["hash_cache"]
+
+
+def _connect(cache: str) -> sqlite3.Connection:
+    os.makedirs(cache, exist_ok=True)
+    conn = sqlite3.connect(
+        os.path.join(cache, HASH_CACHE_NAME), timeout=60, isolation_level=None
+    )
+
+    try:
+        conn.execute("PRAGMA journal_mode=WAL")
+    except sqlite3.DatabaseError:
+        # Some network filesystems do not support WAL; the default
+        # rollback journal is slower but still safe.
+        pass
+
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS hashes ("
+        "dev INTEGER, ino INTEGER, size INTEGER, mtime_ns INTEGER, "
+        "md5sum TEXT, last_used REAL, PRIMARY KEY (dev, ino))"
+    )
+    conn.execute("CREATE INDEX IF NOT EXISTS hashes_last_used ON hashes (last_used)")
+    # Number of rows in 'hashes', as COUNT(*) has to scan the whole table.
+    conn.execute("CREATE TABLE IF NOT EXISTS hash_count (n INTEGER)")
+    return conn
+
+
+@contextmanager
+def _transaction(conn: sqlite3.Connection):
+    # Taking the write lock upfront avoids deadlocks between processes
+    # that would otherwise both try to upgrade a read lock.
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        yield conn
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+    conn.execute("COMMIT")
+
+
+def _as_int64(x: int) -> int:
+    # SQLite integers are signed, but inode numbers may use all 64 bits.
+    return x - 2**64 if x >= 2**63 else x
+
+
+def _stat_key(info: os.stat_result) -> Tuple[int, int]:
+    return _as_int64(info.st_dev), _as_int64(info.st_ino)
+
+
+def _lookup_hashes(cache: str, infos: List[os.stat_result]) -> List[Optional[str]]:
+    """Look up the checksums of files in the hash cache.
+
+    Args:
+        cache:
+            Path to the cache directory.
+
+        infos:
+            List of ``os.stat`` results for the files of interest.
+
+    Returns:
+        List of the same length as ``infos``, containing the cached MD5
+        checksum of each file, or None if the file is not in the cache
+        or has changed since it was hashed.
+    """
+    found = [None] * len(infos)
+
+    try:
+        conn = _connect(cache)
+    except sqlite3.Error:
+        return found
+
+    try:
+        keys = [_stat_key(info) for info in infos]
+        rows = _select_hashes(conn, keys)
+
+        hits = []
+        for i, (info, key) in enumerate(zip(infos, keys)):
+            row = rows.get(key)
+            if (
+                row is not None
+                and row[0] == info.st_size
+                and row[1] == info.st_mtime_ns
+            ):
+                found[i] = row[2]
+                hits.append(key)
+
+        if hits:
+            now = time.time()
+            with _transaction(conn):
+                conn.executemany(
+                    "UPDATE hashes SET last_used = ? WHERE dev = ? AND ino = ?",
+                    [(now, *key) for key in hits],
+                )
+    except sqlite3.Error:
+        pass
+    finally:
+        conn.close()
+
+    return found
+
+
+def _store_hashes(cache: str, entries: List[Tuple[os.stat_result, str]]):
+    """Store the checksums of files in the hash cache.
+
+    Args:
+        cache:
+            Path to the cache directory.
+
+        entries:
+            List of tuples, each containing the ``os.stat`` result for a
+            file (obtained before it was hashed) and its MD5 checksum.
+    """
+    threshold = time.time_ns() - _RACY_INTERVAL_NS
+    now = time.time()
+    rows = {
+        _stat_key(info): (info.st_size, info.st_mtime_ns, md5sum, now)
+        for info, md5sum in entries
+        if info.st_mtime_ns < threshold
+    }
+    if not rows:
+        return
+
+    try:
+        conn = _connect(cache)
+    except sqlite3.Error:
+        return
+
+    try:
+        with _transaction(conn):
+            existing = _select_hashes(conn, list(rows))
+            count = _count_hashes(conn) + len(rows) - len(existing)
+
+            conn.executemany(
+                "INSERT OR REPLACE INTO hashes "
+                "(dev, ino, size, mtime_ns, md5sum, last_used) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                [(*key, *value) for key, value in rows.items()],
+            )
+            count = _evict_hashes(conn, count, CACHE_MOD["hash_cache_max_entries"])
+            conn.execute("UPDATE hash_count SET n = ?", (count,))
+    except sqlite3.Error:
+        pass
+    finally:
+        conn.close()
+
+
+def _select_hashes(conn: sqlite3.Connection, keys: List[Tuple[int, int]]) -> dict:
+    rows = {}
+    for start in range(0, len(keys), _LOOKUP_BATCH):
+        batch = keys[start : start + _LOOKUP_BATCH]
+        values = ", ".join(["(?, ?)"] * len(batch))
+        # CROSS JOIN keeps SQLite from scanning 'hashes' instead of
+        # searching its primary key for each file.
+        cursor = conn.execute(
+            f"WITH wanted(d, i) AS (VALUES {values}) "
+            "SELECT dev, ino, size, mtime_ns, md5sum "
+            "FROM wanted CROSS JOIN hashes ON dev = wanted.d AND ino = wanted.i",
+            [x for key in batch for x in key],
+        )
+        for dev, ino, size, mtime_ns, md5sum in cursor:
+            rows[(dev, ino)] = (size, mtime_ns, md5sum)
+
+    return rows
+
+
+def _count_hashes(conn: sqlite3.Connection) -> int:
+    row = conn.execute("SELECT n FROM hash_count").fetchone()
+    if row is not None:
+        return row[0]
+
+    # Only counted once, when the database is created or upgraded.
+    (count,) = conn.execute("SELECT COUNT(*) FROM hashes").fetchone()
+    conn.execute("INSERT INTO hash_count (n) VALUES (?)", (count,))
+    return count
+
+
+def _evict_hashes(
+    conn: sqlite3.Connection, count: int, max_entries: Optional[int]
+) -> int:
+    if max_entries is None or count <= max_entries:
+        return count
+
+    cursor = conn.execute(
+        "DELETE FROM hashes WHERE rowid IN "
+        "(SELECT rowid FROM hashes ORDER BY last_used ASC LIMIT ?)",
+        (count - max_entries,),
+    )
+    return count - cursor.rowcount
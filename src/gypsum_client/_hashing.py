@@ -0,0 +1,110 @@
+import hashlib
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional
+
+from ._hash_cache import _hash_cache_enabled, _lookup_hashes, _store_hashes
+
+__author__ = "Jayaram Kancherla"
+__copyright__ = "Jayaram Kancherla"
+__license__ = "MIT"
+
+HASH_CHUNK_SIZE = 1048576
+
+
+def _md5_of_file(path: str, hexdigest: bool = True, chunk_size: int = HASH_CHUNK_SIZE):
+    """Compute the MD5 checksum of a file without loading it into memory.
+
+    Args:
+        path:
+            Path to the file.
+
+        hexdigest:
+            Whether to return the hex-encoded checksum. If False, the
+            hash object is returned so that more data can be added to it.
+
+        chunk_size:
+            Number of bytes to read at a time.
+
+    Returns:
+        The hex-encoded MD5 checksum, or a ``hashlib`` hash object.
+    """
+    with open(path, "rb") as handle:
+        if hasattr(hashlib, "file_digest"):
+            hasher = hashlib.file_digest(handle, "md5")
+        else:
+            hasher = hashlib.md5()
+            buffer = bytearray(chunk_size)
+            view = memoryview(buffer)
+            while True:
+                n = handle.readinto(buffer)
+                if not n:
+                    break
+                hasher.update(view[:n])
+
+    return hasher.hexdigest() if hexdigest else hasher
+
+
+def _md5_of_files(
+    paths: List[str],
+    concurrent: int = 1,
+    cache: Optional[str] = None,
+    infos: Optional[List[os.stat_result]] = None,
+) -> List[str]:
+    """Compute the MD5 checksums of many files.
+
+    ``hashlib`` releases the GIL while hashing large buffers,
+    so files are hashed in parallel threads.
+
+    Args:
+        paths:
+            List of paths to files.
+
+        concurrent:
+            Number of files to hash at the same time.
+
+        cache:
+            Path to the cache directory containing the hash cache.
+            Files that have not changed since they were last hashed are
+            looked up instead. If None, all files are hashed.
+
+        infos:
+            List of ``os.stat`` results for ``paths``, if these are already
+            available, e.g., from a directory scan. Otherwise each file is
+            stat'd to look it up in the hash cache.
+
+    Returns:
+        List of hex-encoded MD5 checksums, in the same order as ``paths``.
+    """
+    if not _hash_cache_enabled(cache):
+        return _hash_all(paths, concurrent)
+
+    if infos is None:
+        infos = [os.stat(p) for p in paths]
+    md5sums = _lookup_hashes(cache, infos)
+
+    missing = [i for i, m in enumerate(md5sums) if m is None]
+    computed = _hash_all([paths[i] for i in missing], concurrent)
+
+    new_entries = []
+    for i, md5sum in zip(missing, computed):
+        md5sums[i] = md5sum
+
+        # Files modified while being hashed are not worth caching.
+        after = os.stat(paths[i])
+        if (after.st_size, after.st_mtime_ns) == (
+            infos[i].st_size,
+            infos[i].st_mtime_ns,
+        ):
+            new_entries.append((infos[i], md5sum))
+
+    _store_hashes(cache, new_entries)
+    return md5sums
+
+
+def _hash_all(paths: List[str], concurrent: int) -> List[str]:
+    if concurrent <= 1 or len(paths) <= 1:
+        return [_md5_of_file(p) for p in paths]
+
+    with ThreadPoolExecutor(max_workers=min(concurrent, len(paths))) as pool:
+        return list(pool.map(_md5_of_file, paths))
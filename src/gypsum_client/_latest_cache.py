@@ -0,0 +1,152 @@
+"""In-memory cache of the latest version of each asset.
+
+:py:func:`~gypsum_client.fetch_operations.fetch_latest` remembers the
+``..latest`` file of each asset along with its ``ETag`` and ``Last-Modified``
+headers. Within ``latest_cache_ttl`` seconds of the last check, the
+remembered version is returned as is. After that, the file is requested
+again with ``If-None-Match`` and ``If-Modified-Since``, so that an
+unchanged file only costs a 304 response without a body.
+
+For up to ``latest_stale_while_revalidate`` seconds after the TTL, the
+remembered version is returned immediately while it is revalidated in a
+background thread. These settings and the maximum number of remembered
+assets, ``latest_cache_max_entries``, are configured in
+:py:data:`~gypsum_client.config.CACHE_MOD`.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from ._utils import _fetch_json, _fetch_json_if_modified
+from .config import CACHE_MOD
+
+__author__ = "Jayaram Kancherla"
+__copyright__ = "Jayaram Kancherla"
+__license__ = "MIT"
+
+_LATEST = OrderedDict()
+_LATEST_LOCK = threading.Lock()
+_REVALIDATING = set()
+
+
+def _fetch_latest_json(project: str, asset: str, url: str) -> dict:
+    """Fetch the ``..latest`` file of an asset, re-using a cached copy
+    where possible.
+
+    Args:
+        project:
+            Project name.
+
+        asset:
+            Asset name.
+
+        url:
+            URL to the gypsum compatible API.
+
+    Returns:
+        Dictionary containing the contents of the ``..latest`` file.
+    """
+    path = f"{project}/{asset}/..latest"
+    if not CACHE_MOD["latest_cache_max_entries"]:
+        return _fetch_json(path, url=url)
+
+    key = (url.rstrip("/"), project, asset)
+    with _LATEST_LOCK:
+        entry = _LATEST.get(key)
+        if entry is not None:
+            _LATEST.move_to_end(key)
+
+    if entry is not None:
+        ttl = CACHE_MOD["latest_cache_ttl"] or 0
+        age = time.monotonic() - entry["checked"]
+        if age <= ttl:
+            return entry["payload"]
+
+        if age <= ttl + (CACHE_MOD["latest_stale_while_revalidate"] or 0):
+            _revalidate_in_background(key, path, url, entry)
+            return entry["payload"]
+
+    return _revalidate(key, path, url, entry)
+
+
+def _revalidate(key: tuple, path: str, url: str, entry: Optional[dict]) -> dict:
+    etag = None
+    last_modified = None
+    if entry is not None:
+        etag = entry["etag"]
+        last_modified = entry["last_modified"]
+
+    payload, etag, last_modified = _fetch_json_if_modified(
+        path, url=url, etag=etag, last_modified=last_modified
+    )
+    if payload is None:
+        payload = entry["payload"]
+
+    max_entries = CACHE_MOD["latest_cache_max_entries"]
+    with _LATEST_LOCK:
+        _LATEST[key] = {
+            "checked": time.monotonic(),
+            "payload": payload,
+            "etag": etag,
+            "last_modified": last_modified,
+        }
+        _LATEST.move_to_end(key)
+        if max_entries:
+            while len(_LATEST) > max_entries:
+                _LATEST.popitem(last=False)
+
+    return payload
+
+
+def _revalidate_in_background(key: tuple, path: str, url: str, entry: dict):
+    with _LATEST_LOCK:
+        if key in _REVALIDATING:
+            return
+        _REVALIDATING.add(key)
+
+    def run():
+        try:
+            _revalidate(key, path, url, entry)
+        except Exception:
+            # The stale copy is kept; the next call after the stale
+            # window revalidates in the foreground and reports errors.
+            pass
+        finally:
+            with _LATEST_LOCK:
+                _REVALIDATING.discard(key)
+
+    threading.Thread(target=run, daemon=True).start()
+
+
+def _forget_latest(
+    url: Optional[str] = None,
+    project: Optional[str] = None,
+    asset: Optional[str] = None,
+):
+    """Drop cached latest versions that may have changed.
+
+    Args:
+        url:
+            URL of the gypsum REST API. If None, entries from all
+            APIs are dropped.
+
+        project:
+            Project name. If None, all entries are dropped.
+
+        asset:
+            Asset name. If None, all entries for ``project`` are dropped.
+    """
+    if url is not None:
+        url = url.rstrip("/")
+
+    with _LATEST_LOCK:
+        for key in list(_LATEST):
+            if url is not None and key[0] != url:
+                continue
+            if project is not None and key[1] != project:
+                continue
+            if asset is not None and key[2] != asset:
+                continue
+            del _LATEST[key]
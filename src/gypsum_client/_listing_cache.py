@@ -0,0 +1,106 @@
+"""In-memory cache of project, asset and version listings.
+
+Listings from :py:func:`~gypsum_client.list_operations.list_projects`,
+:py:func:`~gypsum_client.list_operations.list_assets` and
+:py:func:`~gypsum_client.list_operations.list_versions` are remembered for
+``list_cache_ttl`` seconds, as configured in
+:py:data:`~gypsum_client.config.CACHE_MOD`. At most ``list_cache_max_entries``
+listings are kept, evicting the least recently used.
+
+Functions in this package that modify the backend, e.g.,
+:py:func:`~gypsum_client.remove_operations.remove_asset`, invalidate the
+affected listings. Changes made by other clients are only seen once the
+cached listings expire.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import List, Optional
+
+from .config import CACHE_MOD
+
+__author__ = "Jayaram Kancherla"
+__copyright__ = "Jayaram Kancherla"
+__license__ = "MIT"
+
+_LISTINGS = OrderedDict()
+_LISTINGS_LOCK = threading.Lock()
+
+
+def _listing_key(url: str, prefix: Optional[str], *options) -> tuple:
+    return (url.rstrip("/"), prefix or "", *options)
+
+
+def _get_listing(key: tuple) -> Optional[List[str]]:
+    ttl = CACHE_MOD["list_cache_ttl"]
+    if not ttl:
+        return None
+
+    with _LISTINGS_LOCK:
+        entry = _LISTINGS.get(key)
+        if entry is None:
+            return None
+
+        created, listing = entry
+        if time.monotonic() - created > ttl:
+            del _LISTINGS[key]
+            return None
+
+        _LISTINGS.move_to_end(key)
+
+    # Copied so that callers can modify their results.
+    return list(listing)
+
+
+def _set_listing(key: tuple, listing: List[str]):
+    if not CACHE_MOD["list_cache_ttl"]:
+        return
+
+    max_entries = CACHE_MOD["list_cache_max_entries"]
+    with _LISTINGS_LOCK:
+        _LISTINGS[key] = (time.monotonic(), tuple(listing))
+        _LISTINGS.move_to_end(key)
+        if max_entries is not None:
+            while len(_LISTINGS) > max_entries:
+                _LISTINGS.popitem(last=False)
+
+
+def _invalidate_listings(
+    url: Optional[str] = None,
+    project: Optional[str] = None,
+    asset: Optional[str] = None,
+):
+    """Drop cached listings that are affected by a change in the backend.
+
+    Args:
+        url:
+            URL of the gypsum REST API. If None, listings from all
+            APIs are dropped.
+
+        project:
+            Project that was modified. If None, all listings are dropped.
+
+        asset:
+            Asset that was modified. If None, all listings for
+            ``project`` are dropped.
+    """
+    if url is not None:
+        url = url.rstrip("/")
+
+    changed = ""
+    if project is not None:
+        changed = f"{project}/"
+        if asset is not None:
+            changed += f"{asset}/"
+
+    with _LISTINGS_LOCK:
+        for key in list(_LISTINGS):
+            if url is not None and key[0] != url:
+                continue
+
+            # Listings of the parents of the modified path are affected,
+            # as well as any listings inside it.
+            prefix = key[1]
+            if changed.startswith(prefix) or prefix.startswith(changed):
+                del _LISTINGS[key]
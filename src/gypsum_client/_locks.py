@@ -0,0 +1,100 @@
+"""Locks on versions in the cache directory.
+
+While a version is being saved, a lock file in the ``status`` directory of
+the cache prevents other processes from modifying the same version.
+Within a process, the lock is shared: it is taken by the first caller and
+released once the last caller is done, so that nested calls (e.g.,
+:py:func:`~gypsum_client.resolve_links.resolve_links` within
+:py:func:`~gypsum_client.save_operations.save_version`) and concurrent
+threads do not block each other. Individual files are still protected by
+their own locks in :py:func:`~gypsum_client._utils._save_file`.
+
+Locks are only registered while they are in use, so the registry does not
+grow with the number of versions that have been saved.
+"""
+
+import os
+import threading
+from contextlib import contextmanager
+
+from filelock import FileLock
+
+__author__ = "Jayaram Kancherla"
+__copyright__ = "Jayaram Kancherla"
+__license__ = "MIT"
+
+_REGISTRY = {}
+_REGISTRY_LOCK = threading.Lock()
+
+
+class _SharedLock:
+    def __init__(self, path: str):
+        self.path = path
+        self.gate = threading.Lock()
+        self.users = 0
+        self.holders = 0
+        self.file_lock = None
+
+    def acquire(self):
+        with self.gate:
+            if self.holders == 0:
+                if self.file_lock is None:
+                    os.makedirs(os.path.dirname(self.path), exist_ok=True)
+                    self.file_lock = _file_lock(self.path)
+                self.file_lock.acquire()
+            self.holders += 1
+
+    def release(self):
+        with self.gate:
+            self.holders -= 1
+            if self.holders == 0:
+                self.file_lock.release()
+
+
+def _file_lock(path: str) -> FileLock:
+    # The last thread to leave may not be the one that took the lock.
+    try:
+        return FileLock(path, thread_local=False)
+    except TypeError:
+        # Older versions of filelock are never thread-local.
+        return FileLock(path)
+
+
+@contextmanager
+def _version_lock(cache: str, project: str, asset: str, version: str):
+    """Lock a version in the cache directory for the duration of a block.
+
+    Args:
+        cache:
+            Path to the cache directory.
+
+        project:
+            Project name.
+
+        asset:
+            Asset name.
+
+        version:
+            Version name.
+    """
+    path = os.path.join(cache, "status", project, asset, version) + ".LOCK"
+    key = os.path.abspath(path)
+
+    with _REGISTRY_LOCK:
+        lock = _REGISTRY.get(key)
+        if lock is None:
+            lock = _SharedLock(path)
+            _REGISTRY[key] = lock
+        lock.users += 1
+
+    try:
+        lock.acquire()
+        try:
+            yield
+        finally:
+            lock.release()
+    finally:
+        with _REGISTRY_LOCK:
+            lock.users -= 1
+            if lock.users == 0:
+                del _REGISTRY[key]
@@ -0,0 +1,104 @@
+"""In-memory cache of parsed manifests.
+
+The manifest of a version never changes once it has been uploaded, so
+:py:func:`~gypsum_client.fetch_operations.fetch_manifest` keeps the parsed
+manifests of the ``manifest_cache_max_entries`` most recently used versions,
+as configured in :py:data:`~gypsum_client.config.CACHE_MOD`. Repeated calls
+for the same version then return the same dictionary without reading or
+parsing the manifest again.
+
+Checking whether each version is on probation would cost an extra request.
+Instead, the manifests of versions that are known to be on probation are
+not kept, i.e., those whose summary was fetched by
+:py:func:`~gypsum_client.fetch_operations.fetch_summary` or that were
+uploaded with ``probation=True`` by this process. Kept manifests are also
+forgotten when their version is approved, rejected or removed through this
+package, as the version name may be re-used by a later upload.
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+from .config import CACHE_MOD
+
+__author__ = "Jayaram Kancherla"
+__copyright__ = "Jayaram Kancherla"
+__license__ = "MIT"
+
+_MANIFESTS = OrderedDict()
+_MANIFESTS_LOCK = threading.Lock()
+_PROBATIONAL = set()
+
+
+def _manifest_key(url: str, project: str, asset: str, version: str) -> tuple:
+    return (url.rstrip("/"), project, asset, version)
+
+
+def _get_manifest(key: tuple) -> Optional[dict]:
+    if not CACHE_MOD["manifest_cache_max_entries"]:
+        return None
+
+    with _MANIFESTS_LOCK:
+        manifest = _MANIFESTS.get(key)
+        if manifest is not None:
+            _MANIFESTS.move_to_end(key)
+        return manifest
+
+
+def _set_manifest(key: tuple, manifest: dict):
+    max_entries = CACHE_MOD["manifest_cache_max_entries"]
+    if not max_entries:
+        return
+
+    with _MANIFESTS_LOCK:
+        if key in _PROBATIONAL:
+            return
+        _MANIFESTS[key] = manifest
+        _MANIFESTS.move_to_end(key)
+        while len(_MANIFESTS) > max_entries:
+            _MANIFESTS.popitem(last=False)
+
+
+def _set_probation(key: tuple, on_probation: bool):
+    with _MANIFESTS_LOCK:
+        if on_probation:
+            _PROBATIONAL.add(key)
+            _MANIFESTS.pop(key, None)
+        else:
+            _PROBATIONAL.discard(key)
+
+
+def _forget_manifests(
+    url: Optional[str] = None,
+    project: Optional[str] = None,
+    asset: Optional[str] = None,
+    version: Optional[str] = None,
+):
+    """Drop cached manifests for versions that were modified or removed.
+
+    Args:
+        url:
+            URL of the gypsum REST API. If None, manifests from all
+            APIs are dropped.
+
+        project:
+            Project name. If None, all manifests are dropped.
+
+        asset:
+            Asset name. If None, all manifests for ``project`` are dropped.
+
+        version:
+            Version name. If None, all manifests for ``asset`` are dropped.
+    """
+    if url is not None:
+        url = url.rstrip("/")
+
+    wanted = (project, asset, version)
+    with _MANIFESTS_LOCK:
+        for key in list(_MANIFESTS) + list(_PROBATIONAL):
+            if url is not None and key[0] != url:
+                continue
+            if all(w is None or w == k for w, k in zip(wanted, key[1:])):
+                _MANIFESTS.pop(key, None)
+                _PROBATIONAL.discard(key)
@@ -0,0 +1,103 @@
+import os
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from .config import REQUESTS_MOD
+
+__author__ = "Jayaram Kancherla"
+__copyright__ = "Jayaram Kancherla"
+__license__ = "MIT"
+
+# Fallbacks for any pool setting missing from REQUESTS_MOD.
+_SESSION_DEFAULTS = {
+    "verify": True,
+    "pool_connections": 10,
+    "pool_maxsize": 10,
+    "pool_block": False,
+    "keep_alive": True,
+}
+_SESSION_KEYS = tuple(_SESSION_DEFAULTS)
+
+_SESSION_LOCK = threading.Lock()
+SESSION = {"session": None, "pid": None, "signature": None}
+
+
+def _session_signature() -> tuple:
+    return tuple(REQUESTS_MOD.get(k) for k in _SESSION_KEYS)
+
+
+def _setting(key: str):
+    return REQUESTS_MOD.get(key, _SESSION_DEFAULTS[key])
+
+
+def _create_session() -> requests.Session:
+    session = requests.Session()
+
+    adapter = HTTPAdapter(
+        pool_connections=_setting("pool_connections"),
+        pool_maxsize=_setting("pool_maxsize"),
+        pool_block=_setting("pool_block"),
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+
+    session.verify = _setting("verify")
+    if _setting("keep_alive") is False:
+        session.headers["Connection"] = "close"
+
+    return session
+
+
+def _get_session() -> requests.Session:
+    """Get the pooled HTTP session shared by all requests in this process.
+
+    The session is created on first use and re-created whenever the
+    pool settings in :py:data:`~gypsum_client.config.REQUESTS_MOD` change.
+    It is safe to share across threads as the underlying connection
+    pools are thread-safe; a forked child process always gets its own
+    session so that sockets are never shared with the parent.
+
+    Returns:
+        A ``requests.Session`` with a configured connection pool.
+    """
+    pid = os.getpid()
+    signature = _session_signature()
+
+    current = SESSION["session"]
+    if (
+        current is not None
+        and SESSION["pid"] == pid
+        and SESSION["signature"] == signature
+    ):
+        return current
+
+    with _SESSION_LOCK:
+        if (
+            SESSION["session"] is None
+            or SESSION["pid"] != pid
+            or SESSION["signature"] != signature
+        ):
+            # Stale sessions are not closed here, as other threads may still
+            # be streaming from them; they are cleaned up once unreferenced.
+            SESSION["session"] = _create_session()
+            SESSION["pid"] = pid
+            SESSION["signature"] = signature
+
+        return SESSION["session"]
+
+
+def _reset_session():
+    global _SESSION_LOCK
+
+    # A lock held by another thread at fork time would never be released
+    # in the child, so a fresh one is created instead.
+    _SESSION_LOCK = threading.Lock()
+    SESSION["session"] = None
+    SESSION["pid"] = None
+    SESSION["signature"] = None
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_session)
@@ -0,0 +1,128 @@
+"""Upload sessions persisted in the cache directory.
+
+Each session started by :py:func:`~gypsum_client.upload_api_operations.start_upload`
+with ``resumable=True`` is recorded under ``{cache}/uploads``, along with a journal of the files that
+have been uploaded so far. If the process is killed midway, the upload can be
+picked up by :py:func:`~gypsum_client.upload_file_actions.resume_upload`,
+which only uploads the files that are still missing. Records are removed once
+the session is completed or aborted.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+import uuid
+from typing import List, Optional, Set
+
+__author__ = "Jayaram Kancherla"
+__copyright__ = "Jayaram Kancherla"
+__license__ = "MIT"
+
+UPLOADS_CACHE_NAME = "uploads"
+
+_JOURNAL_LOCK = threading.Lock()
+
+
+def _session_path(cache: str, init: dict) -> str:
+    # The session token is a credential, so it is not used as a file name.
+    key = hashlib.sha256(init["session_token"].encode()).hexdigest()[:32]
+    return os.path.join(cache, UPLOADS_CACHE_NAME, key + ".json")
+
+
+def _journal_path(record_path: str) -> str:
+    return record_path[: -len(".json")] + ".done"
+
+
+def _save_session(
+    cache: str,
+    init: dict,
+    project: str,
+    asset: str,
+    version: str,
+    url: str,
+    directory: Optional[str],
+):
+    path = _session_path(cache, init)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    record = {
+        "project": project,
+        "asset": asset,
+        "version": version,
+        "url": url,
+        "directory": os.path.abspath(directory if directory is not None else "."),
+        "created": time.time(),
+        "init": init,
+    }
+
+    tmp = f"{path}.{uuid.uuid4().hex}.tmp"
+    fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    with os.fdopen(fd, "w") as handle:
+        json.dump(record, handle)
+    os.replace(tmp, path)
+
+
+def _mark_uploaded(cache: str, init: dict, file_path: str):
+    record_path = _session_path(cache, init)
+    if not os.path.exists(record_path):
+        return
+
+    with _JOURNAL_LOCK:
+        with open(_journal_path(record_path), "a") as handle:
+            handle.write(json.dumps(file_path) + "\n")
+            handle.flush()
+            os.fsync(handle.fileno())
+
+
+def _uploaded_files(record_path: str) -> Set[str]:
+    done = set()
+    try:
+        with open(_journal_path(record_path), "r") as handle:
+            for line in handle:
+                try:
+                    done.add(json.loads(line))
+                except ValueError:
+                    # The last line may have been cut short by an interruption.
+                    pass
+    except OSError:
+        pass
+
+    return done
+
+
+def _find_sessions(cache: str, project: str, asset: str, version: str) -> List[str]:
+    directory = os.path.join(cache, UPLOADS_CACHE_NAME)
+    if not os.path.isdir(directory):
+        return []
+
+    found = []
+    for name in os.listdir(directory):
+        if not name.endswith(".json"):
+            continue
+
+        path = os.path.join(directory, name)
+        try:
+            with open(path, "r") as handle:
+                record = json.load(handle)
+        except (OSError, ValueError):
+            continue
+
+        if (record["project"], record["asset"], record["version"]) == (
+            project,
+            asset,
+            version,
+        ):
+            found.append((record["created"], path))
+
+    return [path for _, path in sorted(found, reverse=True)]
+
+
+def _remove_session(cache: str, init: dict):
+    record_path = _session_path(cache, init)
+    for path in (record_path, _journal_path(record_path)):
+        try:
+            os.unlink(path)
+        except OSError:
+            pass
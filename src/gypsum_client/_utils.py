@@ -1,16 +1,25 @@
+import codecs
+import ctypes
+import hashlib
 import json
 import os
 import re
 import shutil
+import sys
 import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
-from typing import Optional
+from typing import Any, Iterable, Iterator, Optional
 from urllib.parse import quote_plus
 
-import requests
 from filelock import FileLock
 
-from .config import REQUESTS_MOD
+from ._content_store import _add_to_store, _restore_from_store, _store_enabled
+from ._hashing import _md5_of_file
+from ._listing_cache import _get_listing, _listing_key, _set_listing
+from ._session import _get_session
+from .config import DOWNLOAD_MOD, REQUESTS_MOD
 
 __author__ = "Jayaram Kancherla"
 __copyright__ = "Jayaram Kancherla"
@@ -31,13 +40,18 @@ def _list_for_prefix(
     include_dot: bool = False,
     only_dirs: bool = True,
 ):
+    key = _listing_key(url, prefix, recursive, include_dot, only_dirs)
+    cached = _get_listing(key)
+    if cached is not None:
+        return cached
+
     url = url + "/list"
 
     qparams = {"recursive": "true" if recursive is True else "false"}
     if prefix is not None:
         qparams["prefix"] = prefix
 
-    req = requests.get(url, params=qparams, verify=REQUESTS_MOD["verify"])
+    req = _get_session().get(url, params=qparams, verify=REQUESTS_MOD["verify"])
     try:
         req.raise_for_status()
     except Exception as e:
@@ -45,23 +59,187 @@ def _list_for_prefix(
             f"Failed to access files from API, {req.status_code} and reason: {req.text}"
         ) from e
 
-    resp = req.json()
-    if only_dirs is True:
-        resp = [val for val in resp if val.endswith("/")]
+    listing = _trim_listing(
+        req.json(), prefix=prefix, include_dot=include_dot, only_dirs=only_dirs
+    )
+    _set_listing(key, listing)
+    return listing
+
+
+def _trim_listing(resp: list, prefix: str, include_dot: bool, only_dirs: bool):
+    return list(
+        _filter_listing(
+            resp, prefix=prefix, include_dot=include_dot, only_dirs=only_dirs
+        )
+    )
+
+
+def _filter_listing(
+    resp: Iterable[str], prefix: str, include_dot: bool, only_dirs: bool
+) -> Iterator[str]:
+    for val in resp:
+        if only_dirs is True and not val.endswith("/"):
+            continue
+
+        if prefix is not None:
+            if not val.startswith(prefix):
+                continue
+            val = val.replace(prefix, "")
+
+        if include_dot is False:
+            if val.startswith(".."):
+                continue
+            val = _remove_slash_url(val)
+
+        yield val
+
+
+def _iter_for_prefix(
+    prefix: str,
+    url: str,
+    recursive: bool = False,
+    include_dot: bool = False,
+    only_dirs: bool = True,
+) -> Iterator[str]:
+    url = url + "/list"
 
+    qparams = {"recursive": "true" if recursive is True else "false"}
     if prefix is not None:
-        resp = [val.replace(prefix, "") for val in resp if val.startswith(prefix)]
+        qparams["prefix"] = prefix
+
+    yield from _filter_listing(
+        _stream_listing(url, qparams),
+        prefix=prefix,
+        include_dot=include_dot,
+        only_dirs=only_dirs,
+    )
+
+
+def _stream_listing(url: str, qparams: dict) -> Iterator[str]:
+    req = _get_session().get(
+        url, params=qparams, stream=True, verify=REQUESTS_MOD["verify"]
+    )
+
+    # Closing the response returns the connection to the pool,
+    # even if the caller stops iterating early.
+    with req:
+        try:
+            req.raise_for_status()
+        except Exception as e:
+            raise Exception(
+                f"Failed to access files from API, {req.status_code} and reason: {req.text}"
+            ) from e
+
+        yield from _iter_json_array(req.iter_content(chunk_size=65536))
+
+
+_WHITESPACE = re.compile(r"\s*")
+
 
-    if include_dot is False:
-        resp = [_remove_slash_url(val) for val in resp if not val.startswith("..")]
+def _iter_json_array(chunks: Iterable[bytes]) -> Iterator[Any]:
+    """Parse a JSON array incrementally.
 
-    return resp
+    Elements are yielded as soon as they are complete, so the full
+    array never needs to be held in memory.
+
+    Args:
+        chunks:
+            Iterable of bytes containing a UTF-8 encoded JSON array.
+
+    Returns:
+        Iterator over the elements of the array.
+    """
+    decoder = json.JSONDecoder()
+    text = codecs.getincrementaldecoder("utf-8")()
+
+    buffer = ""
+    started = False
+    for chunk in chunks:
+        buffer += text.decode(chunk)
+        pos = 0
+
+        while True:
+            pos = _WHITESPACE.match(buffer, pos).end()
+            if pos >= len(buffer):
+                break
+
+            if not started:
+                if buffer[pos] != "[":
+                    raise ValueError("expected a JSON array in the listing")
+                started = True
+                pos += 1
+                continue
+
+            if buffer[pos] == "]":
+                return
+            if buffer[pos] == ",":
+                pos += 1
+                continue
+
+            try:
+                value, end = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                break
+
+            # An element is only complete once the next token has arrived,
+            # otherwise a number may have been cut short by the chunking.
+            if _WHITESPACE.match(buffer, end).end() >= len(buffer):
+                break
+
+            yield value
+            pos = end
+
+        buffer = buffer[pos:]
+
+    raise ValueError("truncated JSON array in the listing")
 
 
 def _fetch_json(path: str, url: str):
+    return _request_json(path, url=url).json()
+
+
+def _fetch_json_if_modified(
+    path: str, url: str, etag: Optional[str], last_modified: Optional[str]
+) -> tuple:
+    """Fetch a JSON file unless it matches a previously fetched copy.
+
+    Args:
+        path:
+            Path to the file in the bucket.
+
+        url:
+            URL to the gypsum compatible API.
+
+        etag:
+            ``ETag`` of the previously fetched copy, if any.
+
+        last_modified:
+            ``Last-Modified`` time of the previously fetched copy, if any.
+
+    Returns:
+        Tuple containing the parsed file, or None if it is unchanged from
+        the previous copy; and the ``ETag`` and ``Last-Modified`` headers
+        of the response, to be used in the next call.
+    """
+    headers = {}
+    if etag is not None:
+        headers["If-None-Match"] = etag
+    if last_modified is not None:
+        headers["If-Modified-Since"] = last_modified
+
+    req = _request_json(path, url=url, headers=headers)
+    payload = None if req.status_code == 304 else req.json()
+    return (
+        payload,
+        req.headers.get("ETag", etag),
+        req.headers.get("Last-Modified", last_modified),
+    )
+
+
+def _request_json(path: str, url: str, headers: Optional[dict] = None):
     full_url = f"{url}/file/{quote_plus(path)}"
 
-    req = requests.get(full_url, verify=REQUESTS_MOD["verify"])
+    req = _get_session().get(full_url, headers=headers, verify=REQUESTS_MOD["verify"])
     try:
         req.raise_for_status()
     except Exception as e:
@@ -69,7 +247,7 @@ def _fetch_json(path: str, url: str):
             f"Failed to access json from API, {req.status_code} and reason: {req.text}"
         ) from e
 
-    return req.json()
+    return req
 
 
 BUCKET_CACHE_NAME = "bucket"
@@ -99,6 +277,32 @@ def _fetch_cacheable_json(
             return json.load(jf)
 
 
+DOWNLOAD_ATTEMPTS = 3
+
+
+class _DownloadError(Exception):
+    def __init__(self, message: str, retryable: bool = True):
+        super().__init__(message)
+        self.retryable = retryable
+
+
+class _RangesNotSupported(Exception):
+    pass
+
+
+def _raise_for_download_status(req):
+    if req.status_code == 416:
+        raise _DownloadError("requested range of the file is not satisfiable")
+
+    try:
+        req.raise_for_status()
+    except Exception as e:
+        raise _DownloadError(
+            f"Failed to save file from API, {req.status_code} and reason: {req.text}",
+            retryable=req.status_code >= 500 or req.status_code in (408, 429),
+        ) from e
+
+
 def _save_file(
     path: str,
     destination: str,
@@ -106,43 +310,360 @@ def _save_file(
     url: str,
     error: bool = True,
     verify: Optional[bool] = None,
+    size: Optional[int] = None,
+    md5sum: Optional[str] = None,
+    cache: Optional[str] = None,
+    check_md5: bool = False,
 ):
     if overwrite is True or not os.path.exists(destination):
+        use_store = _store_enabled(cache, md5sum)
+        if (
+            use_store
+            and not overwrite
+            and _restore_download(cache, md5sum, size, destination)
+        ):
+            return True
+
         os.makedirs(os.path.dirname(destination), exist_ok=True)
 
+        full_url = f"{url}/file/{quote_plus(path)}"
+        if verify is None:
+            verify = REQUESTS_MOD["verify"]
+
+        # Downloads can only be resumed if we know the expected size.
+        resumable = size is not None
+        check_md5 = check_md5 and md5sum is not None
+        attempts = DOWNLOAD_ATTEMPTS if resumable or check_md5 else 1
+
+        multipart = _use_multipart(size)
+        partial = destination + ".partial"
+        staged = destination + ".multipart" if multipart else partial
+
         _lock = FileLock(destination + ".LOCK")
         with _lock:
-            with tempfile.NamedTemporaryFile(
-                dir=os.path.dirname(destination), delete=False
-            ) as tmp_file:
-                try:
-                    full_url = f"{url}/file/{quote_plus(path)}"
+            # Another process may have saved the file while we were waiting.
+            if not overwrite and os.path.exists(destination):
+                return True
 
-                    if verify is None:
-                        verify = REQUESTS_MOD["verify"]
+            if overwrite or not resumable:
+                _discard_staged(partial)
+                _discard_staged(destination + ".multipart")
 
-                    req = requests.get(full_url, stream=True, verify=verify)
-                    try:
-                        req.raise_for_status()
-                    except Exception as e:
-                        raise Exception(
-                            f"Failed to save file from API, {req.status_code} and reason: {req.text}"
-                        ) from e
-
-                    for chunk in req.iter_content(chunk_size=None):
-                        tmp_file.write(chunk)
+            for attempt in range(attempts):
+                last = attempt + 1 == attempts
+
+                try:
+                    if multipart:
+                        try:
+                            digest = _download_in_parts(
+                                full_url,
+                                staged,
+                                size=size,
+                                verify=verify,
+                                check_md5=check_md5,
+                            )
+                        except _RangesNotSupported:
+                            _discard_staged(staged)
+                            multipart = False
+                            staged = partial
+
+                    if not multipart:
+                        digest = _download_to_partial(
+                            full_url,
+                            partial,
+                            size=size,
+                            verify=verify,
+                            check_md5=check_md5,
+                        )
                 except Exception as e:
+                    retryable = getattr(e, "retryable", True)
+                    if retryable and not last:
+                        continue
+
+                    # Partial files of resumable downloads are kept for the next call.
+                    if not resumable:
+                        _discard_staged(staged)
+
                     if error:
                         raise Exception(f"Failed to save '{path}'; {str(e)}.") from e
                     else:
                         return False
 
-                # Rename the temporary file to the destination
-                shutil.move(tmp_file.name, destination)
+                if size is not None and os.path.getsize(staged) != size:
+                    problem = "size mismatch"
+                elif check_md5 and digest != md5sum:
+                    problem = "MD5 checksum mismatch"
+                else:
+                    # Rename the partial file to the destination
+                    shutil.move(staged, destination)
+                    break
+
+                _discard_staged(staged)
+                if not last:
+                    continue
+
+                # Raised even if 'error=False', which is only meant to let
+                # callers fall back to links when a file is missing.
+                raise Exception(
+                    f"Failed to save '{path}'; {problem} after {attempts} attempts."
+                )
+
+            # Unverified files might not match their checksum in the store.
+            if use_store and check_md5:
+                _add_to_store(cache, md5sum, destination)
+
+    return True
+
+
+def _restore_download(
+    cache: str, md5sum: str, size: Optional[int], destination: str
+) -> bool:
+    """Restore a file from the content store, discarding any staged files
+    from an interrupted download of the same file.
+
+    Args:
+        cache:
+            Path to the cache directory.
+
+        md5sum:
+            MD5 checksum of the file.
+
+        size:
+            Expected size of the file in bytes, if known.
+
+        destination:
+            Path to the file in the cache.
+
+    Returns:
+        True if the file was restored from the store.
+    """
+    os.makedirs(os.path.dirname(destination), exist_ok=True)
+    with FileLock(destination + ".LOCK"):
+        if not _restore_from_store(cache, md5sum, size, destination):
+            return False
+
+        # Otherwise, the partial file would never be resumed or removed.
+        _discard_staged(destination + ".partial")
+        _discard_staged(destination + ".multipart")
 
     return True
 
 
+def _download_to_partial(
+    full_url: str,
+    partial: str,
+    size: Optional[int],
+    verify: bool,
+    check_md5: bool,
+) -> Optional[str]:
+    offset = 0
+    if size is not None and os.path.exists(partial):
+        offset = os.path.getsize(partial)
+        if offset > size:
+            offset = 0
+
+    if offset > 0 and offset == size:
+        # A previous call got all the bytes but did not get to the rename.
+        return _md5_of_file(partial) if check_md5 else None
+
+    headers = {}
+    if offset > 0:
+        headers["Range"] = f"bytes={offset}-"
+
+    # Closing the response returns the connection to the pool, even on errors.
+    with _get_session().get(
+        full_url, stream=True, verify=verify, headers=headers
+    ) as req:
+        if req.status_code == 416:
+            _remove_quietly(partial)
+
+        _raise_for_download_status(req)
+
+        if offset > 0 and req.status_code != 206:
+            # Server ignored the range request, so we start from scratch.
+            offset = 0
+
+        hasher = None
+        if check_md5:
+            hasher = (
+                _md5_of_file(partial, hexdigest=False) if offset > 0 else hashlib.md5()
+            )
+
+        with open(partial, "ab" if offset > 0 else "wb") as handle:
+            if offset == 0 and size is not None:
+                _preallocate_file(handle, size)
+
+            try:
+                # Hashing while streaming avoids re-reading the file from disk to verify it.
+                for chunk in req.iter_content(chunk_size=None):
+                    handle.write(chunk)
+                    if hasher is not None:
+                        hasher.update(chunk)
+            finally:
+                # Drop any reserved space beyond the received bytes.
+                handle.truncate()
+
+    return hasher.hexdigest() if hasher is not None else None
+
+
+def _use_multipart(size: Optional[int]) -> bool:
+    return (
+        size is not None
+        and hasattr(os, "pwrite")
+        and DOWNLOAD_MOD["part_concurrency"] > 1
+        and size >= DOWNLOAD_MOD["multipart_threshold"]
+    )
+
+
+def _download_in_parts(
+    full_url: str,
+    staged: str,
+    size: int,
+    verify: bool,
+    check_md5: bool,
+) -> Optional[str]:
+    part_size = max(int(DOWNLOAD_MOD["part_size"]), 1)
+    ranges = [
+        (start, min(start + part_size, size)) for start in range(0, size, part_size)
+    ]
+
+    # The journal records completed parts, so that an interrupted
+    # download only fetches the missing parts on the next attempt.
+    journal = staged + ".done"
+    done = _read_part_journal(staged, journal, size, part_size)
+    if done is None:
+        done = set()
+        with open(staged, "wb") as handle:
+            _preallocate_file(handle, size)
+            handle.truncate(size)
+        with open(journal, "w") as handle:
+            handle.write(f"{size} {part_size}\n")
+
+    pending = [i for i in range(len(ranges)) if i not in done]
+    journal_lock = threading.Lock()
+
+    fd = os.open(staged, os.O_WRONLY)
+    try:
+        with open(journal, "a") as jhandle:
+
+            def _fetch_part(index):
+                start, end = ranges[index]
+                _download_range(full_url, fd, start, end, verify)
+                with journal_lock:
+                    jhandle.write(f"{index}\n")
+                    jhandle.flush()
+
+            workers = min(len(pending), DOWNLOAD_MOD["part_concurrency"])
+            if workers <= 1:
+                for index in pending:
+                    _fetch_part(index)
+            else:
+                with ThreadPoolExecutor(max_workers=workers) as pool:
+                    futures = [pool.submit(_fetch_part, i) for i in pending]
+                    try:
+                        for fut in as_completed(futures):
+                            fut.result()
+                    finally:
+                        for fut in futures:
+                            fut.cancel()
+    finally:
+        os.close(fd)
+
+    _remove_quietly(journal)
+    return _md5_of_file(staged) if check_md5 else None
+
+
+def _download_range(full_url: str, fd: int, start: int, end: int, verify: bool):
+    with _get_session().get(
+        full_url,
+        stream=True,
+        verify=verify,
+        headers={"Range": f"bytes={start}-{end - 1}"},
+    ) as req:
+        _raise_for_download_status(req)
+        if req.status_code != 206:
+            raise _RangesNotSupported()
+
+        offset = start
+        for chunk in req.iter_content(chunk_size=1048576):
+            view = memoryview(chunk)
+            while view:
+                written = os.pwrite(fd, view, offset)
+                view = view[written:]
+                offset += written
+
+    if offset != end:
+        raise _DownloadError(
+            f"received {offset - start} of {end - start} bytes for range {start}-{end - 1}"
+        )
+
+
+def _read_part_journal(
+    staged: str, journal: str, size: int, part_size: int
+) -> Optional[set]:
+    try:
+        if os.path.getsize(staged) != size:
+            return None
+        with open(journal, "r") as handle:
+            lines = handle.read().split("\n")
+    except OSError:
+        return None
+
+    if lines[0] != f"{size} {part_size}":
+        return None
+
+    # The last line may have been cut short by an interruption.
+    return set(int(x) for x in lines[1:] if x.isdigit())
+
+
+def _discard_staged(staged: str):
+    _remove_quietly(staged)
+    _remove_quietly(staged + ".done")
+
+
+def _remove_quietly(path: str):
+    try:
+        os.unlink(path)
+    except OSError:
+        pass
+
+
+_FALLOC_FL_KEEP_SIZE = 1
+
+
+def _preallocate_file(handle, size: int):
+    # Reserves disk space without changing the apparent size of the file,
+    # so that the size of a partial file always reflects the received bytes.
+    if size <= 0 or not sys.platform.startswith("linux"):
+        return
+
+    try:
+        libc = ctypes.CDLL(None, use_errno=True)
+        fallocate = libc.fallocate
+        fallocate.argtypes = [
+            ctypes.c_int,
+            ctypes.c_int,
+            ctypes.c_longlong,
+            ctypes.c_longlong,
+        ]
+        handle.flush()
+        fallocate(handle.fileno(), _FALLOC_FL_KEEP_SIZE, 0, size)
+    except Exception:
+        # Not all filesystems support pre-allocation, in which case
+        # the file just grows as the chunks are written.
+        pass
+
+
+def _link_or_copy(src: str, dest: str):
+    try:
+        os.link(src, dest)
+    except Exception:
+        try:
+            os.symlink(src, dest)
+        except Exception:
+            shutil.copy(src, dest)
+
+
 def _cast_datetime(x):
     # Remove fractional seconds.
     if "." in x:
@@ -170,7 +691,7 @@ def _rename_file(src: str, dest: str):
 
 def _download_and_rename_file(url: str, dest: str):
     tmp = tempfile.NamedTemporaryFile(dir=os.path.dirname(dest), delete=False).name
-    req = requests.get(url, stream=True, verify=REQUESTS_MOD["verify"])
+    req = _get_session().get(url, stream=True, verify=REQUESTS_MOD["verify"])
 
     with open(tmp, "wb") as f:
         for chunk in req.iter_content():
@@ -179,30 +700,6 @@ def _download_and_rename_file(url: str, dest: str):
     _rename_file(tmp, dest)
 
 
-IS_LOCKED = {"locks": {}}
-
-
-def _acquire_lock(cache: str, project: str, asset: str, version: str):
-    _key = f"{project}/{asset}/{version}"
-
-    if _key in IS_LOCKED["locks"] and IS_LOCKED["locks"][_key] is None:
-        _path = os.path.join(cache, "status", project, asset, version)
-        os.makedirs(os.path.dirname(_path), exist_ok=True)
-
-        _lock = FileLock(_path + ".LOCK")
-        _lock.acquire()
-        IS_LOCKED["locks"][_key] = _lock
-
-
-def _release_lock(project: str, asset: str, version: str):
-    _key = f"{project}/{asset}/{version}"
-
-    if _key in IS_LOCKED["locks"] and IS_LOCKED["locks"][_key] is not None:
-        _lock = IS_LOCKED["locks"][_key]
-        _lock.release()
-        del IS_LOCKED["locks"][_key]
-
-
 def _sanitize_path(x):
     if os.name == "nt":
         x = re.sub(r"\\\\", "/", x)
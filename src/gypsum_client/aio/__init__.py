@@ -0,0 +1,52 @@
+"""Asynchronous client for the gypsum REST API.
+
+This package provides ``async`` equivalents of the fetch, list, save,
+clone and upload operations in :py:mod:`gypsum_client`.
+All requests share a single ``aiohttp`` connection pool per event loop,
+configured by the same keys in :py:data:`~gypsum_client.config.REQUESTS_MOD`.
+
+Files are saved with the same layout under ``BUCKET_CACHE_NAME`` and the same
+``status/.../COMPLETE`` markers as the synchronous functions,
+so both can be used on the same cache directory.
+However, the asynchronous functions do not lock versions against
+:py:func:`~gypsum_client.cache_operations.prune_cache`, verify downloads
+against the MD5 checksums in the manifest, resume interrupted downloads or
+use the content-addressed store of the cache.
+
+This requires the optional ``aiohttp`` dependency,
+e.g., via ``pip install gypsum-client[aio]``.
+
+Example:
+
+    .. code-block:: python
+
+        import asyncio
+        from gypsum_client import aio
+
+        async def main():
+            man = await aio.fetch_manifest("test-R", "basic", "v1")
+            out = await aio.save_version("test-R", "basic", "v1", concurrent=4)
+            await aio.close_session()
+
+        asyncio.run(main())
+"""
+
+from ._session import close_session
+from .clone_operations import clone_version
+from .fetch_operations import (
+    fetch_latest,
+    fetch_manifest,
+    fetch_permissions,
+    fetch_quota,
+    fetch_summary,
+    fetch_usage,
+)
+from .list_operations import list_assets, list_files, list_projects, list_versions
+from .resolve_links import resolve_links
+from .save_operations import save_file, save_version
+from .upload_api_operations import abort_upload, complete_upload, start_upload
+from .upload_file_actions import upload_directory, upload_files
+
+__author__ = "Jayaram Kancherla"
+__copyright__ = "Jayaram Kancherla"
+__license__ = "MIT"
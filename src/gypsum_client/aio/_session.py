@@ -0,0 +1,82 @@
+import asyncio
+
+from .._session import _setting
+from ..config import REQUESTS_MOD
+
+try:
+    import aiohttp
+except ImportError as e:  # pragma: no cover
+    raise ImportError(
+        "'aiohttp' is required for 'gypsum_client.aio', "
+        "install it with 'pip install gypsum-client[aio]'."
+    ) from e
+
+__author__ = "Jayaram Kancherla"
+__copyright__ = "Jayaram Kancherla"
+__license__ = "MIT"
+
+SESSION = {"session": None, "loop": None, "signature": None}
+
+
+def _session_signature() -> tuple:
+    return (
+        REQUESTS_MOD.get("verify"),
+        REQUESTS_MOD.get("pool_connections"),
+        REQUESTS_MOD.get("pool_maxsize"),
+        REQUESTS_MOD.get("keep_alive"),
+    )
+
+
+def _create_session() -> "aiohttp.ClientSession":
+    connector = aiohttp.TCPConnector(
+        limit=_setting("pool_connections") * _setting("pool_maxsize"),
+        limit_per_host=_setting("pool_maxsize"),
+        force_close=not _setting("keep_alive"),
+        ssl=None if _setting("verify") else False,
+    )
+    return aiohttp.ClientSession(
+        connector=connector, timeout=aiohttp.ClientTimeout(total=None)
+    )
+
+
+async def _get_session() -> "aiohttp.ClientSession":
+    """Get the pooled HTTP session for the running event loop.
+
+    This mirrors :py:func:`~gypsum_client._session._get_session`, using the
+    same pool settings from :py:data:`~gypsum_client.config.REQUESTS_MOD`.
+    A new session is created if the event loop or the settings change.
+    """
+    loop = asyncio.get_running_loop()
+    signature = _session_signature()
+
+    current = SESSION["session"]
+    if (
+        current is not None
+        and not current.closed
+        and SESSION["loop"] is loop
+        and SESSION["signature"] == signature
+    ):
+        return current
+
+    if current is not None and not current.closed and SESSION["loop"] is loop:
+        await current.close()
+
+    SESSION["session"] = _create_session()
+    SESSION["loop"] = loop
+    SESSION["signature"] = signature
+    return SESSION["session"]
+
+
+async def close_session():
+    """Close the pooled HTTP session used by :py:mod:`gypsum_client.aio`.
+
+    This should be called before the event loop is shut down,
+    to release all connections in the pool.
+    """
+    current = SESSION["session"]
+    if current is not None and not current.closed:
+        await current.close()
+
+    SESSION["session"] = None
+    SESSION["loop"] = None
+    SESSION["signature"] = None
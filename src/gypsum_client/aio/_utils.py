@@ -0,0 +1,170 @@
+import asyncio
+import json
+import os
+import shutil
+import tempfile
+from contextlib import asynccontextmanager
+from urllib.parse import quote_plus
+
+from filelock import FileLock, Timeout
+
+from .._utils import BUCKET_CACHE_NAME, _trim_listing
+from ._session import _get_session
+
+__author__ = "Jayaram Kancherla"
+__copyright__ = "Jayaram Kancherla"
+__license__ = "MIT"
+
+
+async def _raise_for_status(resp, message: str):
+    if resp.status >= 400:
+        text = await resp.text()
+        raise Exception(f"{message}, {resp.status} and reason: {text}")
+
+
+# Locks for files being saved by coroutines of each event loop.
+_SAVING = {}
+
+
+async def _acquire_file_lock(lock: FileLock, poll_interval: float = 0.05):
+    # Polls instead of blocking, so that the event loop keeps running
+    # while another process or thread holds the lock. FileLock is re-entrant
+    # within a thread, so it does not exclude other coroutines; see
+    # _coroutine_lock() for that.
+    while True:
+        try:
+            lock.acquire(timeout=0)
+            return
+        except Timeout:
+            await asyncio.sleep(poll_interval)
+
+
+@asynccontextmanager
+async def _coroutine_lock(path: str):
+    key = (asyncio.get_running_loop(), path)
+    entry = _SAVING.get(key)
+    if entry is None:
+        entry = _SAVING[key] = [asyncio.Lock(), 0]
+    entry[1] += 1
+
+    try:
+        async with entry[0]:
+            yield
+    finally:
+        # Locks are only registered while they are in use.
+        entry[1] -= 1
+        if entry[1] == 0:
+            del _SAVING[key]
+
+
+async def _list_for_prefix(
+    prefix: str,
+    url: str,
+    recursive: bool = False,
+    include_dot: bool = False,
+    only_dirs: bool = True,
+):
+    url = url + "/list"
+
+    qparams = {"recursive": "true" if recursive is True else "false"}
+    if prefix is not None:
+        qparams["prefix"] = prefix
+
+    session = await _get_session()
+    async with session.get(url, params=qparams) as req:
+        await _raise_for_status(req, "Failed to access files from API")
+        resp = await req.json(content_type=None)
+
+    return _trim_listing(
+        resp, prefix=prefix, include_dot=include_dot, only_dirs=only_dirs
+    )
+
+
+async def _fetch_json(path: str, url: str):
+    full_url = f"{url}/file/{quote_plus(path)}"
+
+    session = await _get_session()
+    async with session.get(full_url) as req:
+        await _raise_for_status(req, "Failed to access json from API")
+        return await req.json(content_type=None)
+
+
+async def _fetch_cacheable_json(
+    project: str,
+    asset: str,
+    version: str,
+    path: str,
+    cache: str,
+    url: str,
+    overwrite: bool,
+):
+    bucket_path = f"{project}/{asset}/{version}/{path}"
+
+    if cache is None:
+        return await _fetch_json(bucket_path, url=url)
+    else:
+        _out_path = os.path.join(
+            cache, BUCKET_CACHE_NAME, project, asset, version, path
+        )
+
+        await _save_file(
+            bucket_path, destination=_out_path, overwrite=overwrite, url=url
+        )
+
+        with open(_out_path, "r") as jf:
+            return json.load(jf)
+
+
+async def _save_file(
+    path: str,
+    destination: str,
+    overwrite: bool,
+    url: str,
+    error: bool = True,
+):
+    if overwrite is True or not os.path.exists(destination):
+        os.makedirs(os.path.dirname(destination), exist_ok=True)
+
+        async with _coroutine_lock(os.path.abspath(destination)):
+            _lock = FileLock(destination + ".LOCK")
+            await _acquire_file_lock(_lock)
+            staged = None
+            try:
+                # Another coroutine or process may have saved it meanwhile.
+                if overwrite is not True and os.path.exists(destination):
+                    return True
+
+                with tempfile.NamedTemporaryFile(
+                    dir=os.path.dirname(destination), delete=False
+                ) as tmp_file:
+                    staged = tmp_file.name
+                    try:
+                        full_url = f"{url}/file/{quote_plus(path)}"
+
+                        session = await _get_session()
+                        async with session.get(full_url) as req:
+                            await _raise_for_status(req, "Failed to save file from API")
+
+                            async for chunk in req.content.iter_any():
+                                tmp_file.write(chunk)
+                    except Exception as e:
+                        if error:
+                            raise Exception(
+                                f"Failed to save '{path}'; {str(e)}."
+                            ) from e
+                        else:
+                            return False
+
+                # Rename the temporary file to the destination
+                shutil.move(staged, destination)
+                staged = None
+            finally:
+                # Temporary files of failed downloads are not left behind.
+                if staged is not None:
+                    try:
+                        os.unlink(staged)
+                    except OSError:
+                        pass
+                _lock.release()
+
+    return True
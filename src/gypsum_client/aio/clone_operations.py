@@ -0,0 +1,74 @@
+import os
+
+from .._utils import BUCKET_CACHE_NAME
+from ..cache_directory import cache_directory
+from ..clone_operations import _create_clone_links
+from ..rest_url import rest_url
+from .fetch_operations import fetch_manifest
+from .save_operations import save_version
+
+__author__ = "Jayaram Kancherla"
+__copyright__ = "Jayaram Kancherla"
+__license__ = "MIT"
+
+
+async def clone_version(
+    project: str,
+    asset: str,
+    version: str,
+    destination: str,
+    download: bool = True,
+    cache_dir: str = cache_directory(),
+    url: str = rest_url(),
+    **kwargs,
+):
+    """Clone a version's directory structure.
+
+    Asynchronous equivalent of
+    :py:func:`~gypsum_client.clone_operations.clone_version`.
+
+    Example:
+
+        .. code-block:: python
+
+            await clone_version("test-R", "basic", "v1", destination=dest)
+
+    Args:
+        project:
+            Project name.
+
+        asset:
+            Asset name.
+
+        version:
+            Version name.
+
+        destination:
+            Destination directory at which to create the clone.
+
+        download:
+            Whether the version's files should be downloaded first.
+            Defaults to True.
+
+        cache_dir:
+            Path to the cache directory.
+
+        url:
+            URL of the gypsum REST API.
+
+        **kwargs:
+            Further arguments to pass to
+            :py:func:`~gypsum_client.aio.save_operations.save_version`.
+
+            Only used if ``download`` is `True`.
+    """
+    if download:
+        await save_version(
+            project, asset, version, cache_dir=cache_dir, url=url, **kwargs
+        )
+
+    final_cache = os.path.join(cache_dir, BUCKET_CACHE_NAME, project, asset, version)
+    listing = await fetch_manifest(
+        project, asset, version, cache_dir=cache_dir, url=url
+    )
+    _create_clone_links(listing, final_cache, destination)
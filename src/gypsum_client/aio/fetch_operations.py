@@ -0,0 +1,243 @@
+import os
+
+from .._manifest_cache import _manifest_key, _set_probation
+from .._utils import BUCKET_CACHE_NAME, _cast_datetime
+from ..cache_directory import cache_directory
+from ..rest_url import rest_url
+from ._utils import _fetch_cacheable_json, _fetch_json
+
+__author__ = "Jayaram Kancherla"
+__copyright__ = "Jayaram Kancherla"
+__license__ = "MIT"
+
+
+async def fetch_latest(project: str, asset: str, url: str = rest_url()) -> str:
+    """Fetch the latest version of a project's asset.
+
+    Asynchronous equivalent of
+    :py:func:`~gypsum_client.fetch_operations.fetch_latest`.
+
+    Example:
+
+        .. code-block:: python
+
+            ver = await fetch_latest("test-R", "basic")
+
+    Args:
+        project:
+            Project name.
+
+        asset:
+            Asset name.
+
+        url:
+            URL to the gypsum compatible API.
+
+    Returns:
+        Latest version of the project.
+    """
+    resp = await _fetch_json(f"{project}/{asset}/..latest", url=url)
+    return resp["version"]
+
+
+async def fetch_manifest(
+    project: str,
+    asset: str,
+    version: str,
+    cache_dir: str = cache_directory(),
+    overwrite: bool = False,
+    url: str = rest_url(),
+) -> dict:
+    """Fetch the manifest for a version of an asset of a project.
+
+    Asynchronous equivalent of
+    :py:func:`~gypsum_client.fetch_operations.fetch_manifest`.
+
+    Example:
+
+        .. code-block:: python
+
+            manifest = await fetch_manifest("test-R", "basic", "v1")
+
+    Args:
+        project:
+            Project name.
+
+        asset:
+            Asset name.
+
+        version:
+            Version name.
+
+        cache_dir:
+            Path to the cache directory.
+
+        overwrite:
+            Whether to overwrite existing file in cache.
+
+        url:
+            URL to the gypsum compatible API.
+
+    Returns:
+        Dictionary containing the manifest for this version.
+    """
+    return await _fetch_cacheable_json(
+        project,
+        asset,
+        version,
+        "..manifest",
+        url=url,
+        cache=cache_dir,
+        overwrite=overwrite,
+    )
+
+
+async def fetch_permissions(project: str, url: str = rest_url()) -> dict:
+    """Fetch the permissions for a project.
+
+    Asynchronous equivalent of
+    :py:func:`~gypsum_client.fetch_operations.fetch_permissions`.
+
+    Example:
+
+        .. code-block:: python
+
+            perms = await fetch_permissions("test-R")
+
+    Args:
+        project:
+            Project name.
+
+        url:
+            URL to the gypsum compatible API.
+
+    Returns:
+        Dictionary containing the permissions for this project.
+    """
+    perms = await _fetch_json(f"{project}/..permissions", url=url)
+
+    for i, val in enumerate(perms["uploaders"]):
+        if "until" in val:
+            perms["uploaders"][i]["until"] = _cast_datetime(val["until"])
+
+    return perms
+
+
+async def fetch_quota(project: str, url: str = rest_url()) -> dict:
+    """Fetch the quota details for a project.
+
+    Asynchronous equivalent of
+    :py:func:`~gypsum_client.fetch_operations.fetch_quota`.
+
+    Example:
+
+        .. code-block:: python
+
+            quota = await fetch_quota("test-R")
+
+    Args:
+        project:
+            Project name.
+
+        url:
+            URL to the gypsum compatible API.
+
+    Returns:
+        Dictionary containing ``baseline``, ``growth_rate`` and ``year``.
+    """
+    return await _fetch_json(f"{project}/..quota", url=url)
+
+
+async def fetch_summary(
+    project: str,
+    asset: str,
+    version: str,
+    cache_dir: str = cache_directory(),
+    overwrite: bool = False,
+    url: str = rest_url(),
+) -> dict:
+    """Fetch the summary for a version of an asset of a project.
+
+    Asynchronous equivalent of
+    :py:func:`~gypsum_client.fetch_operations.fetch_summary`.
+
+    Example:
+
+        .. code-block:: python
+
+            summa = await fetch_summary("test-R", "basic", "v1")
+
+    Args:
+        project:
+            Project name.
+
+        asset:
+            Asset name.
+
+        version:
+            Version name.
+
+        cache_dir:
+            Path to the cache directory.
+
+        overwrite:
+            Whether to overwrite existing file in cache.
+
+        url:
+            URL to the gypsum compatible API.
+
+    Returns:
+        Dictionary containing the summary for this version.
+    """
+    _out = await _fetch_cacheable_json(
+        project,
+        asset,
+        version,
+        "..summary",
+        cache=cache_dir,
+        overwrite=overwrite,
+        url=url,
+    )
+
+    _out["upload_start"] = _cast_datetime(_out["upload_start"])
+    _out["upload_finish"] = _cast_datetime(_out["upload_finish"])
+
+    _set_probation(
+        _manifest_key(url, project, asset, version),
+        _out.get("on_probation", False) is True,
+    )
+
+    if "on_probation" in _out:
+        if _out["on_probation"] is True and cache_dir is not None:
+            _out_path = os.path.join(
+                cache_dir, BUCKET_CACHE_NAME, project, asset, version, "..summary"
+            )
+            os.unlink(_out_path)
+
+    return _out
+
+
+async def fetch_usage(project: str, url: str = rest_url()) -> int:
+    """Fetch the quota usage for a project.
+
+    Asynchronous equivalent of
+    :py:func:`~gypsum_client.fetch_operations.fetch_usage`.
+
+    Example:
+
+        .. code-block:: python
+
+            usage = await fetch_usage("test-R")
+
+    Args:
+        project:
+            Project name.
+
+        url:
+            URL to the gypsum compatible API.
+
+    Returns:
+        Quota usage for the project, in bytes.
+    """
+    _usage = await _fetch_json(f"{project}/..usage", url=url)
+    return _usage["total"]
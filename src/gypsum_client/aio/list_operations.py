@@ -0,0 +1,141 @@
+from ..list_operations import _trim_file_listing
+from ..rest_url import rest_url
+from ._session import _get_session
+from ._utils import _list_for_prefix, _raise_for_status
+
+__author__ = "Jayaram Kancherla"
+__copyright__ = "Jayaram Kancherla"
+__license__ = "MIT"
+
+
+async def list_projects(url: str = rest_url()) -> list:
+    """List all projects in the gypsum backend.
+
+    Asynchronous equivalent of
+    :py:func:`~gypsum_client.list_operations.list_projects`.
+
+    Example:
+
+        .. code-block:: python
+
+            all_prjs = await list_projects()
+
+    Args:
+        url:
+            URL to the gypsum compatible API.
+
+    Returns:
+        List of project names.
+    """
+    return await _list_for_prefix(prefix=None, url=url)
+
+
+async def list_assets(project: str, url: str = rest_url()) -> list:
+    """List all assets in a project.
+
+    Asynchronous equivalent of
+    :py:func:`~gypsum_client.list_operations.list_assets`.
+
+    Example:
+
+        .. code-block:: python
+
+            all_assets = await list_assets("test-R")
+
+    Args:
+        project:
+            Project name.
+
+        url:
+            URL to the gypsum compatible API.
+
+    Returns:
+        List of asset names.
+    """
+    return await _list_for_prefix(f"{project}/", url=url)
+
+
+async def list_versions(project: str, asset: str, url: str = rest_url()) -> list:
+    """List all versions for a project asset.
+
+    Asynchronous equivalent of
+    :py:func:`~gypsum_client.list_operations.list_versions`.
+
+    Example:
+
+        .. code-block:: python
+
+            all_vers = await list_versions("test-R", "basic")
+
+    Args:
+        project:
+            Project name.
+
+        asset:
+            Asset name.
+
+        url:
+            URL to the gypsum compatible API.
+
+    Returns:
+        List of versions.
+    """
+    return await _list_for_prefix(f"{project}/{asset}/", url=url)
+
+
+async def list_files(
+    project: str,
+    asset: str,
+    version: str,
+    prefix: str = None,
+    include_dot: bool = True,
+    url: str = rest_url(),
+) -> list:
+    """List all files for a specified version of a project and asset.
+
+    Asynchronous equivalent of
+    :py:func:`~gypsum_client.list_operations.list_files`.
+
+    Example:
+
+        .. code-block:: python
+
+            all_files = await list_files("test-R", "basic", "v1")
+
+    Args:
+        project:
+            Project name.
+
+        asset:
+            Asset name.
+
+        version:
+            Version name.
+
+        prefix:
+            Prefix for the object key.
+
+        include_dot:
+            Whether to list files with ``..`` in their names.
+
+        url:
+            URL to the gypsum compatible API.
+
+    Returns:
+        List of relative paths of files associated with the versioned asset.
+    """
+    _prefix = f"{project}/{asset}/{version}/"
+    _trunc = len(_prefix)
+    if prefix is not None:
+        _prefix = f"{_prefix}{prefix}"
+
+    session = await _get_session()
+    async with session.get(
+        f"{url}/list", params={"recursive": "true", "prefix": _prefix}
+    ) as req:
+        await _raise_for_status(req, "Failed to list files in a project")
+        resp = await req.json(content_type=None)
+
+    return _trim_file_listing(
+        resp, trunc=_trunc, prefix=prefix, include_dot=include_dot
+    )
@@ -0,0 +1,97 @@
+import os
+from typing import Optional
+
+from .._utils import BUCKET_CACHE_NAME, _link_or_copy
+from ..cache_directory import cache_directory
+from ..rest_url import rest_url
+from .fetch_operations import fetch_manifest
+
+__author__ = "Jayaram Kancherla"
+__copyright__ = "Jayaram Kancherla"
+__license__ = "MIT"
+
+
+async def resolve_links(
+    project: str,
+    asset: str,
+    version: str,
+    cache_dir: Optional[str] = cache_directory(),
+    overwrite: str = False,
+    url: str = rest_url(),
+):
+    """Resolve links in the cache directory.
+
+    Asynchronous equivalent of
+    :py:func:`~gypsum_client.resolve_links.resolve_links`.
+
+    Example:
+
+        .. code-block:: python
+
+            await resolve_links("test-R", "basic", "v3", cache_dir=cache)
+
+    Args:
+        project:
+            Project name.
+
+        asset:
+            Asset name.
+
+        version:
+            Version name.
+
+        cache_dir:
+            Path to the cache directory.
+
+        overwrite:
+            Whether to overwrite existing file in cache.
+
+        url:
+            URL to the gypsum compatible API.
+
+    Returns:
+        True if all links are resolved.
+    """
+    from .save_operations import save_file
+
+    self_manifest = await fetch_manifest(
+        project, asset, version, cache_dir=cache_dir, url=url
+    )
+
+    for kmf in self_manifest.keys():
+        entry = self_manifest[kmf]
+        if entry.get("link") is None:
+            continue
+
+        old_loc = os.path.join(project, asset, version, kmf)
+        old_path = os.path.join(cache_dir, BUCKET_CACHE_NAME, old_loc)
+        if os.path.exists(old_path) and not overwrite:
+            continue
+
+        link_data = entry["link"]
+        if link_data.get("ancestor") is not None:
+            link_data = link_data["ancestor"]
+
+        out = await save_file(
+            link_data["project"],
+            link_data["asset"],
+            link_data["version"],
+            link_data["path"],
+            cache_dir=cache_dir,
+            url=url,
+            overwrite=overwrite,
+        )
+
+        try:
+            os.unlink(old_path)
+        except Exception:
+            pass
+
+        os.makedirs(os.path.dirname(old_path), exist_ok=True)
+
+        try:
+            _link_or_copy(out, old_path)
+        except Exception as e:
+            raise ValueError(f"Failed to resolve link for '{kmf}': {e}") from e
+
+    return True
@@ -0,0 +1,228 @@
+import asyncio
+import os
+from typing import Optional
+
+from .._cache_index import _record_files, _record_manifest
+from .._utils import BUCKET_CACHE_NAME, _link_or_copy, _sanitize_path
+from ..cache_directory import cache_directory
+from ..cache_operations import _touch_version
+from ..rest_url import rest_url
+from ..save_operations import _links_file_location, _read_link_target
+from ._utils import _save_file
+from .fetch_operations import fetch_manifest
+from .list_operations import list_files
+from .resolve_links import resolve_links
+
+__author__ = "Jayaram Kancherla"
+__copyright__ = "Jayaram Kancherla"
+__license__ = "MIT"
+
+
+async def save_version(
+    project: str,
+    asset: str,
+    version: str,
+    cache_dir: Optional[str] = cache_directory(),
+    overwrite: bool = False,
+    relink: bool = True,
+    concurrent: int = 1,
+    url: str = rest_url(),
+) -> str:
+    """Download all files associated with a version of an asset
+    of a project from the gypsum bucket.
+
+    Asynchronous equivalent of
+    :py:func:`~gypsum_client.save_operations.save_version`.
+    All downloads share the connection pool of the running event loop.
+
+    Example:
+
+        .. code-block:: python
+
+            out = await save_version("test-R", "basic", "v1")
+
+    Args:
+        project:
+            Project name.
+
+        asset:
+            Asset name.
+
+        version:
+            Version name.
+
+        cache_dir:
+            Path to the cache directory.
+
+        overwrite:
+            Whether to overwrite existing file in cache.
+
+        relink:
+            Whether links should be resolved, see
+            :py:func:`~gypsum_client.aio.resolve_links.resolve_links`.
+            Defaults to True.
+
+        concurrent:
+            Number of concurrent downloads.
+            Defaults to 1.
+
+        url:
+            URL to the gypsum compatible API.
+
+    Returns:
+        Path to the local directory where the files are downloaded to.
+    """
+    destination = os.path.join(cache_dir, BUCKET_CACHE_NAME, project, asset, version)
+
+    # If this version's directory was previously cached in its complete form, we skip it.
+    completed = os.path.join(cache_dir, "status", project, asset, version, "COMPLETE")
+    _touch_version(cache_dir, project, asset, version)
+    if not os.path.exists(completed) or overwrite:
+        listing = await list_files(project, asset, version, url=url)
+
+        semaphore = asyncio.Semaphore(max(concurrent, 1))
+
+        async def _save_one(file):
+            async with semaphore:
+                await _save_file(
+                    path=os.path.join(project, asset, version, file),
+                    destination=os.path.join(destination, file),
+                    overwrite=overwrite,
+                    url=url,
+                )
+
+        await asyncio.gather(*[_save_one(file) for file in listing])
+
+        if relink:
+            await resolve_links(
+                project,
+                asset,
+                version,
+                cache_dir=cache_dir,
+                overwrite=overwrite,
+                url=url,
+            )
+
+        # Marking it as complete.
+        os.makedirs(os.path.dirname(completed), exist_ok=True)
+        with open(completed, "w"):
+            pass
+
+        # Keeps the index of the cache in sync with the synchronous client.
+        manifest = await fetch_manifest(
+            project, asset, version, cache_dir=cache_dir, url=url
+        )
+        if not relink:
+            manifest = {k: v for k, v in manifest.items() if v.get("link") is None}
+        _record_manifest(cache_dir, project, asset, version, manifest, complete=True)
+
+    return destination
+
+
+async def _resolve_single_link(
+    project: str,
+    asset: str,
+    version: str,
+    path: str,
+    cache: str,
+    overwrite: bool,
+    url: str,
+) -> Optional[str]:
+    lobject, ldestination = _links_file_location(project, asset, version, path, cache)
+
+    _saved = await _save_file(
+        lobject, ldestination, overwrite=overwrite, url=url, error=False
+    )
+
+    if not _saved:
+        return None
+
+    target = _read_link_target(ldestination, path, cache)
+    if target is None:
+        return None
+
+    tobject, tdestination = target
+    await _save_file(tobject, tdestination, overwrite=overwrite, url=url)
+    return tdestination
+
+
+async def save_file(
+    project: str,
+    asset: str,
+    version: str,
+    path: str,
+    cache_dir: Optional[str] = cache_directory(),
+    overwrite: bool = False,
+    url: str = rest_url(),
+):
+    """Save a file from a version of a project asset.
+
+    Asynchronous equivalent of
+    :py:func:`~gypsum_client.save_operations.save_file`.
+
+    Example:
+
+        .. code-block:: python
+
+            out = await save_file("test-R", "basic", "v1", "blah.txt")
+
+    Args:
+        project:
+            Project name.
+
+        asset:
+            Asset name.
+
+        version:
+            Version name.
+
+        path:
+            Suffix of the object key for the file of interest,
+            i.e., the relative ``path`` inside the version's subdirectory.
+
+        cache_dir:
+            Path to the cache directory.
+
+        overwrite:
+            Whether to overwrite existing file in cache.
+
+        url:
+            URL to the gypsum compatible API.
+
+    Returns:
+        The destintion file path where the file is downloaded to in the local
+        file system.
+    """
+    object_key = f"{project}/{asset}/{version}/{_sanitize_path(path)}"
+    destination = os.path.join(
+        cache_dir, BUCKET_CACHE_NAME, project, asset, version, path
+    )
+    _touch_version(cache_dir, project, asset, version)
+    if not overwrite and os.path.exists(destination):
+        return destination
+
+    found = await _save_file(
+        object_key, destination, overwrite=overwrite, url=url, error=False
+    )
+
+    if not found:
+        link = await _resolve_single_link(
+            project, asset, version, path, cache_dir, overwrite=overwrite, url=url
+        )
+
+        if link is None:
+            raise ValueError(f"'{path}' does not exist in the bucket.")
+
+        try:
+            _link_or_copy(link, destination)
+        except Exception as e:
+            raise ValueError(f"Failed to resolve link for '{path}': {e}.") from e
+
+    _record_files(
+        cache_dir,
+        project,
+        asset,
+        version,
+        [(path, os.path.getsize(destination), None)],
+    )
+    return destination
@@ -0,0 +1,183 @@
+import asyncio
+from typing import List, Optional, Union
+from urllib.parse import quote_plus
+
+from .._latest_cache import _forget_latest
+from .._listing_cache import _invalidate_listings
+from .._manifest_cache import _manifest_key, _set_probation
+from .._utils import _remove_slash_url
+from ..auth import access_token
+from ..cache_directory import cache_directory
+from ..rest_url import rest_url
+from ..upload_api_operations import _format_upload_files
+from ._session import _get_session
+from ._utils import _raise_for_status
+
+__author__ = "Jayaram Kancherla"
+__copyright__ = "Jayaram Kancherla"
+__license__ = "MIT"
+
+
+async def start_upload(
+    project: str,
+    asset: str,
+    version: str,
+    files: Union[str, List[str], List[dict]],
+    links: List[dict] = None,
+    deduplicate: bool = True,
+    probation: bool = False,
+    url: str = rest_url(),
+    token: str = None,
+    directory: str = None,
+    concurrent: int = 1,
+    cache_dir: Optional[str] = cache_directory(),
+) -> dict:
+    """Start an upload.
+
+    Asynchronous equivalent of
+    :py:func:`~gypsum_client.upload_api_operations.start_upload`.
+    Local files are hashed in the default executor so that the
+    event loop is not blocked.
+
+    Example:
+
+        .. code-block:: python
+
+            init = await start_upload(
+                project="test-Py-demo",
+                asset="upload",
+                version="1",
+                files=files,
+                directory=tmp_dir,
+            )
+
+    Args:
+        project:
+            Project name.
+
+        asset:
+            Asset name.
+
+        version:
+            Version name.
+
+        files:
+            A file path or a List of file paths to upload,
+            or a list of dictionaries, see
+            :py:func:`~gypsum_client.upload_api_operations.start_upload`.
+
+        links:
+            A List containing a dictionary with the ``from.path``,
+            ``to.project``, ``to.asset``, ``to.version`` and ``to.path`` keys.
+
+        deduplicate:
+            Whether the backend should attempt deduplication of ``files``
+            in the immediately previous version.
+            Defaults to True.
+
+        probation:
+            Whether to perform a probational upload.
+            Defaults to False.
+
+        url:
+            URL of the gypsum REST API.
+
+        token:
+            GitHub access token to authenticate to the gypsum REST API.
+
+        directory:
+            Path to a directory containing the ``files`` to be uploaded.
+
+        concurrent:
+            Number of files to hash at the same time, if ``files`` are paths.
+            Defaults to 1.
+
+        cache_dir:
+            Path to the cache directory containing the hash cache.
+            If None, all files are hashed.
+
+    Returns:
+        Dictionary containing ``file_urls``, ``complete_url``, ``abort_url``
+        and ``session_token``.
+    """
+    loop = asyncio.get_running_loop()
+    formatted = await loop.run_in_executor(
+        None,
+        _format_upload_files,
+        files,
+        links,
+        deduplicate,
+        directory,
+        concurrent,
+        cache_dir,
+    )
+
+    if token is None:
+        token = access_token()
+
+    url = _remove_slash_url(url)
+    session = await _get_session()
+    async with session.post(
+        f"{url}/upload/start/{quote_plus(project)}/{quote_plus(asset)}/{quote_plus(version)}",
+        json={"files": formatted, "on_probation": probation},
+        headers={"Authorization": f"Bearer {token}"},
+    ) as req:
+        await _raise_for_status(req, "Failed to start an upload")
+        resp = await req.json(content_type=None)
+
+    if "status" in resp and resp["status"] == "error":
+        raise Exception(f"Failed to upload, {req.status} and reason: {resp['reason']}")
+
+    if probation:
+        _set_probation(_manifest_key(url, project, asset, version), True)
+
+    return resp
+
+
+async def complete_upload(init: dict, url=rest_url()):
+    """Complete an upload session after all files have been uploaded.
+
+    Asynchronous equivalent of
+    :py:func:`~gypsum_client.upload_api_operations.complete_upload`.
+
+    Args:
+        init:
+            Dictionary containing ``complete_url`` and ``session_token``.
+
+        url:
+            URL to the gypsum REST API.
+    """
+    url = _remove_slash_url(url)
+    session = await _get_session()
+    async with session.post(
+        f"{url}{init['complete_url']}",
+        headers={"Authorization": f"Bearer {init['session_token']}"},
+    ) as req:
+        await _raise_for_status(req, "Failed to complete an upload session")
+
+    # As in the synchronous client, all listings and latest versions
+    # from this API are invalidated.
+    _invalidate_listings(url=url)
+    _forget_latest(url=url)
+
+
+async def abort_upload(init: dict, url=rest_url()):
+    """Abort an upload session, usually after an irrecoverable error.
+
+    Asynchronous equivalent of
+    :py:func:`~gypsum_client.upload_api_operations.abort_upload`.
+
+    Args:
+        init:
+            Dictionary containing ``abort_url`` and ``session_token``.
+
+        url:
+            URL to the gypsum REST API.
+    """
+    url = _remove_slash_url(url)
+    session = await _get_session()
+    async with session.post(
+        f"{url}{init['abort_url']}",
+        headers={"Authorization": f"Bearer {init['session_token']}"},
+    ) as req:
+        await _raise_for_status(req, "Failed to abort the upload")
@@ -0,0 +1,184 @@
+import asyncio
+import os
+from functools import partial
+
+from .._utils import _remove_slash_url
+from ..auth import access_token
+from ..cache_directory import cache_directory
+from ..prepare_directory_for_upload import prepare_directory_upload
+from ..rest_url import rest_url
+from ._session import _get_session
+from ._utils import _raise_for_status
+from .upload_api_operations import abort_upload, complete_upload, start_upload
+
+__author__ = "Jayaram Kancherla"
+__copyright__ = "Jayaram Kancherla"
+__license__ = "MIT"
+
+
+async def upload_directory(
+    directory: str,
+    project: str,
+    asset: str,
+    version: str,
+    cache_dir: str = cache_directory(),
+    deduplicate: bool = True,
+    probation: bool = False,
+    url: str = rest_url(),
+    token: str = None,
+    concurrent: int = 1,
+    abort_failed: bool = True,
+) -> bool:
+    """Upload a directory to the gypsum backend.
+
+    Asynchronous equivalent of
+    :py:func:`~gypsum_client.upload_file_actions.upload_directory`.
+
+    Example:
+
+        .. code-block:: python
+
+            await upload_directory(tmp_dir, "test-Py", "upload-dir", version="1")
+
+    Args:
+        directory:
+            Path to a directory containing the ``files`` to be uploaded.
+
+        project:
+            Project name.
+
+        asset:
+            Asset name.
+
+        version:
+            Version name.
+
+        cache_dir:
+            Path to the cache, used to convert symbolic links to upload links.
+
+        deduplicate:
+            Whether the backend should attempt deduplication of ``files``
+            in the immediately previous version.
+            Defaults to True.
+
+        probation:
+            Whether to perform a probational upload.
+            Defaults to False.
+
+        url:
+            URL of the gypsum REST API.
+
+        token:
+            GitHub access token to authenticate to the gypsum REST API.
+
+        concurrent:
+            Number of concurrent uploads.
+            This is also the number of files that are hashed in parallel.
+            Defaults to 1.
+
+        abort_failed:
+            Whether to abort the upload on any failure.
+
+    Returns:
+        `True` if successfull, otherwise `False`.
+    """
+    if token is None:
+        token = access_token()
+
+    loop = asyncio.get_running_loop()
+    listing = await loop.run_in_executor(
+        None,
+        partial(
+            prepare_directory_upload,
+            directory,
+            links="always",
+            cache_dir=cache_dir,
+            checksums=True,
+            concurrent=concurrent,
+        ),
+    )
+
+    blob = await start_upload(
+        project=project,
+        asset=asset,
+        version=version,
+        files=listing["files"],
+        links=listing["links"],
+        directory=directory,
+        probation=probation,
+        url=url,
+        token=token,
+        concurrent=concurrent,
+        cache_dir=cache_dir,
+    )
+
+    success = False
+    try:
+        await upload_files(blob, directory=directory, url=url, concurrent=concurrent)
+        await complete_upload(blob, url=url)
+        success = True
+    finally:
+        if abort_failed and not success:
+            await abort_upload(blob, url=url)
+
+    return success
+
+
+async def upload_files(
+    init: dict, directory: str = None, url: str = rest_url(), concurrent: int = 1
+):
+    """Upload files in an initialized upload session for a version of an asset.
+
+    Asynchronous equivalent of
+    :py:func:`~gypsum_client.upload_file_actions.upload_files`.
+
+    Args:
+        init:
+            Dictionary containing ``file_urls`` and ``session_token``.
+            This is typically the return value from
+            :py:func:`~gypsum_client.aio.upload_api_operations.start_upload`.
+
+        directory:
+            Path to the directory containing files.
+            Defaults to None, if files are part of the current working directory.
+
+        url:
+            URL of the gypsum REST API.
+
+        concurrent:
+            Number of concurrent uploads.
+            Defaults to 1.
+    """
+    url = _remove_slash_url(url)
+    semaphore = asyncio.Semaphore(max(concurrent, 1))
+
+    async def _upload_one(file_info):
+        async with semaphore:
+            await _upload_file(file_info, directory, url, init["session_token"])
+
+    await asyncio.gather(*[_upload_one(file_info) for file_info in init["file_urls"]])
+
+
+async def _upload_file(info: dict, directory: str, url: str, token: str):
+    _path = info["path"]
+
+    if directory is not None:
+        _path = os.path.join(directory, _path)
+
+    if info["method"] == "presigned":
+        session = await _get_session()
+
+        req_url = f"{url}{info['url']}"
+        headers = {"Authorization": f"Bearer {token}"}
+        async with session.post(req_url, headers=headers) as res:
+            await _raise_for_status(res, "Failed to fetch pre-signed url")
+            presigned = await res.json(content_type=None)
+
+        headers2 = {"Content-MD5": presigned["md5sum_base64"]}
+        with open(_path, "rb") as f:
+            async with session.put(presigned["url"], headers=headers2, data=f) as res2:
+                await _raise_for_status(res2, "Failed to upload assets in the project")
+    else:
+        raise ValueError(
+            f"unknown upload method '{info['method']}' for file '{info['path']}'"
+        )
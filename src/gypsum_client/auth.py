@@ -2,10 +2,10 @@ import os
 import time
 from typing import Optional, Union
 
-import requests
 from filelock import FileLock
 
 from ._github import github_access_token
+from ._session import _get_session
 from ._utils import _is_interactive, _remove_slash_url
 from .cache_directory import cache_directory
 from .config import REQUESTS_MOD
@@ -163,7 +163,7 @@ def set_access_token(
             if user_agent:
                 headers["User-Agent"] = user_agent
 
-            r = requests.get(_url, headers=headers, verify=REQUESTS_MOD["verify"])
+            r = _get_session().get(_url, headers=headers, verify=REQUESTS_MOD["verify"])
             try:
                 r.raise_for_status()
             except Exception as e:
@@ -191,7 +191,7 @@ def set_access_token(
 
     headers["Authorization"] = f"Bearer {token}"
 
-    token_req = requests.get(
+    token_req = _get_session().get(
         f"{_remove_slash_url(github_url)}/user",
         headers=headers,
         verify=REQUESTS_MOD["verify"],
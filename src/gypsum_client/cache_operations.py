@@ -0,0 +1,398 @@
+import os
+import shutil
+import time
+import uuid
+from typing import Optional
+
+from filelock import FileLock, Timeout
+
+from ._cache_index import (
+    _forget_version,
+    _indexed_complete,
+    _indexed_usage,
+    _is_indexed_file,
+)
+from ._content_store import OBJECTS_CACHE_NAME
+from ._utils import BUCKET_CACHE_NAME
+from .cache_directory import cache_directory
+from .config import CACHE_MOD
+
+__author__ = "Jayaram Kancherla"
+__copyright__ = "Jayaram Kancherla"
+__license__ = "MIT"
+
+ACCESS_MARKER = "ACCESSED"
+
+# Accesses within this many seconds of the last recorded one are not recorded.
+_TOUCH_INTERVAL = 60
+
+
+def prune_cache(
+    cache_dir: str = cache_directory(),
+    max_bytes: Optional[int] = None,
+    policy: Optional[str] = None,
+) -> dict:
+    """Prune the cache directory to a maximum size.
+
+    Completely saved versions, i.e., those with a ``COMPLETE`` marker in the
+    ``status`` directory of the cache, are removed one at a time until the
+    files in the cache occupy no more than ``max_bytes``. Versions that are
+    incomplete or locked by another call, e.g., while they are being saved,
+    are never removed. Files in the content-addressed store that are no
+    longer used by any version are also removed.
+
+    Each call to :py:func:`~gypsum_client.save_operations.save_version`,
+    :py:func:`~gypsum_client.save_operations.save_file` or
+    :py:func:`~gypsum_client.sync_operations.sync_version` counts as an
+    access to a version, except for repeated accesses within a minute of
+    each other, which are only counted once. If ``max_bytes`` is set in
+    :py:data:`~gypsum_client.config.CACHE_MOD`, the cache is also pruned
+    after each :py:func:`~gypsum_client.save_operations.save_version`.
+
+    Example:
+
+        .. code-block:: python
+
+            # keep at most 10 GiB of files in the cache
+            stats = prune_cache(max_bytes=10 * 1024**3)
+
+    Args:
+        cache_dir:
+            Path to the cache directory.
+
+        max_bytes:
+            Maximum total size of the files in the cache, in bytes.
+            Files shared between versions are only counted once.
+            Defaults to ``max_bytes`` in
+            :py:data:`~gypsum_client.config.CACHE_MOD`. If None, only
+            unused files in the content-addressed store are removed.
+
+        policy:
+            Order in which versions are removed, either ``"lru"`` to remove
+            the least recently accessed versions first, or ``"lfu"`` to
+            remove the least frequently accessed versions first.
+            Defaults to ``eviction`` in
+            :py:data:`~gypsum_client.config.CACHE_MOD`.
+
+    Returns:
+        Dictionary containing ``before`` and ``after``, the total size of the
+        files in the cache in bytes before and after pruning; and ``removed``,
+        a list of the removed versions as ``project/asset/version`` strings.
+    """
+    if max_bytes is None:
+        max_bytes = CACHE_MOD["max_bytes"]
+    if policy is None:
+        policy = CACHE_MOD["eviction"]
+    if policy not in ("lru", "lfu"):
+        raise ValueError("'policy' should be one of 'lru' or 'lfu'.")
+
+    objects = _scan_objects(cache_dir)
+    versions = _scan_versions(cache_dir)
+
+    # Each file is counted once, regardless of how many links it has.
+    sizes = {}
+    links = {}
+    for files in list(objects.values()) + [v["files"] for v in versions]:
+        for ino, size in files:
+            sizes[ino] = size
+            links[ino] = links.get(ino, 0) + 1
+
+    before = sum(sizes.values())
+    usage = before
+    usage -= _remove_unused_objects(objects, links, sizes)
+
+    removed = []
+    if max_bytes is not None and usage > max_bytes:
+        candidates = [v for v in versions if v["complete"]]
+        if policy == "lfu":
+            candidates.sort(key=lambda v: (v["count"], v["accessed"]))
+        else:
+            candidates.sort(key=lambda v: v["accessed"])
+
+        for candidate in candidates:
+            if usage <= max_bytes:
+                break
+
+            if not _remove_version(cache_dir, candidate):
+                continue
+            _forget_version(cache_dir, *candidate["key"])
+            removed.append("/".join(candidate["key"]))
+
+            freed = set()
+            for ino, _ in candidate["files"]:
+                links[ino] -= 1
+                if links[ino] == 0:
+                    freed.add(ino)
+            for ino in freed:
+                usage -= sizes[ino]
+            usage -= _remove_unused_objects(objects, links, sizes)
+
+    return {"before": before, "after": usage, "removed": removed}
+
+
+def cache_usage(
+    project: Optional[str] = None,
+    asset: Optional[str] = None,
+    version: Optional[str] = None,
+    cache_dir: str = cache_directory(),
+) -> int:
+    """Size of the files in the cache directory.
+
+    This is looked up in the index of the cache directory, if available;
+    otherwise, the cache directory is inspected directly.
+
+    Example:
+
+        .. code-block:: python
+
+            save_version("test-R", "basic", "v1")
+            cache_usage("test-R")
+
+    Args:
+        project:
+            Project name. If None, all projects are included.
+
+        asset:
+            Asset name. If None, all assets of ``project`` are included.
+
+        version:
+            Version name. If None, all versions of ``asset`` are included.
+
+        cache_dir:
+            Path to the cache directory.
+
+    Returns:
+        Total size of the files in bytes. Files that are shared between
+        versions are counted for each version. Internal files, e.g.,
+        ``..manifest``, are not included.
+    """
+    if version is not None and asset is None:
+        raise ValueError("'asset' must be specified along with 'version'.")
+    if asset is not None and project is None:
+        raise ValueError("'project' must be specified along with 'asset'.")
+
+    usage = _indexed_usage(cache_dir, project=project, asset=asset, version=version)
+    if usage is not None:
+        return usage
+
+    path = os.path.join(
+        cache_dir,
+        BUCKET_CACHE_NAME,
+        *[x for x in (project, asset, version) if x is not None],
+    )
+    return sum(
+        size
+        for _, size, fpath in _walk_files(path, paths=True)
+        if _is_indexed_file(os.path.basename(fpath))
+    )
+
+
+def is_version_cached(
+    project: str, asset: str, version: str, cache_dir: str = cache_directory()
+) -> bool:
+    """Check whether all files of a version are in the cache directory.
+
+    Example:
+
+        .. code-block:: python
+
+            save_version("test-R", "basic", "v1")
+            is_version_cached("test-R", "basic", "v1")
+
+    Args:
+        project:
+            Project name.
+
+        asset:
+            Asset name.
+
+        version:
+            Version name.
+
+        cache_dir:
+            Path to the cache directory.
+
+    Returns:
+        True if the version was completely saved to the cache, e.g., by
+        :py:func:`~gypsum_client.save_operations.save_version`.
+    """
+    complete = _indexed_complete(cache_dir, project, asset, version)
+    if complete is not None:
+        return complete
+
+    return os.path.exists(
+        os.path.join(cache_dir, "status", project, asset, version, "COMPLETE")
+    )
+
+
+def _touch_version(cache: str, project: str, asset: str, version: str):
+    marker = os.path.join(cache, "status", project, asset, version, ACCESS_MARKER)
+
+    # Avoids rewriting the marker for every file of a version.
+    try:
+        age = time.time() - os.path.getmtime(marker)
+        if 0 <= age < _TOUCH_INTERVAL:
+            return
+    except OSError:
+        pass
+
+    count = 0
+    try:
+        with open(marker, "r") as handle:
+            count = int(handle.read().strip() or 0)
+    except (OSError, ValueError):
+        pass
+
+    try:
+        os.makedirs(os.path.dirname(marker), exist_ok=True)
+        tmp = f"{marker}.{uuid.uuid4().hex}.tmp"
+        with open(tmp, "w") as handle:
+            handle.write(str(count + 1))
+        os.replace(tmp, marker)
+    except OSError:
+        # Access statistics are only advisory.
+        pass
+
+
+def _prune_if_needed(cache: str):
+    if CACHE_MOD["max_bytes"] is not None:
+        prune_cache(cache, max_bytes=CACHE_MOD["max_bytes"])
+
+
+def _walk_files(path: str, paths: bool = False) -> list:
+    found = []
+    pending = [path]
+    while pending:
+        current = pending.pop()
+        try:
+            entries = list(os.scandir(current))
+        except OSError:
+            continue
+
+        for entry in entries:
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    pending.append(entry.path)
+                elif entry.is_file(follow_symlinks=False):
+                    info = entry.stat(follow_symlinks=False)
+                    ino = (info.st_dev, info.st_ino)
+                    if paths:
+                        found.append((ino, info.st_size, entry.path))
+                    else:
+                        found.append((ino, info.st_size))
+            except OSError:
+                continue
+
+    return found
+
+
+def _subdirectories(path: str) -> list:
+    try:
+        return sorted(
+            entry.name
+            for entry in os.scandir(path)
+            if entry.is_dir(follow_symlinks=False)
+        )
+    except OSError:
+        return []
+
+
+def _scan_objects(cache: str) -> dict:
+    objects = {}
+    root = os.path.join(cache, OBJECTS_CACHE_NAME)
+    for prefix in _subdirectories(root):
+        for ino, size, path in _walk_files(os.path.join(root, prefix), paths=True):
+            if not path.endswith(".tmp"):
+                objects[path] = [(ino, size)]
+
+    return objects
+
+
+def _scan_versions(cache: str) -> list:
+    versions = []
+    bucket = os.path.join(cache, BUCKET_CACHE_NAME)
+    for project in _subdirectories(bucket):
+        for asset in _subdirectories(os.path.join(bucket, project)):
+            for version in _subdirectories(os.path.join(bucket, project, asset)):
+                status = os.path.join(cache, "status", project, asset, version)
+                complete = os.path.join(status, "COMPLETE")
+                marker = os.path.join(status, ACCESS_MARKER)
+
+                accessed = 0
+                count = 0
+                for path in (complete, marker):
+                    try:
+                        accessed = max(accessed, os.path.getmtime(path))
+                    except OSError:
+                        pass
+                try:
+                    with open(marker, "r") as handle:
+                        count = int(handle.read().strip() or 0)
+                except (OSError, ValueError):
+                    pass
+
+                versions.append(
+                    {
+                        "key": (project, asset, version),
+                        "complete": os.path.exists(complete),
+                        "accessed": accessed,
+                        "count": count,
+                        "files": _walk_files(
+                            os.path.join(bucket, project, asset, version)
+                        ),
+                    }
+                )
+
+    return versions
+
+
+def _remove_unused_objects(objects: dict, links: dict, sizes: dict) -> int:
+    freed = 0
+    for path, files in list(objects.items()):
+        ino = files[0][0]
+        if links[ino] > 1:
+            continue
+
+        # The store holds the only remaining link to this file.
+        try:
+            if os.stat(path).st_nlink > 1:
+                continue
+            os.unlink(path)
+        except OSError:
+            continue
+
+        links[ino] -= 1
+        freed += sizes[ino]
+        del objects[path]
+
+    return freed
+
+
+def _remove_version(cache: str, candidate: dict) -> bool:
+    project, asset, version = candidate["key"]
+    status = os.path.join(cache, "status", project, asset, version)
+
+    # Versions that are being saved or read hold this lock.
+    lock = FileLock(status + ".LOCK", timeout=0)
+    try:
+        lock.acquire()
+    except Timeout:
+        return False
+
+    try:
+        # Removing the marker first ensures that an interrupted removal
+        # does not leave behind a version that appears to be complete.
+        try:
+            os.unlink(os.path.join(status, "COMPLETE"))
+        except OSError:
+            pass
+
+        shutil.rmtree(
+            os.path.join(cache, BUCKET_CACHE_NAME, project, asset, version),
+            ignore_errors=True,
+        )
+        shutil.rmtree(status, ignore_errors=True)
+    finally:
+        lock.release()
+
+    return True
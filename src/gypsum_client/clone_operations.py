@@ -30,6 +30,14 @@ downloading the files from the existing version,
 assuming that the modifications associated with the former can be
 achieved without reading any of the latter.
 
+Alternatively, ``download="lazy"`` creates the same symlinks without
+downloading anything, but the destination can also be read by opening its
+files with :py:func:`~.open_clone_file`.
+Each file is then downloaded into the cache the first time it is opened,
+so only the files that are actually used are ever downloaded.
+The cache directory and URL are recorded in the cache, so that
+:py:func:`~.open_clone_file` does not need to be told about them.
+
 On Windows, the user may not have permissions to create symbolic links,
 so the function will transparently fall back to creating hard links or
 copies instead.
@@ -39,26 +47,30 @@ It also assumes that download=True as dangling links/copies cannot be created.
 """
 
 import errno
+import json
 import os
 import shutil
+from typing import IO, Optional, Union
 
 from ._utils import BUCKET_CACHE_NAME
 from .cache_directory import cache_directory
 from .fetch_operations import fetch_manifest
 from .rest_url import rest_url
-from .save_operations import save_version
+from .save_operations import save_file, save_version
 
 __author__ = "Jayaram Kancherla"
 __copyright__ = "Jayaram Kancherla"
 __license__ = "MIT"
 
+LAZY_CLONE_MARKER = "LAZY_CLONE"
+
 
 def clone_version(
     project: str,
     asset: str,
     version: str,
     destination: str,
-    download: bool = True,
+    download: Union[bool, str] = True,
     cache_dir: str = cache_directory(),
     url: str = rest_url(),
     **kwargs,
@@ -103,6 +115,12 @@ def clone_version(
             Whether the version's files should be downloaded first.
             This can be set to `False` to create a clone without
             actually downloading any of the version's files.
+
+            Alternatively, ``"lazy"`` creates exactly the same symlinks as
+            `False`, without downloading any files, and records ``url`` in
+            ``cache_dir``. Each file is then downloaded when it is first
+            opened with :py:func:`~.open_clone_file`, which finds the cache
+            directory and URL from this record.
             Defaults to True.
 
         url:
@@ -114,11 +132,24 @@ def clone_version(
 
             Only used if ``download`` is `True`.
     """
-    if download:
+    if isinstance(download, str) and download != "lazy":
+        raise ValueError("'download' should be a boolean or 'lazy'.")
+
+    if download != "lazy" and bool(download):
         save_version(project, asset, version, cache_dir=cache_dir, url=url, **kwargs)
 
     final_cache = os.path.join(cache_dir, BUCKET_CACHE_NAME, project, asset, version)
     listing = fetch_manifest(project, asset, version, cache_dir=cache_dir, url=url)
+    _create_clone_links(listing, final_cache, destination)
+
+    if download == "lazy":
+        status = os.path.join(cache_dir, "status", project, asset, version)
+        os.makedirs(status, exist_ok=True)
+        with open(os.path.join(status, LAZY_CLONE_MARKER), "w") as handle:
+            json.dump({"url": url}, handle)
+
+
+def _create_clone_links(listing: dict, final_cache: str, destination: str):
     os.makedirs(destination, exist_ok=True)
 
     # Normalize final_cache path
@@ -145,3 +176,138 @@ def clone_version(
                 raise RuntimeError(
                     f"failed to create a symbolic link to '{target}' at '{dpath}'."
                 ) from e
+
+
+def open_clone_file(
+    path: str,
+    mode: str = "r",
+    cache_dir: Optional[str] = None,
+    url: Optional[str] = None,
+    **kwargs,
+) -> IO:
+    """Open a file in a cloned directory, downloading it if necessary.
+
+    If ``path`` is a symlink to a file of a version in the cache that has
+    not been downloaded yet, e.g., after
+    :py:func:`~.clone_version` with ``download="lazy"``,
+    the file is downloaded into the cache with
+    :py:func:`~gypsum_client.save_operations.save_file` before it is opened.
+    Other files are opened as is.
+
+    Example:
+
+        .. code-block:: python
+
+            import tempfile
+
+            dest = tempfile.mkdtemp()
+            clone_version("test-R", "basic", "v1", destination=dest, download="lazy")
+
+            with open_clone_file(os.path.join(dest, "blah.txt")) as handle:
+                print(handle.read())
+
+    Args:
+        path:
+            Path to a file in the destination of :py:func:`~.clone_version`.
+
+        mode:
+            Mode in which to open the file. Only reading modes are allowed
+            for symlinks into the cache, as the cached files should not be
+            modified.
+
+        cache_dir:
+            Path to the cache directory.
+            This should be the same as that used in :py:func:`~.clone_version`.
+            If None, this is taken from the record of a clone with
+            ``download="lazy"``, otherwise it defaults to
+            :py:func:`~gypsum_client.cache_directory.cache_directory`.
+
+        url:
+            URL of the gypsum REST API.
+            If None, this is taken from the record of a clone with
+            ``download="lazy"``, otherwise it defaults to
+            :py:func:`~gypsum_client.rest_url.rest_url`.
+
+        **kwargs:
+            Further arguments to pass to :py:func:`open`.
+
+    Returns:
+        The opened file object.
+    """
+    if cache_dir is None or url is None:
+        record = _lazy_clone_record(path)
+        if record is not None:
+            if cache_dir is None:
+                cache_dir = record[0]
+            if url is None:
+                url = record[1]
+
+    if cache_dir is None:
+        cache_dir = cache_directory()
+    if url is None:
+        url = rest_url()
+
+    target = _cached_clone_target(path, cache_dir)
+    if target is not None:
+        if any(x in mode for x in "wax+"):
+            raise ValueError(
+                f"'{path}' links to a file in the cache and can only be "
+                "opened for reading."
+            )
+
+        project, asset, version, relpath = target
+        full = os.path.join(
+            cache_dir, BUCKET_CACHE_NAME, project, asset, version, relpath
+        )
+        if not os.path.exists(full):
+            save_file(project, asset, version, relpath, cache_dir=cache_dir, url=url)
+
+    return open(path, mode, **kwargs)
+
+
+def _lazy_clone_record(path: str) -> Optional[tuple]:
+    if not os.path.islink(path):
+        return None
+
+    target = os.readlink(path)
+    if not os.path.isabs(target):
+        target = os.path.join(os.path.dirname(path), target)
+
+    # The link target is '{cache}/bucket/{project}/{asset}/{version}/{path}',
+    # where the path may contain further directories.
+    parts = os.path.abspath(target).split(os.sep)
+    for i in range(len(parts) - 5, -1, -1):
+        if parts[i] != BUCKET_CACHE_NAME:
+            continue
+
+        cache = os.sep.join(parts[:i]) or os.sep
+        marker = os.path.join(cache, "status", *parts[i + 1 : i + 4], LAZY_CLONE_MARKER)
+        try:
+            with open(marker, "r") as handle:
+                return cache, json.load(handle)["url"]
+        except (OSError, ValueError, KeyError):
+            continue
+
+    return None
+
+
+def _cached_clone_target(path: str, cache_dir: str):
+    if not os.path.islink(path):
+        return None
+
+    target = os.readlink(path)
+    if not os.path.isabs(target):
+        target = os.path.join(os.path.dirname(path), target)
+
+    bucket = os.path.abspath(os.path.join(cache_dir, BUCKET_CACHE_NAME))
+    try:
+        relative = os.path.relpath(os.path.abspath(target), bucket)
+    except ValueError:
+        # Paths on different drives on Windows.
+        return None
+
+    parts = relative.split(os.sep)
+    if parts[0] == os.pardir or len(parts) < 4:
+        return None
+
+    return parts[0], parts[1], parts[2], "/".join(parts[3:])
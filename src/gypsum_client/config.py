@@ -11,10 +11,149 @@ Example:
         # to set verify to False
         REQUESTS_MOD["verify"] = False
 
+All requests are routed through a single pooled HTTP session.
+The remaining keys in ``REQUESTS_MOD`` control this connection pool:
+
+- ``pool_connections``, the number of distinct hosts for which
+  connection pools are kept alive.
+- ``pool_maxsize``, the maximum number of connections kept alive per host.
+- ``pool_block``, whether to block when ``pool_maxsize`` connections to a
+  host are already in use, i.e., enforcing a hard per-host limit.
+  Otherwise, extra connections are opened and discarded after use.
+- ``keep_alive``, whether connections should be re-used across requests.
+
+Changes to any of these keys take effect on the next request.
+
+Example:
+
+    .. code-block::python
+
+        from gypsum_client import REQUESTS_MOD
+        # allow more concurrent connections to the gypsum backend
+        REQUESTS_MOD["pool_maxsize"] = 32
+
+``CACHE_MOD`` controls the local cache of gypsum files:
+
+- ``deduplicate``, whether to keep a content-addressed store of downloaded
+  files inside the cache directory, keyed by the MD5 checksums in each
+  version's manifest. Files that are already in the store are reflinked,
+  hard-linked or copied to their destination instead of being downloaded.
+- ``hash_cache``, whether to remember the MD5 checksums of local files in a
+  database inside the cache directory, so that unchanged files are not
+  hashed again when they are uploaded.
+- ``hash_cache_max_entries``, the maximum number of files in the hash
+  cache. The least recently used entries are evicted beyond this limit.
+  If None, entries are never evicted.
+- ``list_cache_ttl``, the number of seconds for which the results of
+  ``list_projects``, ``list_assets`` and ``list_versions`` are kept in
+  memory and re-used by later calls. Listings are invalidated when they
+  are modified through this package, e.g., by ``remove_version``, but
+  changes by other clients are only seen after this interval.
+  If 0, listings are not cached.
+- ``list_cache_max_entries``, the maximum number of cached listings.
+  The least recently used listings are evicted beyond this limit.
+- ``manifest_cache_max_entries``, the maximum number of parsed manifests
+  that are kept in memory by ``fetch_manifest``, evicting the least
+  recently used. Manifests of versions that are known to be on probation,
+  from ``fetch_summary`` or a probational ``start_upload``, are not kept.
+  If 0, manifests are read and parsed on every call.
+- ``latest_cache_ttl``, the number of seconds for which the latest version
+  of an asset from ``fetch_latest`` is re-used without contacting the API.
+  After this, it is revalidated with a conditional request, which returns
+  no content if the latest version is unchanged. If 0, every call
+  revalidates.
+- ``latest_stale_while_revalidate``, the number of seconds after
+  ``latest_cache_ttl`` during which the previous latest version is returned
+  immediately while it is revalidated in the background.
+- ``latest_cache_max_entries``, the maximum number of assets for which the
+  latest version is kept, evicting the least recently used. If 0, the
+  latest version is fetched in full on every call.
+- ``max_bytes``, the maximum total size of the files in the cache directory.
+  If set, the cache is pruned with ``prune_cache`` after each call to
+  ``save_version``, removing completely saved versions until the cache
+  fits. If None, the cache is never pruned automatically.
+- ``eviction``, the order in which versions are removed when pruning,
+  either ``"lru"`` (least recently accessed first) or ``"lfu"`` (least
+  frequently accessed first).
+- ``index``, whether to keep an index of the cached files in a database
+  inside the cache directory, so that ``cache_usage`` and
+  ``is_version_cached`` do not need to inspect the cache directory.
+
+Example:
+
+    .. code-block::python
+
+        from gypsum_client import CACHE_MOD
+        CACHE_MOD["deduplicate"] = False
+
+        # re-use listings for up to a minute
+        CACHE_MOD["list_cache_ttl"] = 60
+
+``DOWNLOAD_MOD`` controls how large files are downloaded:
+
+- ``multipart_threshold``, the size in bytes above which a file is split
+  into byte ranges that are downloaded concurrently, each over its own
+  connection. Smaller files are streamed over a single connection.
+- ``part_size``, the size in bytes of each range.
+- ``part_concurrency``, the maximum number of ranges of a single file that
+  are downloaded at the same time. Setting this to 1 disables multi-part
+  downloads.
+
+Example:
+
+    .. code-block::python
+
+        from gypsum_client import DOWNLOAD_MOD
+        # split files larger than 256 MiB into 32 MiB ranges
+        DOWNLOAD_MOD["multipart_threshold"] = 256 * 1024 * 1024
+        DOWNLOAD_MOD["part_size"] = 32 * 1024 * 1024
+
+``UPLOAD_MOD`` controls how files are uploaded:
+
+- ``part_concurrency``, the maximum number of parts of a single file that
+  are uploaded at the same time, for files that the backend asks to be
+  uploaded in multiple parts.
+
+Example:
+
+    .. code-block::python
+
+        from gypsum_client import UPLOAD_MOD
+        UPLOAD_MOD["part_concurrency"] = 8
+
 """
 
 __author__ = "Jayaram Kancherla"
 __copyright__ = "Jayaram Kancherla"
 __license__ = "MIT"
 
-REQUESTS_MOD = {"verify": True}
+REQUESTS_MOD = {
+    "verify": True,
+    "pool_connections": 10,
+    "pool_maxsize": 10,
+    "pool_block": False,
+    "keep_alive": True,
+}
+
+CACHE_MOD = {
+    "deduplicate": True,
+    "hash_cache": True,
+    "hash_cache_max_entries": 1000000,
+    "list_cache_ttl": 0,
+    "list_cache_max_entries": 1024,
+    "manifest_cache_max_entries": 64,
+    "latest_cache_ttl": 0,
+    "latest_stale_while_revalidate": 0,
+    "latest_cache_max_entries": 10000,
+    "max_bytes": None,
+    "eviction": "lru",
+    "index": True,
+}
+
+DOWNLOAD_MOD = {
+    "multipart_threshold": 64 * 1024 * 1024,
+    "part_size": 16 * 1024 * 1024,
+    "part_concurrency": 4,
+}
+
+UPLOAD_MOD = {"part_concurrency": 4}
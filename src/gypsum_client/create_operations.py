@@ -1,8 +1,8 @@
 from typing import List, Union
 from urllib.parse import quote_plus
 
-import requests
-
+from ._listing_cache import _invalidate_listings
+from ._session import _get_session
 from ._utils import _remove_slash_url, _sanitize_uploaders
 from .auth import access_token
 from .config import REQUESTS_MOD
@@ -95,7 +95,7 @@ def create_project(
     if len(quota) > 0:
         body["quota"] = quota
 
-    req = requests.post(
+    req = _get_session().post(
         f"{url}/create/{quote_plus(project)}",
         json=body,
         headers={"Authorization": "Bearer " + token},
@@ -107,3 +107,5 @@ def create_project(
         raise Exception(
             f"Failed to create a project, {req.status_code} and reason: {req.text}"
         ) from e
+
+    _invalidate_listings(url=url, project=project)
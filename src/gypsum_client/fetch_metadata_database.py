@@ -11,9 +11,9 @@ import tempfile
 import time
 import warnings
 
-import requests
 from filelock import FileLock
 
+from ._session import _get_session
 from ._utils import _download_and_rename_file
 from .cache_directory import cache_directory
 from .config import REQUESTS_MOD
@@ -120,7 +120,7 @@ def get_last_modified_date(base_url):
     mod_time = None
     try:
         url = base_url + "modified"
-        response = requests.get(url, verify=REQUESTS_MOD["verify"])
+        response = _get_session().get(url, verify=REQUESTS_MOD["verify"])
         mod_time = float(response.text)
     except Exception as e:
         warnings.warn(
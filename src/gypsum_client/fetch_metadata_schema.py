@@ -1,9 +1,9 @@
 import os
 import tempfile
 
-import requests
 from filelock import FileLock
 
+from ._session import _get_session
 from .cache_directory import cache_directory
 from .config import REQUESTS_MOD
 
@@ -72,7 +72,7 @@ def fetch_metadata_schema(
     _lock = FileLock(cache_path + ".LOCK")
     with _lock:
         url = "https://artifactdb.github.io/bioconductor-metadata-index/" + name
-        response = requests.get(url, verify=REQUESTS_MOD["verify"])
+        response = _get_session().get(url, verify=REQUESTS_MOD["verify"])
         with open(cache_path, "wb") as f:
             f.write(response.content)
 
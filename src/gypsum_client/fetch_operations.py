@@ -1,5 +1,12 @@
 import os
 
+from ._latest_cache import _fetch_latest_json
+from ._manifest_cache import (
+    _get_manifest,
+    _manifest_key,
+    _set_manifest,
+    _set_probation,
+)
 from ._utils import (
     BUCKET_CACHE_NAME,
     _cast_datetime,
@@ -17,6 +24,12 @@ __license__ = "MIT"
 def fetch_latest(project: str, asset: str, url: str = rest_url()) -> str:
     """Fetch the latest version of a project's asset.
 
+    The latest version of each asset is kept in memory and revalidated with
+    a conditional request, which is cheap if it has not changed. It can also
+    be re-used without any request for a configurable period, see
+    ``latest_cache_ttl`` and ``latest_stale_while_revalidate`` in
+    :py:data:`~gypsum_client.config.CACHE_MOD`.
+
     See Also:
         :py:func:`~gypsum_client.refresh_operations.refresh_latest`,
         to refresh the latest version.
@@ -40,7 +53,7 @@ def fetch_latest(project: str, asset: str, url: str = rest_url()) -> str:
     Returns:
         Latest version of the project.
     """
-    resp = _fetch_json(f"{project}/{asset}/..latest", url=url)
+    resp = _fetch_latest_json(project, asset, url=url)
     return resp["version"]
 
 
@@ -54,6 +67,12 @@ def fetch_manifest(
 ) -> dict:
     """Fetch the manifest for a version of an asset of a project.
 
+    Manifests are also kept in memory, see ``manifest_cache_max_entries`` in
+    :py:data:`~gypsum_client.config.CACHE_MOD`. Later calls for the same
+    version return the same dictionary, which should not be modified.
+    This is skipped for versions that are known to be on probation, e.g.,
+    from an earlier call to :py:func:`~.fetch_summary`.
+
     Example:
 
         .. code-block:: python
@@ -75,6 +94,7 @@ def fetch_manifest(
 
         overwrite:
             Whether to overwrite existing file in cache.
+            This also replaces the manifest kept in memory.
 
         url:
             URL to the gypsum compatible API.
@@ -91,7 +111,22 @@ def fetch_manifest(
         If the link destination is itself a link, an ``ancestor`` list will be
         present that specifies the final location of the file after resolving all intermediate links.
     """
-    return _fetch_cacheable_json(
+    key = _manifest_key(url, project, asset, version)
+    if not overwrite:
+        manifest = _get_manifest(key)
+        # The manifest should still be saved in this cache directory,
+        # as other functions expect to find it there.
+        if manifest is not None and (
+            cache_dir is None
+            or os.path.exists(
+                os.path.join(
+                    cache_dir, BUCKET_CACHE_NAME, project, asset, version, "..manifest"
+                )
+            )
+        ):
+            return manifest
+
+    manifest = _fetch_cacheable_json(
         project,
         asset,
         version,
@@ -101,6 +136,9 @@ def fetch_manifest(
         overwrite=overwrite,
     )
 
+    _set_manifest(key, manifest)
+    return manifest
+
 
 def fetch_permissions(project: str, url: str = rest_url()) -> dict:
     """Fetch the permissions for a project.
@@ -237,6 +275,12 @@ def fetch_summary(
     _out["upload_start"] = _cast_datetime(_out["upload_start"])
     _out["upload_finish"] = _cast_datetime(_out["upload_finish"])
 
+    # Manifests of versions on probation are not kept in memory.
+    _set_probation(
+        _manifest_key(url, project, asset, version),
+        _out.get("on_probation", False) is True,
+    )
+
     if "on_probation" in _out:
         if _out["on_probation"] is True and cache_dir is not None:
             _out_path = os.path.join(
@@ -1,6 +1,8 @@
-import requests
+from typing import Iterable, Iterator, Optional
 
-from ._utils import _list_for_prefix
+from ._listing_cache import _invalidate_listings
+from ._session import _get_session
+from ._utils import _iter_for_prefix, _list_for_prefix, _stream_listing
 from .config import REQUESTS_MOD
 from .rest_url import rest_url
 
@@ -124,7 +126,7 @@ def list_files(
     if prefix is not None:
         _prefix = f"{_prefix}{prefix}"
 
-    req = requests.get(
+    req = _get_session().get(
         f"{url}/list",
         params={"recursive": "true", "prefix": _prefix},
         verify=REQUESTS_MOD["verify"],
@@ -135,14 +137,197 @@ def list_files(
         raise Exception(
             f"Failed to list files in a project, {req.status_code} and reason: {req.text}"
         ) from e
-    resp = req.json()
 
-    resp = [val[_trunc:] for val in resp]
+    return _trim_file_listing(
+        req.json(), trunc=_trunc, prefix=prefix, include_dot=include_dot
+    )
 
-    if prefix is not None:
-        resp = [val for val in resp if val.startswith(prefix)]
 
-    if include_dot is False:
-        resp = [val for val in resp if not val.startswith("..")]
+def invalidate_list_cache(
+    project: Optional[str] = None,
+    asset: Optional[str] = None,
+    url: Optional[str] = None,
+):
+    """Invalidate cached listings.
+
+    Results of :py:func:`~.list_projects`, :py:func:`~.list_assets` and
+    :py:func:`~.list_versions` are cached for ``list_cache_ttl`` seconds,
+    see :py:data:`~gypsum_client.config.CACHE_MOD`. Listings are invalidated
+    automatically when the backend is modified by this package; this function
+    is useful when another client has modified the backend.
+
+    Example:
+
+        .. code-block:: python
+
+            invalidate_list_cache("test-R", "basic")
+            vers = list_versions("test-R", "basic")
+
+    Args:
+        project:
+            Project name. If None, all cached listings are invalidated.
+
+        asset:
+            Asset name. If None, all cached listings for ``project``
+            are invalidated, along with the listing of projects.
+
+            Otherwise, the listings of the versions of ``asset``, the
+            assets of ``project`` and the projects are invalidated.
+
+        url:
+            URL to the gypsum compatible API.
+            If None, cached listings for all APIs are invalidated.
+    """
+    _invalidate_listings(url=url, project=project, asset=asset)
+
+
+def _trim_file_listing(resp: list, trunc: int, prefix: str, include_dot: bool):
+    return list(
+        _filter_file_listing(resp, trunc=trunc, prefix=prefix, include_dot=include_dot)
+    )
+
+
+def _filter_file_listing(
+    resp: Iterable[str], trunc: int, prefix: str, include_dot: bool
+) -> Iterator[str]:
+    for val in resp:
+        val = val[trunc:]
+
+        if prefix is not None and not val.startswith(prefix):
+            continue
+
+        if include_dot is False and val.startswith(".."):
+            continue
+
+        yield val
+
+
+def iter_projects(url: str = rest_url()) -> Iterator[str]:
+    """Iterate over all projects in the gypsum backend.
+
+    Unlike :py:func:`~.list_projects`, project names are yielded while the
+    listing is being received, without holding the entire listing in memory.
+
+    Example:
+
+        .. code-block:: python
+
+            for prj in iter_projects():
+                print(prj)
+
+    Args:
+        url:
+            URL to the gypsum compatible API.
+
+    Returns:
+        Iterator over project names.
+    """
+    return _iter_for_prefix(prefix=None, url=url)
+
+
+def iter_assets(project: str, url: str = rest_url()) -> Iterator[str]:
+    """Iterate over all assets in a project.
+
+    Streaming counterpart of :py:func:`~.list_assets`.
+
+    Example:
+
+        .. code-block:: python
+
+            for asset in iter_assets("test-R"):
+                print(asset)
+
+    Args:
+        project:
+            Project name.
+
+        url:
+            URL to the gypsum compatible API.
+
+    Returns:
+        Iterator over asset names.
+    """
+    return _iter_for_prefix(f"{project}/", url=url)
+
 
-    return resp
+def iter_versions(project: str, asset: str, url: str = rest_url()) -> Iterator[str]:
+    """Iterate over all versions of a project asset.
+
+    Streaming counterpart of :py:func:`~.list_versions`.
+
+    Example:
+
+        .. code-block:: python
+
+            for ver in iter_versions("test-R", "basic"):
+                print(ver)
+
+    Args:
+        project:
+            Project name.
+
+        asset:
+            Asset name.
+
+        url:
+            URL to the gypsum compatible API.
+
+    Returns:
+        Iterator over versions.
+    """
+    return _iter_for_prefix(f"{project}/{asset}/", url=url)
+
+
+def iter_files(
+    project: str,
+    asset: str,
+    version: str,
+    prefix: str = None,
+    include_dot: bool = True,
+    url: str = rest_url(),
+) -> Iterator[str]:
+    """Iterate over all files for a specified version of a project and asset.
+
+    Streaming counterpart of :py:func:`~.list_files`. The listing is parsed
+    incrementally as it is received, and the ``prefix`` and ``include_dot``
+    filters are applied to each file in turn, so the first files are
+    available before the entire listing has arrived.
+
+    Example:
+
+        .. code-block:: python
+
+            for path in iter_files("test-R", "basic", "v1"):
+                print(path)
+
+    Args:
+        project:
+            Project name.
+
+        asset:
+            Asset name.
+
+        version:
+            Version name.
+
+        prefix:
+            Prefix for the object key, see :py:func:`~.list_files`.
+
+        include_dot:
+            Whether to list files with ``..`` in their names.
+
+        url:
+            URL to the gypsum compatible API.
+
+    Returns:
+        Iterator over relative paths of files associated with the versioned asset.
+    """
+    _prefix = f"{project}/{asset}/{version}/"
+    _trunc = len(_prefix)
+    if prefix is not None:
+        _prefix = f"{_prefix}{prefix}"
+
+    listing = _stream_listing(f"{url}/list", {"recursive": "true", "prefix": _prefix})
+    return _filter_file_listing(
+        listing, trunc=_trunc, prefix=prefix, include_dot=include_dot
+    )
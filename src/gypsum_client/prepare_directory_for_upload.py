@@ -55,13 +55,17 @@ Example:
 """
 
 import os
-from typing import Literal
+from concurrent.futures import ThreadPoolExecutor
+from typing import Literal, Optional
 
+from ._hashing import _md5_of_files
 from ._utils import (
     BUCKET_CACHE_NAME,
     _sanitize_path,
 )
 from .cache_directory import cache_directory
+from .fetch_operations import fetch_latest, fetch_manifest
+from .rest_url import rest_url
 
 __author__ = "Jayaram Kancherla"
 __copyright__ = "Jayaram Kancherla"
@@ -72,6 +76,9 @@ def prepare_directory_upload(
     directory: str,
     links: Literal["auto", "always", "never"] = "auto",
     cache_dir: str = cache_directory(),
+    checksums: bool = False,
+    concurrent: int = 1,
+    sizes: bool = False,
 ) -> dict:
     """Prepare to upload a directory's contents.
 
@@ -96,11 +103,33 @@ def prepare_directory_upload(
 
         cache_dir:
             Path to the cache directory, used to convert symlinks into upload links.
+            This also contains the hash cache used when ``checksums=True``.
+
+        checksums:
+            Whether to compute the size and MD5 checksum of each file.
+            Files that have not changed since they were last hashed are
+            looked up in the hash cache instead, see ``hash_cache`` in
+            :py:data:`~gypsum_client.config.CACHE_MOD`.
+            Defaults to False.
+
+        concurrent:
+            Number of subdirectories to scan at the same time, which helps
+            on network filesystems. This is also the number of files to hash
+            at the same time, if ``checksums=True``.
+            Defaults to 1.
+
+        sizes:
+            Whether to report the size of each file. This is implied
+            by ``checksums=True``.
+            Defaults to False.
 
     Returns:
         Dictionary containing:
         - `files`: list of strings to be used as `files=`
         in :py:func:`~gypsum_client.start_upload.start_upload`.
+        If ``sizes=True``, this is instead a list of dictionaries
+        containing the ``path`` and ``size`` of each file;
+        if ``checksums=True``, the ``md5sum`` is also reported.
         - `links`: dictionary to be used as `links=` in
         :py:func:`~gypsum_client.start_upload.start_upload`.
 
@@ -114,57 +143,242 @@ def prepare_directory_upload(
     out_files = []
     out_links = []
 
+    hash_cache = cache_dir
     cache_dir = _normalize_and_sanitize_path(cache_dir)
     if not cache_dir.endswith("/"):
         cache_dir += "/"
 
-    for root, _, files in os.walk(directory):
-        for name in files:
-            rel_path = os.path.relpath(os.path.join(root, name), directory)
-
-            if not os.path.islink(os.path.join(directory, rel_path)):
-                out_files.append(rel_path)
-                continue
-
-            dest = os.readlink(os.path.join(directory, rel_path))
+    # Stat results of regular files are kept from the scan, so that
+    # sizes and checksums do not need another system call per file.
+    infos = {}
+    for rel_path, entry in _scan_directory(directory, concurrent=concurrent):
+        if not entry.is_symlink():
+            out_files.append(rel_path)
+            infos[rel_path] = entry
+            continue
 
-            if links == "never":
-                if not os.path.exists(dest):
-                    raise ValueError(
-                        f"Cannot use a dangling link to '{dest}' as a regular upload."
-                    )
-                out_files.append(rel_path)
-                continue
-
-            dest = _normalize_and_sanitize_path(dest)
-            dest_components = _match_path_to_cache(dest, cache_dir)
-
-            if dest_components:
-                out_links.append(
-                    {
-                        "from.path": rel_path,
-                        "to.project": dest_components["project"],
-                        "to.asset": dest_components["asset"],
-                        "to.version": dest_components["version"],
-                        "to.path": dest_components["path"],
-                    }
-                )
-                continue
+        dest = os.readlink(entry.path)
 
-            if links == "always":
-                raise ValueError(
-                    f"Failed to convert symlink '{dest}' to an upload link."
-                )
-            elif not os.path.exists(dest):
+        if links == "never":
+            if not os.path.exists(dest):
                 raise ValueError(
                     f"Cannot use a dangling link to '{dest}' as a regular upload."
                 )
-
             out_files.append(rel_path)
+            continue
+
+        dest = _normalize_and_sanitize_path(dest)
+        dest_components = _match_path_to_cache(dest, cache_dir)
+
+        if dest_components:
+            out_links.append(
+                {
+                    "from.path": rel_path,
+                    "to.project": dest_components["project"],
+                    "to.asset": dest_components["asset"],
+                    "to.version": dest_components["version"],
+                    "to.path": dest_components["path"],
+                }
+            )
+            continue
+
+        if links == "always":
+            raise ValueError(f"Failed to convert symlink '{dest}' to an upload link.")
+        elif not os.path.exists(dest):
+            raise ValueError(
+                f"Cannot use a dangling link to '{dest}' as a regular upload."
+            )
+
+        out_files.append(rel_path)
+
+    if checksums or sizes:
+        targets = [os.path.join(directory, f) for f in out_files]
+        stats = [
+            infos[f].stat(follow_symlinks=False) if f in infos else os.stat(t)
+            for f, t in zip(out_files, targets)
+        ]
+
+        if checksums:
+            md5sums = _md5_of_files(
+                targets, concurrent=concurrent, cache=hash_cache, infos=stats
+            )
+            out_files = [
+                {"path": f, "size": st.st_size, "md5sum": m}
+                for f, st, m in zip(out_files, stats, md5sums)
+            ]
+        else:
+            out_files = [
+                {"path": f, "size": st.st_size} for f, st in zip(out_files, stats)
+            ]
 
     return {"files": out_files, "links": out_links}
 
 
+def link_unchanged_files(
+    prepared: dict,
+    directory: str,
+    project: str,
+    asset: str,
+    version: Optional[str] = None,
+    cache_dir: str = cache_directory(),
+    url: str = rest_url(),
+    concurrent: int = 1,
+) -> dict:
+    """Convert unchanged files into upload links.
+
+    Compare the files to be uploaded against the manifest of an existing
+    version of the same asset. Files with the same size and MD5 checksum
+    as a file in that version are converted into upload links, so they
+    are neither listed in the request to
+    :py:func:`~gypsum_client.upload_api_operations.start_upload`
+    nor uploaded.
+
+    See Also:
+        :py:func:`~.prepare_directory_upload`, to create ``prepared``.
+
+    Example:
+
+        .. code-block:: python
+
+            prepped = prepare_directory_upload(dest, checksums=True)
+            prepped = link_unchanged_files(prepped, dest, "test-R", "basic")
+
+            init = start_upload(
+                "test-R",
+                "basic",
+                "v2",
+                files=prepped["files"],
+                links=prepped["links"],
+                directory=dest,
+            )
+
+    Args:
+        prepared:
+            Dictionary containing ``files`` and ``links``, typically
+            the output of :py:func:`~.prepare_directory_upload`.
+
+        directory:
+            Path to the directory containing the ``files``.
+
+        project:
+            Project name.
+
+        asset:
+            Asset name.
+
+        version:
+            Name of the version to compare against. If None, the latest
+            version of the asset is used, see
+            :py:func:`~gypsum_client.fetch_operations.fetch_latest`.
+
+        cache_dir:
+            Path to the cache directory, used to cache the manifest of
+            ``version`` and the checksums of the files.
+
+        url:
+            URL to the gypsum compatible API.
+
+        concurrent:
+            Number of files to hash at the same time, if the checksums in
+            ``prepared`` are not already available.
+            Defaults to 1.
+
+    Returns:
+        Dictionary in the same format as ``prepared``. ``files`` contains
+        the ``path``, ``size`` and ``md5sum`` of each file that still needs
+        to be uploaded, and ``links`` contains the original links along
+        with a link for each unchanged file. If the asset has no
+        versions, all files are kept in ``files``.
+    """
+    files = list(prepared["files"])
+    if len(files) and not isinstance(files[0], dict):
+        targets = [os.path.join(directory, f) for f in files]
+        md5sums = _md5_of_files(targets, concurrent=concurrent, cache=cache_dir)
+        files = [
+            {"path": f, "size": os.path.getsize(t), "md5sum": m}
+            for f, t, m in zip(files, targets, md5sums)
+        ]
+
+    if version is None:
+        try:
+            version = fetch_latest(project, asset, url=url)
+        except Exception:
+            return {"files": files, "links": list(prepared["links"])}
+
+    manifest = fetch_manifest(project, asset, version, cache_dir=cache_dir, url=url)
+
+    available = {}
+    for path, entry in manifest.items():
+        available.setdefault((entry["md5sum"], entry["size"]), path)
+
+    out_files = []
+    out_links = list(prepared["links"])
+    for f in files:
+        match = available.get((f["md5sum"], f["size"]))
+        if match is None:
+            out_files.append(f)
+            continue
+
+        out_links.append(
+            {
+                "from.path": f["path"],
+                "to.project": project,
+                "to.asset": asset,
+                "to.version": version,
+                "to.path": match,
+            }
+        )
+
+    return {"files": out_files, "links": out_links}
+
+
+def _scan_directory(directory: str, concurrent: int = 1) -> list:
+    # Like os.walk(), symlinks to directories are neither followed nor
+    # reported, and unreadable subdirectories are skipped.
+    def _scan_one(rel_dir):
+        found = []
+        subdirs = []
+        try:
+            with os.scandir(os.path.join(directory, rel_dir)) as it:
+                for entry in it:
+                    rel_path = (
+                        os.path.join(rel_dir, entry.name) if rel_dir else entry.name
+                    )
+                    try:
+                        is_dir = entry.is_dir()
+                    except OSError:
+                        is_dir = False
+
+                    if not is_dir:
+                        found.append((rel_path, entry))
+                    elif not entry.is_symlink():
+                        subdirs.append(rel_path)
+        except OSError:
+            pass
+        return found, subdirs
+
+    out = []
+    frontier = [""]
+    pool = ThreadPoolExecutor(max_workers=concurrent) if concurrent > 1 else None
+    try:
+        while frontier:
+            if pool is None:
+                results = [_scan_one(d) for d in frontier]
+            else:
+                results = pool.map(_scan_one, frontier)
+
+            frontier = []
+            for found, subdirs in results:
+                out.extend(found)
+                frontier.extend(subdirs)
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    out.sort(key=lambda x: x[0])
+    return out
+
+
 def _normalize_and_sanitize_path(path: str) -> str:
     if os.path.exists(path):
         path = os.path.join(
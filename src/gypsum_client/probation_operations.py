@@ -1,7 +1,9 @@
 from urllib.parse import quote_plus
 
-import requests
-
+from ._latest_cache import _forget_latest
+from ._listing_cache import _invalidate_listings
+from ._manifest_cache import _forget_manifests
+from ._session import _get_session
 from ._utils import (
     _remove_slash_url,
 )
@@ -67,7 +69,7 @@ def approve_probation(
 
     url = _remove_slash_url(url)
     _key = f"{quote_plus(project)}/{quote_plus(asset)}/{quote_plus(version)}"
-    req = requests.post(
+    req = _get_session().post(
         f"{url}/probation/approve/{_key}",
         headers={"Authorization": f"Bearer {token}"},
     )
@@ -79,6 +81,9 @@ def approve_probation(
             f"Failed to approve probation, {req.status_code} and reason: {req.text}."
         ) from e
 
+    _forget_latest(url=url, project=project, asset=asset)
+    _forget_manifests(url=url, project=project, asset=asset, version=version)
+
 
 def reject_probation(
     project: str, asset: str, version: str, url: str = rest_url(), token: str = None
@@ -131,7 +136,7 @@ def reject_probation(
 
     url = _remove_slash_url(url)
     _key = f"{quote_plus(project)}/{quote_plus(asset)}/{quote_plus(version)}"
-    req = requests.post(
+    req = _get_session().post(
         f"{url}/probation/reject/{_key}",
         headers={"Authorization": f"Bearer {token}"},
     )
@@ -142,3 +147,6 @@ def reject_probation(
         raise Exception(
             f"Failed to reject probation, {req.status_code} and reason: {req.text}."
         ) from e
+
+    _invalidate_listings(url=url, project=project, asset=asset)
+    _forget_manifests(url=url, project=project, asset=asset, version=version)
@@ -1,7 +1,8 @@
 from urllib.parse import quote_plus
 
-import requests
-
+from ._latest_cache import _forget_latest
+from ._listing_cache import _invalidate_listings
+from ._session import _get_session
 from ._utils import (
     _remove_slash_url,
 )
@@ -54,7 +55,7 @@ def refresh_latest(
 
     url = _remove_slash_url(url)
     _key = f"{quote_plus(project)}/{quote_plus(asset)}"
-    req = requests.post(
+    req = _get_session().post(
         f"{url}/refresh/latest/{_key}",
         headers={"Authorization": f"Bearer {token}"},
     )
@@ -66,6 +67,9 @@ def refresh_latest(
             f"Failed to refresh latest version, {req.status_code} and reason: {req.text}"
         ) from e
 
+    _invalidate_listings(url=url, project=project, asset=asset)
+    _forget_latest(url=url, project=project, asset=asset)
+
     return req.json()["version"]
 
 
@@ -105,7 +109,7 @@ def refresh_usage(project: str, url: str = rest_url(), token: str = None) -> int
 
     url = _remove_slash_url(url)
     _key = f"{quote_plus(project)}"
-    req = requests.post(
+    req = _get_session().post(
         f"{url}/refresh/usage/{_key}",
         headers={"Authorization": f"Bearer {token}"},
     )
@@ -1,7 +1,9 @@
 from urllib.parse import quote_plus
 
-import requests
-
+from ._latest_cache import _forget_latest
+from ._listing_cache import _invalidate_listings
+from ._manifest_cache import _forget_manifests
+from ._session import _get_session
 from ._utils import _remove_slash_url
 from .auth import access_token
 from .rest_url import rest_url
@@ -59,6 +61,9 @@ def remove_asset(project: str, asset: str, url: str = rest_url(), token: str = N
 
     _key = f"{quote_plus(project)}/{quote_plus(asset)}"
     _request_removal(_key, url=url, token=token)
+    _invalidate_listings(url=url, project=project, asset=asset)
+    _forget_manifests(url=url, project=project, asset=asset)
+    _forget_latest(url=url, project=project, asset=asset)
 
     return True
 
@@ -102,6 +107,9 @@ def remove_project(project: str, url: str = rest_url(), token: str = None):
 
     _key = f"{quote_plus(project)}"
     _request_removal(_key, url=url, token=token)
+    _invalidate_listings(url=url, project=project)
+    _forget_manifests(url=url, project=project)
+    _forget_latest(url=url, project=project)
 
     return True
 
@@ -163,6 +171,9 @@ def remove_version(
 
     _key = f"{quote_plus(project)}/{quote_plus(asset)}/{quote_plus(version)}"
     _request_removal(_key, url=url, token=token)
+    _invalidate_listings(url=url, project=project, asset=asset)
+    _forget_manifests(url=url, project=project, asset=asset, version=version)
+    _forget_latest(url=url, project=project, asset=asset)
 
     return True
 
@@ -173,7 +184,7 @@ def _request_removal(suffix: str, url: str, token: str):
     headers = {}
     headers["Authorization"] = f"Bearer {token}"
 
-    req = requests.delete(f"{url}/remove/{suffix}", headers=headers)
+    req = _get_session().delete(f"{url}/remove/{suffix}", headers=headers)
     try:
         req.raise_for_status()
     except Exception as e:
@@ -1,12 +1,12 @@
-import atexit
 import os
-import shutil
 from typing import Optional
 
+from ._cache_index import _record_files
+from ._content_store import _restore_from_store, _store_enabled
+from ._locks import _version_lock
 from ._utils import (
     BUCKET_CACHE_NAME,
-    _acquire_lock,
-    _release_lock,
+    _link_or_copy,
 )
 from .cache_directory import cache_directory
 from .fetch_operations import fetch_manifest
@@ -66,61 +66,70 @@ def resolve_links(
     """
     from .save_operations import save_file
 
-    _acquire_lock(cache_dir, project, asset, version)
+    with _version_lock(cache_dir, project, asset, version):
+        # destination = os.path.join(cache_dir, BUCKET_CACHE_NAME, project, asset, version)
+        manifests = {}
 
-    def release_lock_wrapper():
-        _release_lock(project, asset, version)
-
-    atexit.register(release_lock_wrapper)
-
-    # destination = os.path.join(cache_dir, BUCKET_CACHE_NAME, project, asset, version)
-    manifests = {}
-
-    self_manifest = fetch_manifest(
-        project, asset, version, cache_dir=cache_dir, url=url
-    )
-    manifests["/".join([project, asset, version])] = self_manifest
-
-    for kmf in self_manifest.keys():
-        entry = self_manifest[kmf]
-        if entry.get("link") is None:
-            continue
-
-        old_loc = os.path.join(project, asset, version, kmf)
-        if os.path.exists(old_loc) and not overwrite:
-            continue
-
-        link_data = entry["link"]
-        if link_data.get("ancestor") is not None:
-            link_data = link_data["ancestor"]
-
-        out = save_file(
-            link_data["project"],
-            link_data["asset"],
-            link_data["version"],
-            link_data["path"],
-            cache_dir=cache_dir,
-            url=url,
-            overwrite=overwrite,
+        self_manifest = fetch_manifest(
+            project, asset, version, cache_dir=cache_dir, url=url
         )
-        old_path = os.path.join(cache_dir, BUCKET_CACHE_NAME, old_loc)
+        manifests["/".join([project, asset, version])] = self_manifest
+
+        resolved = []
+        for kmf in self_manifest.keys():
+            entry = self_manifest[kmf]
+            if entry.get("link") is None:
+                continue
+
+            old_loc = os.path.join(project, asset, version, kmf)
+            if os.path.exists(old_loc) and not overwrite:
+                continue
+
+            link_data = entry["link"]
+            if link_data.get("ancestor") is not None:
+                link_data = link_data["ancestor"]
+
+            if entry.get("md5sum") is not None:
+                target = os.path.join(
+                    cache_dir,
+                    BUCKET_CACHE_NAME,
+                    link_data["project"],
+                    link_data["asset"],
+                    link_data["version"],
+                    link_data["path"],
+                )
+                if not overwrite and not os.path.exists(target):
+                    if _store_enabled(cache_dir, entry["md5sum"]):
+                        _restore_from_store(
+                            cache_dir, entry["md5sum"], entry.get("size"), target
+                        )
+
+            out = save_file(
+                link_data["project"],
+                link_data["asset"],
+                link_data["version"],
+                link_data["path"],
+                cache_dir=cache_dir,
+                url=url,
+                overwrite=overwrite,
+            )
+            old_path = os.path.join(cache_dir, BUCKET_CACHE_NAME, old_loc)
 
-        try:
-            os.unlink(old_path)
-        except Exception:
-            pass
+            try:
+                os.unlink(old_path)
+            except Exception:
+                pass
 
-        os.makedirs(os.path.dirname(old_path), exist_ok=True)
+            os.makedirs(os.path.dirname(old_path), exist_ok=True)
 
-        try:
-            os.link(out, old_path)
-        except Exception:
             try:
-                os.symlink(out, old_path)
-            except Exception:
-                try:
-                    shutil.copy(out, old_path)
-                except Exception as e:
-                    raise ValueError(f"Failed to resolve link for '{kmf}': {e}") from e
+                _link_or_copy(out, old_path)
+            except Exception as e:
+                raise ValueError(f"Failed to resolve link for '{kmf}': {e}") from e
+
+            resolved.append((kmf, entry.get("size"), entry.get("md5sum")))
+
+        if resolved:
+            _record_files(cache_dir, project, asset, version, resolved)
 
-    return True
+        return True
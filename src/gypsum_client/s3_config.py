@@ -3,9 +3,9 @@ import os
 import time
 from typing import Optional
 
-import requests
 from filelock import FileLock
 
+from ._session import _get_session
 from .cache_directory import cache_directory
 from .config import REQUESTS_MOD
 from .rest_url import rest_url
@@ -69,7 +69,7 @@ def public_s3_config(
                     CREDS_CACHE["info"][cache_dir] = creds
                     return creds
 
-    req = requests.get(url + "/credentials/s3-api", verify=REQUESTS_MOD["verify"])
+    req = _get_session().get(url + "/credentials/s3-api", verify=REQUESTS_MOD["verify"])
     creds = req.json()
 
     if cache_dir is None:
@@ -1,20 +1,21 @@
-import atexit
 import json
 import os
 import re
-import shutil
-from multiprocessing import Pool
-from typing import Optional
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
 
+from ._cache_index import _record_files, _record_manifest
+from ._locks import _version_lock
 from ._utils import (
     BUCKET_CACHE_NAME,
-    _acquire_lock,
-    _release_lock,
+    _link_or_copy,
     _sanitize_path,
     _save_file,
 )
+from ._download import _download_files
 from .cache_directory import cache_directory
-from .config import REQUESTS_MOD
+from .cache_operations import _prune_if_needed, _touch_version
+from .fetch_operations import fetch_manifest
 from .list_operations import list_files
 from .resolve_links import resolve_links
 from .rest_url import rest_url
@@ -24,13 +25,6 @@ __copyright__ = "Jayaram Kancherla"
 __license__ = "MIT"
 
 
-def _save_file_wrapper(args):
-    x, project, asset, version, destination, overwrite, url, verify = args
-    path = os.path.join(project, asset, version, x)
-    dest = os.path.join(destination, x)
-    _save_file(path=path, destination=dest, overwrite=overwrite, url=url, verify=verify)
-
-
 def save_version(
     project: str,
     asset: str,
@@ -40,6 +34,10 @@ def save_version(
     relink: bool = True,
     concurrent: int = 1,
     url: str = rest_url(),
+    executor: Optional[ThreadPoolExecutor] = None,
+    stats: Optional[dict] = None,
+    use_manifest: bool = False,
+    check_md5: bool = True,
 ) -> str:
     """Download all files associated with a version of an asset
     of a project from the gypsum bucket.
@@ -76,58 +74,63 @@ def save_version(
 
         concurrent:
             Number of concurrent downloads.
+            Downloads are performed in threads that share the pooled
+            HTTP session, so ``REQUESTS_MOD["pool_maxsize"]`` should be
+            at least ``concurrent`` to keep all connections alive.
+            Files larger than ``DOWNLOAD_MOD["multipart_threshold"]`` are
+            further split into byte ranges that are downloaded in parallel,
+            see :py:data:`~gypsum_client.config.DOWNLOAD_MOD`.
             Defaults to 1.
 
+        url:
+            URL to the gypsum compatible API.
+
+        executor:
+            A ``concurrent.futures.ThreadPoolExecutor`` to run the downloads,
+            e.g., one that is re-used across calls.
+            This is not shut down by this function.
+            If provided, ``concurrent`` is ignored.
+
+        stats:
+            Dictionary to be filled with throughput statistics of the
+            downloads, i.e., ``files``, ``skipped``, ``bytes``, ``elapsed``
+            (in seconds) and ``throughput`` (in bytes per second).
+            Files are downloaded in order of decreasing size.
+
+        use_manifest:
+            Whether to plan the downloads from the version's manifest only,
+            see :py:func:`~gypsum_client.fetch_operations.fetch_manifest`.
+            This skips the listing request to the API, so internal files
+            other than ``..manifest`` (e.g., ``..summary``, ``..links``)
+            are not downloaded. Linked-from files are skipped up front and
+            only created by ``relink``, files with the same MD5 checksum are
+            only downloaded once, and destination files are pre-allocated
+            to their expected size.
+            Defaults to False.
+
+        check_md5:
+            Whether to verify each downloaded file against the MD5 checksum
+            in the manifest. The checksum is computed while the file is
+            streamed, and the download is retried on a mismatch.
+            Defaults to True.
+
     Returns:
         Path to the local directory where the files are downloaded to.
     """
 
-    _acquire_lock(cache_dir, project, asset, version)
-
-    def release_lock_wrapper():
-        _release_lock(project, asset, version)
-
-    atexit.register(release_lock_wrapper)
-    destination = os.path.join(cache_dir, BUCKET_CACHE_NAME, project, asset, version)
-
-    # If this version's directory was previously cached in its complete form, we skip it.
-    completed = os.path.join(cache_dir, "status", project, asset, version, "COMPLETE")
-    if not os.path.exists(completed) or overwrite:
-        listing = list_files(project, asset, version, url=url)
-
-        if concurrent <= 1:
-            for file in listing:
-                _save_file_wrapper(
-                    (
-                        file,
-                        project,
-                        asset,
-                        version,
-                        destination,
-                        overwrite,
-                        url,
-                        REQUESTS_MOD["verify"],
-                    )
-                )
-        else:
-            _args = [
-                (
-                    file,
-                    project,
-                    asset,
-                    version,
-                    destination,
-                    overwrite,
-                    url,
-                    REQUESTS_MOD["verify"],
-                )
-                for file in listing
-            ]
-            with Pool(concurrent) as pool:
-                pool.map(_save_file_wrapper, _args)
+    with _version_lock(cache_dir, project, asset, version):
+        _touch_version(cache_dir, project, asset, version)
 
-        if relink:
-            resolve_links(
+        destination = os.path.join(
+            cache_dir, BUCKET_CACHE_NAME, project, asset, version
+        )
+
+        # If this version's directory was previously cached in its complete form, we skip it.
+        completed = os.path.join(
+            cache_dir, "status", project, asset, version, "COMPLETE"
+        )
+        if not os.path.exists(completed) or overwrite:
+            manifest = fetch_manifest(
                 project,
                 asset,
                 version,
@@ -136,12 +139,123 @@ def save_version(
                 url=url,
             )
 
-        # Marking it as complete.
-        os.makedirs(os.path.dirname(completed), exist_ok=True)
-        with open(completed, "w"):
-            pass
+            duplicates = []
+            if use_manifest:
+                tasks, duplicates = _plan_from_manifest(
+                    project, asset, version, manifest, destination
+                )
+            else:
+                listing = list_files(project, asset, version, url=url)
+
+                tasks = []
+                for file in listing:
+                    if file == "..manifest":
+                        continue
+                    entry = manifest.get(file, {})
+                    tasks.append(
+                        (
+                            f"{project}/{asset}/{version}/{file}",
+                            os.path.join(destination, file),
+                            entry.get("size"),
+                            entry.get("md5sum"),
+                        )
+                    )
+
+            _stats = _download_files(
+                tasks,
+                overwrite=overwrite,
+                url=url,
+                concurrent=concurrent,
+                executor=executor,
+                cache=cache_dir,
+                check_md5=check_md5,
+            )
+            if stats is not None:
+                stats.update(_stats)
+
+            for src, dest in duplicates:
+                if os.path.exists(dest):
+                    if not overwrite:
+                        continue
+                    os.unlink(dest)
+                os.makedirs(os.path.dirname(dest), exist_ok=True)
+                _link_or_copy(src, dest)
+
+            if relink:
+                resolve_links(
+                    project,
+                    asset,
+                    version,
+                    cache_dir=cache_dir,
+                    overwrite=overwrite,
+                    url=url,
+                )
+
+            # Marking it as complete.
+            os.makedirs(os.path.dirname(completed), exist_ok=True)
+            with open(completed, "w"):
+                pass
+            if not relink:
+                manifest = {k: v for k, v in manifest.items() if v.get("link") is None}
+            _record_manifest(
+                cache_dir, project, asset, version, manifest, complete=True
+            )
+
+            # This version is locked, so it is never pruned here.
+            _prune_if_needed(cache_dir)
 
-    return destination
+        return destination
+
+
+def _cached_manifest_entry(
+    cache: str, project: str, asset: str, version: str, path: str, url: str
+) -> dict:
+    # Only consults a manifest that is already in the cache,
+    # so that saving a single file never costs an extra request.
+    mpath = os.path.join(
+        cache, BUCKET_CACHE_NAME, project, asset, version, "..manifest"
+    )
+    if not os.path.exists(mpath):
+        return {}
+
+    # This re-uses the manifest kept in memory, if any.
+    try:
+        manifest = fetch_manifest(project, asset, version, cache_dir=cache, url=url)
+    except Exception:
+        return {}
+
+    entry = manifest.get(path) if isinstance(manifest, dict) else None
+    return entry if entry is not None else {}
+
+
+def _plan_from_manifest(
+    project: str, asset: str, version: str, manifest: dict, destination: str
+) -> Tuple[list, list]:
+    tasks = []
+    duplicates = []
+    seen = {}
+
+    for file, entry in manifest.items():
+        if entry.get("link") is not None:
+            continue
+
+        dest = os.path.join(destination, file)
+        key = (entry["md5sum"], entry["size"])
+        if key in seen:
+            duplicates.append((seen[key], dest))
+            continue
+
+        seen[key] = dest
+        tasks.append(
+            (
+                f"{project}/{asset}/{version}/{file}",
+                dest,
+                entry["size"],
+                entry["md5sum"],
+            )
+        )
+
+    return tasks, duplicates
 
 
 def _resolve_single_link(
@@ -153,6 +267,27 @@ def _resolve_single_link(
     overwrite: bool,
     url: str,
 ) -> Optional[str]:
+    lobject, ldestination = _links_file_location(project, asset, version, path, cache)
+
+    _saved = _save_file(
+        lobject, ldestination, overwrite=overwrite, url=url, error=False
+    )
+
+    if not _saved:
+        return None
+
+    target = _read_link_target(ldestination, path, cache)
+    if target is None:
+        return None
+
+    tobject, tdestination = target
+    _save_file(tobject, tdestination, overwrite=overwrite, url=url)
+    return tdestination
+
+
+def _links_file_location(
+    project: str, asset: str, version: str, path: str, cache: str
+) -> Tuple[str, str]:
     if "/" in path:
         lpath = f"{os.path.dirname(path)}/..links"
     else:
@@ -162,14 +297,12 @@ def _resolve_single_link(
     ldestination = os.path.join(
         cache, BUCKET_CACHE_NAME, project, asset, version, lpath
     )
+    return lobject, ldestination
 
-    _saved = _save_file(
-        lobject, ldestination, overwrite=overwrite, url=url, error=False
-    )
-
-    if not _saved:
-        return None
 
+def _read_link_target(
+    ldestination: str, path: str, cache: str
+) -> Optional[Tuple[str, str]]:
     with open(ldestination, "r") as f:
         link_info = json.load(f)
 
@@ -193,9 +326,7 @@ def _resolve_single_link(
         target["version"],
         target["path"],
     )
-
-    _save_file(tobject, tdestination, overwrite=overwrite, url=url)
-    return tdestination
+    return tobject, tdestination
 
 
 def save_file(
@@ -206,12 +337,18 @@ def save_file(
     cache_dir: Optional[str] = cache_directory(),
     overwrite: bool = False,
     url: str = rest_url(),
+    check_md5: bool = True,
 ):
     """Save a file from a version of a project asset.
 
     Download a file from the gypsum bucket, for a version of
     an asset of a project.
 
+    If the version's manifest is already cached, files larger than
+    ``DOWNLOAD_MOD["multipart_threshold"]`` are split into byte ranges
+    that are downloaded in parallel, see
+    :py:data:`~gypsum_client.config.DOWNLOAD_MOD`.
+
     See Also:
 
         :py:func:`~.save_version`, to save all files associated
@@ -251,46 +388,155 @@ def save_file(
         url:
             URL to the gypsum compatible API.
 
+        check_md5:
+            Whether to verify the downloaded file against the MD5 checksum
+            in the manifest, retrying on a mismatch. This is only performed
+            if the version's manifest is already in the cache.
+            Defaults to True.
+
     Returns:
         The destintion file path where the file is downloaded to in the local
         file system.
     """
 
-    _acquire_lock(cache_dir, project, asset, version)
-
-    def release_lock_wrapper():
-        _release_lock(project, asset, version)
+    with _version_lock(cache_dir, project, asset, version):
+        _touch_version(cache_dir, project, asset, version)
 
-    atexit.register(release_lock_wrapper)
+        object_key = f"{project}/{asset}/{version}/{_sanitize_path(path)}"
+        destination = os.path.join(
+            cache_dir, BUCKET_CACHE_NAME, project, asset, version, path
+        )
+        if not overwrite and os.path.exists(destination):
+            return destination
+
+        entry = _cached_manifest_entry(cache_dir, project, asset, version, path, url)
+        found = _save_file(
+            object_key,
+            destination,
+            overwrite=overwrite,
+            url=url,
+            error=False,
+            size=entry.get("size"),
+            md5sum=entry.get("md5sum"),
+            cache=cache_dir,
+            check_md5=check_md5,
+        )
 
-    object_key = f"{project}/{asset}/{version}/{_sanitize_path(path)}"
-    destination = os.path.join(
-        cache_dir, BUCKET_CACHE_NAME, project, asset, version, path
-    )
+        if not found:
+            link = _resolve_single_link(
+                project, asset, version, path, cache_dir, overwrite=overwrite, url=url
+            )
 
-    found = _save_file(
-        object_key, destination, overwrite=overwrite, url=url, error=False
-    )
+            if link is None:
+                raise ValueError(f"'{path}' does not exist in the bucket.")
 
-    if not found:
-        link = _resolve_single_link(
-            project, asset, version, path, cache_dir, overwrite=overwrite, url=url
+            try:
+                _link_or_copy(link, destination)
+            except Exception as e:
+                raise ValueError(f"Failed to resolve link for '{path}': {e}.") from e
+
+        _record_files(
+            cache_dir,
+            project,
+            asset,
+            version,
+            [(path, os.path.getsize(destination), entry.get("md5sum"))],
         )
+        return destination
 
-        if link is None:
-            raise ValueError(f"'{path}' does not exist in the bucket.")
 
-        try:
-            os.link(link, destination)
-        except Exception:
-            try:
-                os.symlink(link, destination)
-            except Exception:
-                try:
-                    shutil.copy(link, destination)
-                except Exception as e:
-                    raise ValueError(
-                        f"Failed to resolve link for '{path}': {e}."
-                    ) from e
-
-    return destination
+def prefetch(
+    results: List[Dict],
+    cache_dir: Optional[str] = cache_directory(),
+    concurrency: int = 4,
+    whole_version: bool = False,
+    url: str = rest_url(),
+    executor: Optional[Executor] = None,
+) -> List[Future]:
+    """Download files into the cache in the background.
+
+    This is intended for the rows returned by
+    :py:func:`~gypsum_client.search_metadata.search_metadata_text`, so that
+    the files of interest can be downloaded while other work proceeds.
+    Duplicate rows are only downloaded once.
+
+    See Also:
+        :py:func:`~.save_file`, used to save each file.
+
+        :py:func:`~.save_version`, used to save each version if
+        ``whole_version = True``.
+
+    Example:
+
+        .. code-block:: python
+
+            from concurrent.futures import as_completed
+
+            results = search_metadata_text(sqlite_path, ["mikoto"])
+            futures = prefetch(results)
+
+            # process files in the order in which they are downloaded
+            for fut in as_completed(set(futures)):
+                print(fut.result())
+
+    Args:
+        results:
+            List of dictionaries, each containing the ``project``, ``asset``,
+            ``version`` and ``path`` of a file in the gypsum bucket.
+            ``path`` may be missing or None, in which case the entire
+            version is downloaded.
+
+        cache_dir:
+            Path to the cache directory.
+
+        concurrency:
+            Number of concurrent downloads.
+            Ignored if ``executor`` is provided.
+
+        whole_version:
+            Whether to download all files of each version in ``results``,
+            rather than only the files at ``path``.
+
+        url:
+            URL to the gypsum compatible API.
+
+        executor:
+            A ``concurrent.futures.Executor`` to run the downloads.
+            This is not shut down by this function. If None, a thread pool
+            with ``concurrency`` workers is created, which shuts down once
+            all downloads have finished.
+
+    Returns:
+        List of ``concurrent.futures.Future`` objects, one for each row of
+        ``results``. Each future resolves to the local path of the file
+        (or version directory), or raises the error from the download.
+        Duplicate rows share the same future.
+    """
+    owned = executor is None
+    if owned:
+        executor = ThreadPoolExecutor(max_workers=max(1, concurrency))
+
+    submitted = {}
+    futures = []
+    try:
+        for row in results:
+            path = None if whole_version else row.get("path")
+            key = (row["project"], row["asset"], row["version"], path)
+
+            if key not in submitted:
+                if path is None:
+                    submitted[key] = executor.submit(
+                        save_version, *key[:3], cache_dir=cache_dir, url=url
+                    )
+                else:
+                    submitted[key] = executor.submit(
+                        save_file, *key, cache_dir=cache_dir, url=url
+                    )
+            futures.append(submitted[key])
+    finally:
+        if owned:
+            # Queued downloads still run; this only releases the workers
+            # once they are done.
+            executor.shutdown(wait=False)
+
+    return futures
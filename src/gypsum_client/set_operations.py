@@ -1,7 +1,6 @@
 from urllib.parse import quote_plus
 
-import requests
-
+from ._session import _get_session
 from ._utils import _remove_slash_url, _sanitize_uploaders
 from .auth import access_token
 from .fetch_operations import fetch_permissions
@@ -82,7 +81,7 @@ def set_quota(
     endpoint = f"{url}/quota/{quote_plus(project)}"
     headers = {"Authorization": f"Bearer {token}", "Content-Type": "application/json"}
 
-    req = requests.put(endpoint, json=body, headers=headers)
+    req = _get_session().put(endpoint, json=body, headers=headers)
 
     try:
         req.raise_for_status()
@@ -177,7 +176,7 @@ def set_permissions(
     endpoint = f"{url}/permissions/{quote_plus(project)}"
     headers = {"Authorization": f"Bearer {token}", "Content-Type": "application/json"}
 
-    req = requests.put(endpoint, json=perms, headers=headers)
+    req = _get_session().put(endpoint, json=perms, headers=headers)
 
     try:
         req.raise_for_status()
@@ -0,0 +1,291 @@
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
+from typing import Optional
+
+from ._cache_index import _record_manifest
+from ._download import _download_files
+from ._locks import _version_lock
+from ._utils import BUCKET_CACHE_NAME, _link_or_copy
+from .cache_directory import cache_directory
+from .cache_operations import _prune_if_needed, _touch_version
+from .fetch_operations import fetch_manifest
+from .resolve_links import resolve_links
+from .rest_url import rest_url
+
+__author__ = "Jayaram Kancherla"
+__copyright__ = "Jayaram Kancherla"
+__license__ = "MIT"
+
+
+def sync_version(
+    project: str,
+    asset: str,
+    new_version: str,
+    base_version: Optional[str] = None,
+    cache_dir: Optional[str] = cache_directory(),
+    overwrite: bool = False,
+    relink: bool = True,
+    concurrent: int = 1,
+    url: str = rest_url(),
+    executor: Optional[ThreadPoolExecutor] = None,
+    stats: Optional[dict] = None,
+    check_md5: bool = True,
+) -> str:
+    """Incrementally download a version of an asset, re-using
+    the files of another version that is already cached.
+
+    The manifests of both versions are compared by path and MD5 checksum.
+    Unchanged files are hard-linked (or copied, if links are not supported)
+    from the cached base version, and only new or modified files are
+    downloaded from the gypsum bucket. The internal ``..summary`` and
+    ``..links`` files of ``new_version`` are always downloaded, as for
+    :py:func:`~gypsum_client.save_operations.save_version`.
+
+    See Also:
+        :py:func:`~gypsum_client.save_operations.save_version`,
+        to download all files of a version.
+
+    Example:
+
+        .. code-block:: python
+
+            save_version("test-R", "basic", "v1")
+            out = sync_version("test-R", "basic", "v2", base_version="v1")
+
+    Args:
+        project:
+            Project name.
+
+        asset:
+            Asset name.
+
+        new_version:
+            Name of the version to download.
+
+        base_version:
+            Name of a version of the same asset that was previously saved
+            to the cache, e.g., with
+            :py:func:`~gypsum_client.save_operations.save_version`.
+
+            If None, the completely cached version of this asset that shares
+            the most files with ``new_version`` is used. If no such version
+            exists, all files are downloaded.
+
+        cache_dir:
+            Path to the cache directory.
+
+        overwrite:
+            Whether to overwrite existing files in the cache for ``new_version``.
+
+        relink:
+            Whether links should be resolved, see
+            :py:func:`~gypsum_client.resolve_links.resolve_links`.
+            Defaults to True.
+
+        concurrent:
+            Number of concurrent downloads.
+            Defaults to 1.
+
+        url:
+            URL to the gypsum compatible API.
+
+        executor:
+            A ``concurrent.futures.ThreadPoolExecutor`` to run the downloads,
+            see :py:func:`~gypsum_client.save_operations.save_version`.
+
+        stats:
+            Dictionary to be filled with statistics of the downloads,
+            as described in :py:func:`~gypsum_client.save_operations.save_version`,
+            along with ``base_version``, the version used as the base;
+            and ``reused``, the number of files linked from the base version.
+
+        check_md5:
+            Whether to verify each downloaded file against the MD5 checksum
+            in the manifest, see
+            :py:func:`~gypsum_client.save_operations.save_version`.
+            Defaults to True.
+
+    Returns:
+        Path to the local directory containing the files of ``new_version``.
+    """
+    destination = os.path.join(
+        cache_dir, BUCKET_CACHE_NAME, project, asset, new_version
+    )
+
+    new_manifest = fetch_manifest(
+        project, asset, new_version, cache_dir=cache_dir, overwrite=overwrite, url=url
+    )
+
+    if base_version is None:
+        base_version = _choose_base_version(
+            project, asset, new_version, new_manifest, cache_dir
+        )
+
+    base_manifest = {}
+    base_dir = None
+    if base_version is not None:
+        base_manifest = fetch_manifest(
+            project, asset, base_version, cache_dir=cache_dir, url=url
+        )
+        base_dir = os.path.join(
+            cache_dir, BUCKET_CACHE_NAME, project, asset, base_version
+        )
+
+    # Both versions are locked so that neither is pruned while linking.
+    # Locks are taken in a fixed order to avoid deadlocks between processes.
+    versions = sorted({new_version, base_version} - {None})
+    with ExitStack() as stack:
+        for version in versions:
+            stack.enter_context(_version_lock(cache_dir, project, asset, version))
+        _touch_version(cache_dir, project, asset, new_version)
+
+        tasks = []
+        reused = 0
+        for path, entry in new_manifest.items():
+            if entry.get("link") is not None:
+                continue
+
+            dest = os.path.join(destination, path)
+            if os.path.exists(dest) and not overwrite:
+                continue
+
+            base_entry = base_manifest.get(path)
+            if base_entry is not None and _same_content(entry, base_entry):
+                src = os.path.join(base_dir, path)
+                if _has_size(src, entry["size"]):
+                    if os.path.exists(dest):
+                        os.unlink(dest)
+                    os.makedirs(os.path.dirname(dest), exist_ok=True)
+                    _link_or_copy(src, dest)
+                    reused += 1
+                    continue
+
+            tasks.append(
+                (
+                    f"{project}/{asset}/{new_version}/{path}",
+                    dest,
+                    entry["size"],
+                    entry["md5sum"],
+                )
+            )
+
+        for path in _internal_files(new_manifest):
+            tasks.append(
+                (
+                    f"{project}/{asset}/{new_version}/{path}",
+                    os.path.join(destination, path),
+                    None,
+                    None,
+                )
+            )
+
+        _stats = _download_files(
+            tasks,
+            overwrite=overwrite,
+            url=url,
+            concurrent=concurrent,
+            executor=executor,
+            cache=cache_dir,
+            check_md5=check_md5,
+        )
+
+        if relink:
+            resolve_links(
+                project,
+                asset,
+                new_version,
+                cache_dir=cache_dir,
+                overwrite=overwrite,
+                url=url,
+            )
+
+        completed = os.path.join(
+            cache_dir, "status", project, asset, new_version, "COMPLETE"
+        )
+        os.makedirs(os.path.dirname(completed), exist_ok=True)
+        with open(completed, "w"):
+            pass
+        if not relink:
+            new_manifest = {
+                k: v for k, v in new_manifest.items() if v.get("link") is None
+            }
+        _record_manifest(
+            cache_dir, project, asset, new_version, new_manifest, complete=True
+        )
+
+        # Both versions are locked, so neither is pruned here.
+        _prune_if_needed(cache_dir)
+
+    if stats is not None:
+        stats.update(_stats)
+        stats["base_version"] = base_version
+        stats["reused"] = reused
+
+    return destination
+
+
+def _internal_files(manifest: dict) -> list:
+    # The '..links' files are only present in directories with links.
+    dirs = set(
+        path.rpartition("/")[0]
+        for path, entry in manifest.items()
+        if entry.get("link") is not None
+    )
+    return ["..summary"] + [f"{d}/..links" if d else "..links" for d in sorted(dirs)]
+
+
+def _same_content(entry: dict, base_entry: dict) -> bool:
+    # Linked-from files in the base version are fine, as long as they
+    # were resolved in the cache; this is checked by the caller.
+    return (
+        entry["md5sum"] == base_entry["md5sum"] and entry["size"] == base_entry["size"]
+    )
+
+
+def _has_size(path: str, size: int) -> bool:
+    try:
+        return os.path.getsize(path) == size
+    except OSError:
+        return False
+
+
+def _choose_base_version(
+    project: str, asset: str, new_version: str, new_manifest: dict, cache_dir: str
+) -> Optional[str]:
+    status_dir = os.path.join(cache_dir, "status", project, asset)
+    if not os.path.isdir(status_dir):
+        return None
+
+    wanted = set(
+        (path, entry["md5sum"])
+        for path, entry in new_manifest.items()
+        if entry.get("link") is None
+    )
+
+    best = None
+    best_overlap = 0
+    for candidate in sorted(os.listdir(status_dir)):
+        if candidate == new_version:
+            continue
+        if not os.path.exists(os.path.join(status_dir, candidate, "COMPLETE")):
+            continue
+
+        mpath = os.path.join(
+            cache_dir, BUCKET_CACHE_NAME, project, asset, candidate, "..manifest"
+        )
+        try:
+            with open(mpath, "r") as f:
+                manifest = json.load(f)
+        except Exception:
+            continue
+
+        overlap = sum(
+            1 for path, entry in manifest.items() if (path, entry["md5sum"]) in wanted
+        )
+        if overlap > best_overlap:
+            best = candidate
+            best_overlap = overlap
+
+    return best
@@ -1,12 +1,16 @@
-import hashlib
 import os
-from typing import List, Union
+from typing import List, Optional, Union
 from urllib.parse import quote_plus
 
-import requests
-
+from ._hashing import _md5_of_files
+from ._latest_cache import _forget_latest
+from ._listing_cache import _invalidate_listings
+from ._manifest_cache import _manifest_key, _set_probation
+from ._session import _get_session
+from ._upload_sessions import _remove_session, _save_session
 from ._utils import _remove_slash_url, _sanitize_path
 from .auth import access_token
+from .cache_directory import cache_directory
 from .config import REQUESTS_MOD
 from .rest_url import rest_url
 
@@ -26,6 +30,9 @@ def start_upload(
     url: str = rest_url(),
     token: str = None,
     directory: str = None,
+    concurrent: int = 1,
+    cache_dir: Optional[str] = cache_directory(),
+    resumable: bool = False,
 ) -> dict:
     """Start an upload.
 
@@ -98,7 +105,8 @@ def start_upload(
             - ``size``, a non-negative integer specifying the size of the
             file in bytes.
             - ``md5sum``, a string containing the hex-encoded MD5
-            checksum of the file.
+            checksum of the file. If this is not available, it is
+            computed from the file in ``directory``.
             - Optionally ``dedup``, a boolean value indicating
             whether deduplication should be attempted for each file. If this is
             not available, the parameter ``deduplicate`` is used.
@@ -135,6 +143,28 @@ def start_upload(
             Path to a directory containing the ``files`` to be uploaded.
             This directory is assumed to correspond to a version of an asset.
 
+        concurrent:
+            Number of files to hash at the same time, if ``files`` are paths.
+            Files are hashed in chunks, so memory usage does not depend on
+            the file sizes.
+            Defaults to 1.
+
+        cache_dir:
+            Path to the cache directory, used to store the checksums of
+            files in ``directory``. Files that have not changed since they
+            were last hashed are not hashed again, see ``hash_cache`` in
+            :py:data:`~gypsum_client.config.CACHE_MOD`.
+
+            If None, all files are hashed.
+
+        resumable:
+            Whether to record the upload session in ``cache_dir``, so that
+            it can be resumed with
+            :py:func:`~gypsum_client.upload_file_actions.resume_upload`
+            if the process is interrupted. The record contains the session
+            token, so it is only readable by the current user.
+            Defaults to False.
+
     Returns:
         Dictionary containing the following keys:
         - ``file_urls``, a list of lists containing information about each
@@ -146,6 +176,59 @@ def start_upload(
         - ``session_token``, a string for authenticating to the newly
         initialized upload session.
     """
+    if resumable and cache_dir is None:
+        raise ValueError("'cache_dir' must be specified for a resumable upload.")
+
+    formatted = _format_upload_files(
+        files,
+        links=links,
+        deduplicate=deduplicate,
+        directory=directory,
+        concurrent=concurrent,
+        cache=cache_dir,
+    )
+
+    if token is None:
+        token = access_token()
+
+    url = _remove_slash_url(url)
+    req = _get_session().post(
+        f"{url}/upload/start/{quote_plus(project)}/{quote_plus(asset)}/{quote_plus(version)}",
+        json={"files": formatted, "on_probation": probation},
+        headers={"Authorization": f"Bearer {token}"},
+        verify=REQUESTS_MOD["verify"],
+    )
+    try:
+        req.raise_for_status()
+    except Exception as e:
+        raise Exception(
+            f"Failed to start an upload, {req.status_code} and reason: {req.text}"
+        ) from e
+
+    resp = req.json()
+
+    if "status" in resp and resp["status"] == "error":
+        raise Exception(
+            f"Failed to upload, {req.status_code} and reason: {resp['reason']}"
+        )
+
+    if probation:
+        _set_probation(_manifest_key(url, project, asset, version), True)
+
+    if resumable:
+        _save_session(cache_dir, resp, project, asset, version, url, directory)
+
+    return resp
+
+
+def _format_upload_files(
+    files: Union[str, List[str], List[dict]],
+    links: List[dict],
+    deduplicate: bool,
+    directory: str,
+    concurrent: int = 1,
+    cache: Optional[str] = None,
+) -> list:
     if isinstance(files, str):
         files = [files]
 
@@ -165,16 +248,38 @@ def start_upload(
             else:
                 _targets.append(f)
 
+        _md5sums = _md5_of_files(_targets, concurrent=concurrent, cache=cache)
+
         _files_info = []
         for _tidx, _tg in enumerate(_targets):
             file_info = {
                 "path": files[_tidx],
                 "size": os.path.getsize(_tg),
-                "md5sum": hashlib.md5(open(_tg, "rb").read()).hexdigest(),
+                "md5sum": _md5sums[_tidx],
                 "dedup": deduplicate,
             }
             _files_info.append(file_info)
     else:
+        # Checksums are only computed for files that do not already have one,
+        # e.g., from prepare_directory_upload(sizes=True).
+        _unhashed = [i for i, f in enumerate(files) if "md5sum" not in f]
+        if len(_unhashed):
+            _computed = _md5_of_files(
+                [
+                    (
+                        os.path.join(directory, files[i]["path"])
+                        if directory is not None
+                        else files[i]["path"]
+                    )
+                    for i in _unhashed
+                ],
+                concurrent=concurrent,
+                cache=cache,
+            )
+            files = [dict(f) for f in files]
+            for i, m in zip(_unhashed, _computed):
+                files[i]["md5sum"] = m
+
         _files_info = []
         for f in files:
             file_info = {
@@ -214,34 +319,12 @@ def start_upload(
             )
         formatted.extend(out_links)
 
-    if token is None:
-        token = access_token()
+    return formatted
 
-    url = _remove_slash_url(url)
-    req = requests.post(
-        f"{url}/upload/start/{quote_plus(project)}/{quote_plus(asset)}/{quote_plus(version)}",
-        json={"files": formatted, "on_probation": probation},
-        headers={"Authorization": f"Bearer {token}"},
-        verify=REQUESTS_MOD["verify"],
-    )
-    try:
-        req.raise_for_status()
-    except Exception as e:
-        raise Exception(
-            f"Failed to start an upload, {req.status_code} and reason: {req.text}"
-        ) from e
-
-    resp = req.json()
-
-    if "status" in resp and resp["status"] == "error":
-        raise Exception(
-            f"Failed to upload, {req.status_code} and reason: {resp['reason']}"
-        )
 
-    return resp
-
-
-def complete_upload(init: dict, url=rest_url()):
+def complete_upload(
+    init: dict, url=rest_url(), cache_dir: Optional[str] = cache_directory()
+):
     """Complete an upload session after all files have been uploaded.
 
     See Also:
@@ -287,9 +370,13 @@ def complete_upload(init: dict, url=rest_url()):
 
         url:
             URL to the gypsum REST API.
+
+        cache_dir:
+            Path to the cache directory, from which the record of this
+            session is removed on completion.
     """
     url = _remove_slash_url(url)
-    req = requests.post(
+    req = _get_session().post(
         f"{url}{init['complete_url']}",
         headers={"Authorization": f"Bearer {init['session_token']}"},
     )
@@ -300,8 +387,18 @@ def complete_upload(init: dict, url=rest_url()):
             f"Failed to complete an upload session, {req.status_code} and reason: {req.text}"
         ) from e
 
+    # The session does not record its project or asset, so all listings
+    # and latest versions from this API are invalidated.
+    _invalidate_listings(url=url)
+    _forget_latest(url=url)
 
-def abort_upload(init: dict, url=rest_url()):
+    if cache_dir is not None:
+        _remove_session(cache_dir, init)
+
+
+def abort_upload(
+    init: dict, url=rest_url(), cache_dir: Optional[str] = cache_directory()
+):
     """Abort an upload session, usually after an irrecoverable error.
 
     See Also:
@@ -347,9 +444,13 @@ def abort_upload(init: dict, url=rest_url()):
 
         url:
             URL to the gypsum REST API.
+
+        cache_dir:
+            Path to the cache directory, from which the record of this
+            session is removed.
     """
     url = _remove_slash_url(url)
-    req = requests.post(
+    req = _get_session().post(
         f"{url}{init['abort_url']}",
         headers={"Authorization": f"Bearer {init['session_token']}"},
     )
@@ -360,3 +461,6 @@ def abort_upload(init: dict, url=rest_url()):
         raise Exception(
             f"Failed to abort the upload, {req.status_code} and reason: {req.text}"
         ) from e
+
+    if cache_dir is not None:
+        _remove_session(cache_dir, init)
@@ -1,13 +1,20 @@
+import json
 import os
-from multiprocessing import Pool
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, Optional
 
 import requests
 
+from ._session import _get_session
+from ._upload_sessions import _find_sessions, _mark_uploaded, _uploaded_files
 from ._utils import _remove_slash_url
 from .auth import access_token
 from .cache_directory import cache_directory
-from .config import REQUESTS_MOD
-from .prepare_directory_for_upload import prepare_directory_upload
+from .config import REQUESTS_MOD, UPLOAD_MOD
+from .prepare_directory_for_upload import link_unchanged_files, prepare_directory_upload
 from .rest_url import rest_url
 from .upload_api_operations import abort_upload, complete_upload, start_upload
 
@@ -28,6 +35,8 @@ def upload_directory(
     token: str = None,
     concurrent: int = 1,
     abort_failed: bool = True,
+    link_unchanged: bool = False,
+    resumable: bool = False,
 ) -> bool:
     """Upload a directory to the gypsum backend.
 
@@ -97,13 +106,28 @@ def upload_directory(
             GitHub access token to authenticate to the gypsum REST API.
 
         concurrent:
-            Number of concurrent downloads.
+            Number of concurrent uploads.
+            This is also the number of files that are hashed in parallel.
             Defaults to 1.
 
         abort_failed:
             Whether to abort the upload on any failure.
 
             Setting this to `False` can be helpful for diagnosing upload problems.
+            The session can then be resumed with :py:func:`~.resume_upload`
+            if ``resumable`` is True.
+
+        link_unchanged:
+            Whether to compare the files against the latest version of the
+            asset before starting the upload, converting unchanged files
+            into links, see
+            :py:func:`~gypsum_client.prepare_directory_for_upload.link_unchanged_files`.
+            Defaults to False.
+
+        resumable:
+            Whether to record the upload session in ``cache_dir``, see
+            :py:func:`~gypsum_client.upload_api_operations.start_upload`.
+            Defaults to False.
 
     Returns:
         `True` if successfull, otherwise `False`.
@@ -112,7 +136,23 @@ def upload_directory(
     if token is None:
         token = access_token()
 
-    listing = prepare_directory_upload(directory, links="always", cache_dir=cache_dir)
+    listing = prepare_directory_upload(
+        directory,
+        links="always",
+        cache_dir=cache_dir,
+        checksums=True,
+        concurrent=concurrent,
+    )
+    if link_unchanged:
+        listing = link_unchanged_files(
+            listing,
+            directory,
+            project,
+            asset,
+            cache_dir=cache_dir,
+            url=url,
+            concurrent=concurrent,
+        )
 
     blob = start_upload(
         project=project,
@@ -124,30 +164,152 @@ def upload_directory(
         probation=probation,
         url=url,
         token=token,
+        concurrent=concurrent,
+        cache_dir=cache_dir,
+        resumable=resumable,
     )
 
     success = False
     try:
-        upload_files(blob, directory=directory, url=url, concurrent=concurrent)
-        complete_upload(blob, url=url)
+        upload_files(
+            blob,
+            directory=directory,
+            url=url,
+            concurrent=concurrent,
+            cache_dir=cache_dir,
+        )
+        complete_upload(blob, url=url, cache_dir=cache_dir)
         success = True
     finally:
         if abort_failed and not success:
-            abort_upload(blob)
+            abort_upload(blob, url=url, cache_dir=cache_dir)
 
     return success
 
 
-def _upload_file_wrapper(args):
-    file_info, directory, url, session_token = args
-    _upload_file(file_info, directory, url, session_token)
+def resume_upload(
+    project: str,
+    asset: str,
+    version: str,
+    cache_dir: str = cache_directory(),
+    directory: Optional[str] = None,
+    url: Optional[str] = None,
+    concurrent: int = 1,
+    retries: int = 3,
+    report: Optional[dict] = None,
+) -> bool:
+    """Resume an interrupted upload.
+
+    Upload sessions started by
+    :py:func:`~gypsum_client.upload_api_operations.start_upload` with
+    ``resumable=True`` are recorded in the cache directory, along with the files that have been
+    uploaded so far. This function picks up the most recent unfinished
+    session for a version of an asset, uploads only the files that are
+    still missing and completes the upload.
+
+    See Also:
+        :py:func:`~.upload_directory`, to upload a directory
+        (with ``resumable=True`` and ``abort_failed=False`` to keep the
+        session on failure).
+
+    Example:
+
+        .. code-block:: python
+
+            # After an interrupted upload_directory(..., resumable=True) call.
+            resume_upload("test-Py", "upload-dir", "1")
+
+    Args:
+        project:
+            Project name.
+
+        asset:
+            Asset name.
+
+        version:
+            Version name.
+
+        cache_dir:
+            Path to the cache directory containing the session records.
+
+        directory:
+            Path to the directory containing the files. If None, the
+            directory that was used to start the upload is used.
+
+        url:
+            URL of the gypsum REST API. If None, the URL that was used to
+            start the upload is used.
+
+        concurrent:
+            Number of concurrent uploads.
+            Defaults to 1.
+
+        retries:
+            Number of times to retry a file after a transient failure,
+            see :py:func:`~.upload_files`.
+            Defaults to 3.
+
+        report:
+            Dictionary to be filled with the status of each file that was
+            uploaded by this call, see :py:func:`~.upload_files`.
+
+    Returns:
+        `True` if the upload was completed.
+    """
+    sessions = _find_sessions(cache_dir, project, asset, version)
+    if len(sessions) == 0:
+        raise ValueError(
+            f"No unfinished upload session for '{project}/{asset}/{version}' in the cache."
+        )
+
+    with open(sessions[0], "r") as handle:
+        record = json.load(handle)
+
+    init = record["init"]
+    if directory is None:
+        directory = record["directory"]
+    if url is None:
+        url = record["url"]
+
+    done = _uploaded_files(sessions[0])
+    remaining = dict(init)
+    remaining["file_urls"] = [f for f in init["file_urls"] if f["path"] not in done]
+
+    upload_files(
+        remaining,
+        directory=directory,
+        url=url,
+        concurrent=concurrent,
+        retries=retries,
+        report=report,
+        cache_dir=cache_dir,
+    )
+    complete_upload(init, url=url, cache_dir=cache_dir)
+    return True
 
 
 def upload_files(
-    init: dict, directory: str = None, url: str = rest_url(), concurrent: int = 1
+    init: dict,
+    directory: str = None,
+    url: str = rest_url(),
+    concurrent: int = 1,
+    retries: int = 3,
+    report: Optional[dict] = None,
+    progress: Optional[Callable[[str, int, int], None]] = None,
+    cache_dir: Optional[str] = cache_directory(),
 ):
     """Upload files in an initialized upload session for a version of an asset.
 
+    Files are uploaded in threads that share the pooled HTTP session.
+    Each file is retried with exponential backoff on connection errors
+    and on server errors (5xx, 408 and 429), fetching a new pre-signed URL
+    for every attempt. An exception is only raised after all other files
+    have been attempted.
+
+    Files with the ``multipart`` upload method are split into parts
+    that are uploaded concurrently, each with its own retries, see
+    :py:data:`~gypsum_client.config.UPLOAD_MOD`.
+
     Args:
         init:
             Dictionary containing ``file_urls`` and ``session_token``.
@@ -164,22 +326,131 @@ def upload_files(
         concurrent:
             Number of concurrent uploads.
             Defaults to 1.
+
+        retries:
+            Number of times to retry a file after a transient failure.
+            Defaults to 3.
+
+        report:
+            Dictionary to be filled with the status of each file, keyed by
+            its path. Each value is a dictionary containing ``status``, either
+            ``"uploaded"`` or ``"failed"``; ``attempts``, the number of
+            attempts; and ``error``, the error message for failed files.
+            This is filled even if an exception is raised.
+
+        progress:
+            Function to be called as each file or part of a file is uploaded.
+            This is called with the path of the file, the number of bytes of
+            that file uploaded so far and the total size of the file.
+            It may be called from multiple threads.
+
+        cache_dir:
+            Path to the cache directory in which the session was recorded
+            by :py:func:`~gypsum_client.upload_api_operations.start_upload`.
+            Each uploaded file is noted in this record, so that an
+            interrupted upload can be continued with :py:func:`~.resume_upload`.
+            If None, uploaded files are not recorded.
     """
     url = _remove_slash_url(url)
+    if report is None:
+        report = {}
+
+    def _upload_one(file_info):
+        attempts, error = _call_with_retries(
+            lambda: _upload_file(
+                file_info,
+                directory,
+                url,
+                init["session_token"],
+                retries=retries,
+                progress=progress,
+            ),
+            retries,
+        )
+        if error is None and cache_dir is not None:
+            _mark_uploaded(cache_dir, init, file_info["path"])
+
+        report[file_info["path"]] = {
+            "status": "uploaded" if error is None else "failed",
+            "attempts": attempts,
+            "error": None if error is None else str(error),
+        }
+        return error
 
     if concurrent <= 1:
-        for file_info in init["file_urls"]:
-            _upload_file(file_info, directory, url, init["session_token"])
+        errors = [_upload_one(file_info) for file_info in init["file_urls"]]
     else:
-        with Pool(concurrent) as pool:
-            _args = [
-                (file_info, directory, url, init["session_token"])
-                for file_info in init["file_urls"]
-            ]
-            pool.map(_upload_file_wrapper, _args)
+        with ThreadPoolExecutor(max_workers=concurrent) as pool:
+            errors = list(pool.map(_upload_one, init["file_urls"]))
+
+    failed = [
+        (info["path"], e) for info, e in zip(init["file_urls"], errors) if e is not None
+    ]
+    if failed:
+        path, error = failed[0]
+        raise Exception(
+            f"Failed to upload {len(failed)} of {len(errors)} files, "
+            f"e.g., '{path}': {str(error)}"
+        ) from error
+
+
+class _UploadError(Exception):
+    def __init__(self, message: str, retryable: bool = True):
+        super().__init__(message)
+        self.retryable = retryable
+
+
+_RETRY_BACKOFF = 0.5
+_RETRY_MAX_WAIT = 30
+
+
+def _call_with_retries(fun: Callable, retries: int):
+    attempt = 0
+    while True:
+        attempt += 1
+        try:
+            fun()
+            return attempt, None
+        except (requests.ConnectionError, requests.Timeout) as e:
+            error = e
+        except _UploadError as e:
+            if not e.retryable:
+                return attempt, e
+            error = e
+        except Exception as e:
+            return attempt, e
 
+        if attempt > retries:
+            return attempt, error
 
-def _upload_file(info: dict, directory: str, url: str, token: str):
+        wait = min(_RETRY_BACKOFF * 2 ** (attempt - 1), _RETRY_MAX_WAIT)
+        time.sleep(wait + random.uniform(0, _RETRY_BACKOFF))
+
+
+def _is_retryable_status(status: int) -> bool:
+    return status >= 500 or status in (408, 429)
+
+
+def _raise_for_upload_status(res, message: str, expired_ok: bool = False):
+    try:
+        res.raise_for_status()
+    except Exception as e:
+        # Pre-signed URLs may expire, but a new one is fetched on retry.
+        raise _UploadError(
+            f"{message}, {res.status_code} and reason: {res.text}",
+            retryable=_is_retryable_status(res.status_code)
+            or (expired_ok and res.status_code == 403),
+        ) from e
+
+
+def _upload_file(
+    info: dict,
+    directory: str,
+    url: str,
+    token: str,
+    retries: int = 0,
+    progress: Optional[Callable[[str, int, int], None]] = None,
+):
     _path = info["path"]
 
     if directory is not None:
@@ -188,29 +459,131 @@ def _upload_file(info: dict, directory: str, url: str, token: str):
     if info["method"] == "presigned":
         req_url = f"{url}{info['url']}"
         headers = {"Authorization": f"Bearer {token}"}
-        res = requests.post(req_url, headers=headers, verify=REQUESTS_MOD["verify"])
-        try:
-            res.raise_for_status()
-        except Exception as e:
-            raise Exception(
-                f"Failed to fetch pre-signed url, {res.status_code} and reason: {res.text}"
-            ) from e
+        res = _get_session().post(
+            req_url, headers=headers, verify=REQUESTS_MOD["verify"]
+        )
+        _raise_for_upload_status(res, "Failed to fetch pre-signed url")
 
         presigned = res.json()
 
         req2_url = presigned["url"]
         headers2 = {"Content-MD5": presigned["md5sum_base64"]}
         with open(_path, "rb") as f:
-            res2 = requests.put(
+            res2 = _get_session().put(
                 req2_url, headers=headers2, data=f, verify=REQUESTS_MOD["verify"]
             )
-            try:
-                res2.raise_for_status()
-            except Exception as e:
-                raise Exception(
-                    f"Failed to upload assets in the project, {res2.status_code} and reason: {res2.text}"
-                ) from e
+            _raise_for_upload_status(
+                res2, "Failed to upload assets in the project", expired_ok=True
+            )
+
+        if progress is not None:
+            size = os.path.getsize(_path)
+            progress(info["path"], size, size)
+
+    elif info["method"] == "multipart":
+        _upload_multipart(info, _path, url, token, retries, progress)
+
     else:
         raise ValueError(
             f"unknown upload method '{info['method']}' for file '{info['path']}'"
         )
+
+
+def _upload_multipart(
+    info: dict,
+    path: str,
+    url: str,
+    token: str,
+    retries: int,
+    progress: Optional[Callable[[str, int, int], None]],
+):
+    headers = {"Authorization": f"Bearer {token}"}
+    res = _get_session().post(
+        f"{url}{info['url']}", headers=headers, verify=REQUESTS_MOD["verify"]
+    )
+    _raise_for_upload_status(res, "Failed to start a multipart upload")
+    plan = res.json()
+
+    size = os.path.getsize(path)
+    part_size = plan["part_size"]
+    etags = {}
+    uploaded = [0]
+    lock = threading.Lock()
+
+    def _upload_part(part):
+        start = (part["number"] - 1) * part_size
+        length = max(min(part_size, size - start), 0)
+
+        def _put():
+            with open(path, "rb") as f:
+                res = _get_session().put(
+                    part["url"],
+                    data=_FileSlice(f, start, length),
+                    verify=REQUESTS_MOD["verify"],
+                )
+            _raise_for_upload_status(
+                res, f"Failed to upload part {part['number']}", expired_ok=True
+            )
+            etags[part["number"]] = res.headers.get("ETag")
+
+        _, error = _call_with_retries(_put, retries)
+        if error is not None:
+            # Part-level retries are exhausted, so retrying the whole
+            # file would only repeat the same work.
+            raise _UploadError(str(error), retryable=False) from error
+
+        if progress is not None:
+            with lock:
+                uploaded[0] += length
+                done = uploaded[0]
+            progress(info["path"], done, size)
+
+    parts = plan["parts"]
+    workers = min(UPLOAD_MOD["part_concurrency"], len(parts))
+    if workers <= 1:
+        for part in parts:
+            _upload_part(part)
+    else:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(_upload_part, part) for part in parts]
+            try:
+                for fut in as_completed(futures):
+                    fut.result()
+            finally:
+                for fut in futures:
+                    fut.cancel()
+
+    res = _get_session().post(
+        f"{url}{plan['complete_url']}",
+        json={
+            "parts": [
+                {"number": number, "etag": etags[number]} for number in sorted(etags)
+            ]
+        },
+        headers=headers,
+        verify=REQUESTS_MOD["verify"],
+    )
+    _raise_for_upload_status(res, "Failed to complete a multipart upload")
+
+
+class _FileSlice:
+    """File-like view of a byte range, so that each part is streamed
+    from disk rather than read into memory."""
+
+    def __init__(self, handle, start: int, length: int):
+        self._handle = handle
+        self._remaining = length
+        self._length = length
+        handle.seek(start)
+
+    def __len__(self):
+        return self._length
+
+    def read(self, size: int = -1) -> bytes:
+        if self._remaining <= 0:
+            return b""
+        if size is None or size < 0 or size > self._remaining:
+            size = self._remaining
+        chunk = self._handle.read(size)
+        self._remaining -= len(chunk)
+        return chunk
@@ -7,9 +7,220 @@
     - https://docs.pytest.org/en/stable/writing_plugins.html
 """
 
-# import pytest
+import hashlib
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote_plus, urlparse
+
+import pytest
 
 ##### ONLY IF CERITIFICATES ARE NOT SET #####
 # from gypsum_client.config import REQUESTS_MOD
 # REQUESTS_MOD["verify"] = False
-#####
\ No newline at end of file
+#####
+
+
+class _StandIn(BaseHTTPRequestHandler):
+    """Minimal stand-in for the upload, listing, file and removal endpoints
+    of the gypsum API and the object store, so that these can be tested
+    offline."""
+
+    part_size = 10
+    objects = {}
+    parts = {}
+    failures = {}
+    completed = []
+    listed = []
+    fetched = []
+    not_modified = []
+    ranges = []
+    corrupt = {}
+    broken_ranges = {}
+    ignore_ranges = set()
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, status, payload=None, headers=None):
+        body = b"" if payload is None else json.dumps(payload).encode()
+        self.send_response(status)
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        body = self.rfile.read(length)
+        host = f"http://{self.headers['Host']}"
+
+        kind, path = self.path.split("/", 3)[2:]
+        if kind == "start":
+            files = json.loads(body)["files"]
+            return self._send(
+                200,
+                {
+                    "file_urls": [
+                        {
+                            "path": f["path"],
+                            "method": "presigned",
+                            "url": f"/upload/presigned-file/{f['path']}",
+                        }
+                        for f in files
+                        if f["type"] != "link"
+                    ],
+                    "complete_url": f"/upload/complete/{path}",
+                    "abort_url": f"/upload/abort/{path}",
+                    "session_token": "tok",
+                },
+            )
+
+        if self.headers.get("Authorization") != "Bearer tok":
+            return self._send(401, {"status": "error", "reason": "bad token"})
+
+        if kind in ("complete", "abort", "approve", "reject"):
+            self.completed.append((kind, path))
+            return self._send(200, {})
+        if kind == "presigned-file":
+            return self._send(200, {"url": f"{host}/put/{path}", "md5sum_base64": ""})
+
+        if kind == "multipart-file":
+            size = self.server.sizes[path]
+            nparts = max((size + self.part_size - 1) // self.part_size, 1)
+            return self._send(
+                200,
+                {
+                    "part_size": self.part_size,
+                    "parts": [
+                        {"number": i + 1, "url": f"{host}/part/{i + 1}/{path}"}
+                        for i in range(nparts)
+                    ],
+                    "complete_url": f"/upload/multipart-complete/{path}",
+                },
+            )
+
+        if kind == "multipart-complete":
+            parts = json.loads(body)["parts"]
+            contents = b""
+            for part in parts:
+                data = self.parts[(path, part["number"])]
+                assert part["etag"] == hashlib.md5(data).hexdigest()
+                contents += data
+            self.objects[path] = contents
+            return self._send(200, {})
+
+        self._send(404)
+
+    def do_GET(self):
+        parsed = urlparse(self.path)
+        if parsed.path.startswith("/file/"):
+            key = unquote_plus(parsed.path[len("/file/") :])
+            self.fetched.append(key)
+            if key not in self.objects:
+                return self._send(404, {"status": "error", "reason": "missing"})
+
+            body = self.objects[key]
+            etag = f'"{hashlib.md5(body).hexdigest()}"'
+            if self.headers.get("If-None-Match") == etag:
+                self.not_modified.append(key)
+                return self._send(304, headers={"ETag": etag})
+
+            if self.corrupt.get(key, 0) > 0:
+                self.corrupt[key] -= 1
+                body = bytes([body[0] ^ 0xFF]) + body[1:]
+
+            status = 200
+            headers = {"ETag": etag}
+            requested = self.headers.get("Range")
+            if requested is not None:
+                self.ranges.append((key, requested))
+                if self.broken_ranges.get((key, requested), 0) > 0:
+                    self.broken_ranges[(key, requested)] -= 1
+                    return self._send(404, {"status": "error", "reason": "broken"})
+
+            if requested is not None and key not in self.ignore_ranges:
+                start, end = requested[len("bytes=") :].split("-")
+                start = int(start)
+                end = int(end) if end else len(body) - 1
+                if start >= len(body):
+                    return self._send(416)
+                headers["Content-Range"] = f"bytes {start}-{end}/{len(body)}"
+                body = body[start : end + 1]
+                status = 206
+
+            self.send_response(status)
+            for k, v in headers.items():
+                self.send_header(k, v)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            return
+
+        if parsed.path != "/list":
+            return self._send(404)
+
+        query = parse_qs(parsed.query)
+        prefix = query.get("prefix", [""])[0]
+        recursive = query.get("recursive", ["false"])[0] == "true"
+        self.listed.append(prefix)
+
+        found = set()
+        for key in self.objects:
+            if not key.startswith(prefix):
+                continue
+            rest = key[len(prefix) :]
+            if recursive or "/" not in rest:
+                found.add(key)
+            else:
+                found.add(prefix + rest.split("/")[0] + "/")
+        self._send(200, sorted(found))
+
+    def do_DELETE(self):
+        prefix = unquote_plus(self.path[len("/remove/") :]) + "/"
+        for key in list(self.objects):
+            if key.startswith(prefix):
+                del self.objects[key]
+        self._send(200, {})
+
+    def do_PUT(self):
+        length = int(self.headers.get("Content-Length", 0))
+        body = self.rfile.read(length)
+
+        key = self.path
+        if self.failures.get(key, 0) > 0:
+            self.failures[key] -= 1
+            return self._send(503, {"status": "error", "reason": "try again"})
+
+        if self.path.startswith("/put/"):
+            self.objects[self.path[5:]] = body
+            return self._send(200)
+
+        number, path = self.path[6:].split("/", 1)
+        self.parts[(path, int(number))] = body
+        self._send(200, headers={"ETag": hashlib.md5(body).hexdigest()})
+
+
+@pytest.fixture
+def stand_in():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _StandIn)
+    server.handler = _StandIn
+    server.sizes = {}
+    _StandIn.objects.clear()
+    _StandIn.parts.clear()
+    _StandIn.failures.clear()
+    _StandIn.completed.clear()
+    _StandIn.listed.clear()
+    _StandIn.fetched.clear()
+    _StandIn.not_modified.clear()
+    _StandIn.ranges.clear()
+    _StandIn.corrupt.clear()
+    _StandIn.broken_ranges.clear()
+    _StandIn.ignore_ranges.clear()
+
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
@@ -0,0 +1,169 @@
+import asyncio
+import os
+import tempfile
+
+import pytest
+
+aio = pytest.importorskip("gypsum_client.aio")
+
+__author__ = "Jayaram Kancherla"
+__copyright__ = "Jayaram Kancherla"
+__license__ = "MIT"
+
+blah_contents = (
+    "A\nB\nC\nD\nE\nF\nG\nH\nI\nJ\nK\nL\nM\nN\nO\nP\nQ\nR\nS\nT\nU\nV\nW\nX\nY\nZ\n"
+)
+foobar_contents = "1 2 3 4 5\n6 7 8 9 10\n"
+
+
+def _run(coro):
+    async def _wrapped():
+        try:
+            return await coro
+        finally:
+            await aio.close_session()
+
+    return asyncio.run(_wrapped())
+
+
+def test_aio_fetch_and_list():
+    cache = tempfile.mkdtemp()
+
+    man = _run(aio.fetch_manifest("test-R", "basic", "v1", cache_dir=cache))
+    assert sorted(man.keys()) == ["blah.txt", "foo/bar.txt"]
+    assert os.path.exists(
+        os.path.join(cache, "bucket", "test-R", "basic", "v1", "..manifest")
+    )
+
+    assert "basic" in _run(aio.list_assets("test-R"))
+    assert sorted(_run(aio.list_files("test-R", "basic", "v1"))) == sorted(
+        ["..summary", "..manifest", "blah.txt", "foo/bar.txt"]
+    )
+
+
+def test_aio_save_version_shares_the_cache():
+    from gypsum_client import save_file
+
+    cache = tempfile.mkdtemp()
+
+    out = _run(aio.save_version("test-R", "basic", "v3", cache_dir=cache, concurrent=2))
+    assert open(os.path.join(out, "blah.txt"), "r").read() == blah_contents
+    assert open(os.path.join(out, "foo", "bar.txt"), "r").read() == foobar_contents
+    assert os.path.exists(
+        os.path.join(cache, "status", "test-R", "basic", "v3", "COMPLETE")
+    )
+
+    # The synchronous client re-uses the files cached by the asynchronous one.
+    path = os.path.join(out, "blah.txt")
+    with open(path, "w") as f:
+        f.write("foo")
+    out = save_file("test-R", "basic", "v3", "blah.txt", cache_dir=cache)
+    assert open(out, "r").read() == "foo"
+
+
+def test_aio_save_updates_cache_index(stand_in):
+    import json
+
+    from gypsum_client import cache_usage, is_version_cached
+
+    url = f"http://127.0.0.1:{stand_in.server_address[1]}"
+    objects = stand_in.handler.objects
+    objects["test-Py/aio/v1/..manifest"] = json.dumps(
+        {"a.txt": {"size": 5}, "foo/b.txt": {"size": 6}}
+    ).encode()
+    objects["test-Py/aio/v1/a.txt"] = b"aaaaa"
+    objects["test-Py/aio/v1/foo/b.txt"] = b"bbbbbb"
+
+    cache = tempfile.mkdtemp()
+    assert not is_version_cached("test-Py", "aio", "v1", cache_dir=cache)
+    assert os.path.exists(os.path.join(cache, "index.sqlite3"))
+
+    _run(aio.save_file("test-Py", "aio", "v1", "a.txt", cache_dir=cache, url=url))
+    assert cache_usage("test-Py", "aio", cache_dir=cache) == 5
+    assert not is_version_cached("test-Py", "aio", "v1", cache_dir=cache)
+
+    _run(aio.save_version("test-Py", "aio", "v1", cache_dir=cache, url=url))
+    assert is_version_cached("test-Py", "aio", "v1", cache_dir=cache)
+    assert cache_usage("test-Py", "aio", "v1", cache_dir=cache) == 11
+
+    # Versions that are missing from the index fall back to the marker.
+    status = os.path.join(cache, "status", "test-Py", "other", "v1")
+    os.makedirs(status)
+    with open(os.path.join(status, "COMPLETE"), "w"):
+        pass
+    assert is_version_cached("test-Py", "other", "v1", cache_dir=cache)
+
+
+def test_aio_save_file_concurrency_and_cleanup(stand_in):
+    from gypsum_client.aio._utils import _save_file
+
+    url = f"http://127.0.0.1:{stand_in.server_address[1]}"
+    stand_in.handler.objects["test-Py/aio/v1/a.txt"] = b"aaaaa"
+    cache = tempfile.mkdtemp()
+    dest = os.path.join(cache, "a.txt")
+
+    # Coroutines saving the same file wait for each other.
+    async def _both():
+        return await asyncio.gather(
+            _save_file("test-Py/aio/v1/a.txt", dest, overwrite=False, url=url),
+            _save_file("test-Py/aio/v1/a.txt", dest, overwrite=False, url=url),
+        )
+
+    assert _run(_both()) == [True, True]
+    assert open(dest, "rb").read() == b"aaaaa"
+    assert stand_in.handler.fetched.count("test-Py/aio/v1/a.txt") == 1
+
+    # Failed downloads do not leave temporary files behind.
+    missing = os.path.join(cache, "missing.txt")
+    coro = _save_file("test-Py/aio/v1/missing.txt", missing, False, url, error=False)
+    assert _run(coro) is False
+    assert sorted(f for f in os.listdir(cache) if not f.endswith(".LOCK")) == ["a.txt"]
+
+
+def test_aio_complete_upload_invalidates_caches(stand_in):
+    import json
+
+    from gypsum_client import CACHE_MOD, fetch_latest
+    from gypsum_client._latest_cache import _forget_latest
+
+    url = f"http://127.0.0.1:{stand_in.server_address[1]}"
+    objects = stand_in.handler.objects
+    objects["test-Py/latest/..latest"] = json.dumps({"version": "v1"}).encode()
+
+    old = CACHE_MOD.copy()
+    try:
+        CACHE_MOD["latest_cache_ttl"] = 60
+        assert fetch_latest("test-Py", "latest", url=url) == "v1"
+
+        objects["test-Py/latest/..latest"] = json.dumps({"version": "v2"}).encode()
+        init = {"complete_url": "/upload/complete/test-Py", "session_token": "tok"}
+        _run(aio.complete_upload(init, url=url))
+        assert fetch_latest("test-Py", "latest", url=url) == "v2"
+    finally:
+        CACHE_MOD.clear()
+        CACHE_MOD.update(old)
+        _forget_latest(project="test-Py")
+
+
+def test_aio_resolve_links_skips_cached_links(stand_in):
+    import json
+
+    url = f"http://127.0.0.1:{stand_in.server_address[1]}"
+    objects = stand_in.handler.objects
+    link = {"project": "test-Py", "asset": "aio", "version": "v1", "path": "a.txt"}
+    objects["test-Py/aio/v2/..manifest"] = json.dumps(
+        {"b.txt": {"size": 5, "link": link}}
+    ).encode()
+    objects["test-Py/aio/v1/a.txt"] = b"aaaaa"
+
+    cache = tempfile.mkdtemp()
+    _run(aio.resolve_links("test-Py", "aio", "v2", cache_dir=cache, url=url))
+    path = os.path.join(cache, "bucket", "test-Py", "aio", "v2", "b.txt")
+    assert open(path, "rb").read() == b"aaaaa"
+
+    # Existing files in the cache are only replaced if 'overwrite=True'.
+    os.unlink(path)
+    with open(path, "wb") as f:
+        f.write(b"kept")
+    _run(aio.resolve_links("test-Py", "aio", "v2", cache_dir=cache, url=url))
+    assert open(path, "rb").read() == b"kept"
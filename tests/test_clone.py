@@ -1,8 +1,9 @@
+import json
 import os
 import tempfile
 
 import pytest
-from gypsum_client import clone_version
+from gypsum_client import clone_version, open_clone_file
 
 __author__ = "Jayaram Kancherla"
 __copyright__ = "Jayaram Kancherla"
@@ -75,3 +76,62 @@ def test_clone_version_works_correctly_if_version_itself_contains_links():
     l2 = os.readlink(os.path.join(dest, "foo/bar.txt"))
     assert l2.endswith("test-R/basic/v2/foo/bar.txt")
     assert not os.path.exists(l2)
+
+
+@pytest.mark.skipif(
+    os.name == "nt",
+    reason="download='lazy' can't work on Windows if symbolic links aren't available.",
+)
+def test_clone_version_lazy(stand_in):
+    url = f"http://127.0.0.1:{stand_in.server_address[1]}"
+    objects = stand_in.handler.objects
+    objects["test-Py/lazy/v1/..manifest"] = json.dumps(
+        {"a.txt": {"size": 5}, "foo/b.txt": {"size": 6}}
+    ).encode()
+    objects["test-Py/lazy/v1/a.txt"] = b"aaaaa"
+    objects["test-Py/lazy/v1/foo/b.txt"] = b"bbbbbb"
+
+    cache = tempfile.mkdtemp()
+    dest = tempfile.mkdtemp()
+    clone_version(
+        "test-Py",
+        "lazy",
+        "v1",
+        destination=dest,
+        download="lazy",
+        cache_dir=cache,
+        url=url,
+    )
+
+    l1 = os.readlink(os.path.join(dest, "foo/b.txt"))
+    assert not os.path.exists(l1)
+
+    # Only the opened file is downloaded, using the recorded cache and URL.
+    with open_clone_file(os.path.join(dest, "foo/b.txt")) as handle:
+        assert handle.read() == "bbbbbb"
+    assert os.path.exists(l1)
+    assert "test-Py/lazy/v1/a.txt" not in stand_in.handler.fetched
+
+    with open_clone_file(
+        os.path.join(dest, "foo/b.txt"), "rb", cache_dir=cache, url=url
+    ) as handle:
+        assert handle.read() == b"bbbbbb"
+    assert stand_in.handler.fetched.count("test-Py/lazy/v1/foo/b.txt") == 1
+
+    with pytest.raises(ValueError, match="reading"):
+        open_clone_file(os.path.join(dest, "a.txt"), "w", cache_dir=cache, url=url)
+
+    with open(os.path.join(dest, "new.txt"), "w") as handle:
+        handle.write("new")
+    with open_clone_file(os.path.join(dest, "new.txt"), cache_dir=cache) as handle:
+        assert handle.read() == "new"
+
+    with pytest.raises(ValueError, match="download"):
+        clone_version("test-Py", "lazy", "v1", destination=dest, download="yes")
+
+    # Other values are still interpreted as booleans.
+    dest = tempfile.mkdtemp()
+    clone_version(
+        "test-Py", "lazy", "v1", destination=dest, download=1, cache_dir=cache, url=url
+    )
+    assert stand_in.handler.fetched.count("test-Py/lazy/v1/a.txt") == 1
@@ -4,6 +4,7 @@ import tempfile
 from datetime import datetime
 
 import pytest
+from gypsum_client._manifest_cache import _forget_manifests
 from gypsum_client.fetch_operations import (
     fetch_latest,
     fetch_manifest,
@@ -13,6 +14,8 @@ from gypsum_client.fetch_operations import (
     fetch_usage,
 )
 from gypsum_client.fetch_metadata_schema import fetch_metadata_schema
+from gypsum_client.probation_operations import reject_probation
+from gypsum_client.upload_api_operations import start_upload
 
 __author__ = "Jayaram Kancherla"
 __copyright__ = "Jayaram Kancherla"
@@ -24,6 +27,10 @@ def test_fetch_manifest():
     man = fetch_manifest("test-R", "basic", "v1", cache_dir=cache)
     assert sorted(man.keys()) == ["blah.txt", "foo/bar.txt"]
 
+    # Kept in memory.
+    assert fetch_manifest("test-R", "basic", "v1", cache_dir=cache) is man
+    _forget_manifests(project="test-R")
+
     # Uses the cache.
     with open(
         os.path.join(cache, "bucket", "test-R", "basic", "v1", "..manifest"), "w"
@@ -36,11 +43,72 @@ def test_fetch_manifest():
     # Unless we overwrite it.
     man = fetch_manifest("test-R", "basic", "v1", cache_dir=cache, overwrite=True)
     assert len(man) > 0
+    assert fetch_manifest("test-R", "basic", "v1", cache_dir=cache) is man
 
     with pytest.raises(Exception):
         fetch_manifest("test-R", "basic", "non-existent", cache_dir=cache)
 
 
+def test_fetch_manifest_memoized(stand_in):
+    url = f"http://127.0.0.1:{stand_in.server_address[1]}"
+    objects = stand_in.handler.objects
+    for ver, probation in [("v1", False), ("v2", True)]:
+        summary = {
+            "upload_user_id": "jkanche",
+            "upload_start": "2024-01-01T00:00:00Z",
+            "upload_finish": "2024-01-01T00:00:01Z",
+        }
+        if probation:
+            summary["on_probation"] = True
+        objects[f"test-Py/memo/{ver}/..summary"] = json.dumps(summary).encode()
+        objects[f"test-Py/memo/{ver}/..manifest"] = json.dumps(
+            {"blah.txt": {"size": 1, "md5sum": "x"}}
+        ).encode()
+
+    cache = tempfile.mkdtemp()
+    try:
+        man = fetch_manifest("test-Py", "memo", "v1", cache_dir=cache, url=url)
+        count = len(stand_in.handler.fetched)
+        assert fetch_manifest("test-Py", "memo", "v1", cache_dir=cache, url=url) is man
+        assert fetch_manifest("test-Py", "memo", "v1", cache_dir=None, url=url) is man
+        assert len(stand_in.handler.fetched) == count
+
+        # No summary is needed, even for versions on probation.
+        man = fetch_manifest("test-Py", "memo", "v2", cache_dir=None, url=url)
+        assert fetch_manifest("test-Py", "memo", "v2", cache_dir=None, url=url) is man
+        assert not any(k.endswith("..summary") for k in stand_in.handler.fetched)
+
+        # But versions that are known to be on probation are not kept.
+        fetch_summary("test-Py", "memo", "v2", cache_dir=None, url=url)
+        count = len(stand_in.handler.fetched)
+        for _ in range(2):
+            fetch_manifest("test-Py", "memo", "v2", cache_dir=None, url=url)
+        assert stand_in.handler.fetched[count:].count("test-Py/memo/v2/..manifest") == 2
+
+        # Likewise for versions uploaded on probation by this process.
+        start_upload("test-Py", "memo", "v3", [], probation=True, url=url, token="tok")
+        objects["test-Py/memo/v3/..manifest"] = objects["test-Py/memo/v1/..manifest"]
+        count = len(stand_in.handler.fetched)
+        for _ in range(2):
+            fetch_manifest("test-Py", "memo", "v3", cache_dir=None, url=url)
+        assert stand_in.handler.fetched[count:].count("test-Py/memo/v3/..manifest") == 2
+
+        # Rejection forgets the manifest, as the version may be uploaded again.
+        reject_probation("test-Py", "memo", "v2", url=url, token="tok")
+        count = len(stand_in.handler.fetched)
+        fetch_manifest("test-Py", "memo", "v2", cache_dir=None, url=url)
+        assert "test-Py/memo/v2/..manifest" in stand_in.handler.fetched[count:]
+
+        # A different cache directory still gets its own copy of the manifest.
+        other = tempfile.mkdtemp()
+        assert fetch_manifest("test-Py", "memo", "v1", cache_dir=other, url=url) == man
+        assert os.path.exists(
+            os.path.join(other, "bucket", "test-Py", "memo", "v1", "..manifest")
+        )
+    finally:
+        _forget_manifests(project="test-Py")
+
+
 def test_fetch_summary():
     cache = tempfile.mkdtemp()
     xx = fetch_summary("test-R", "basic", "v1", cache_dir=cache)
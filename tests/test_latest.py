@@ -1,7 +1,10 @@
+import json
 import os
+import time
 
 import pytest
-from gypsum_client import fetch_latest, refresh_latest
+from gypsum_client import CACHE_MOD, fetch_latest, refresh_latest
+from gypsum_client._latest_cache import _forget_latest
 
 __author__ = "Jayaram Kancherla"
 __copyright__ = "Jayaram Kancherla"
@@ -21,3 +24,43 @@ def test_refresh_latest():
     ver = refresh_latest("test-R", "basic", url=app_url, token=gh_token)
     assert ver == "v3"
     assert fetch_latest("test-R", "basic", url=app_url) == ver
+
+
+def test_fetch_latest_revalidation(stand_in):
+    url = f"http://127.0.0.1:{stand_in.server_address[1]}"
+    objects = stand_in.handler.objects
+    objects["test-Py/latest/..latest"] = json.dumps({"version": "v1"}).encode()
+
+    old = CACHE_MOD.copy()
+    try:
+        # Unchanged files are revalidated without a body.
+        assert fetch_latest("test-Py", "latest", url=url) == "v1"
+        assert fetch_latest("test-Py", "latest", url=url) == "v1"
+        assert stand_in.handler.not_modified == ["test-Py/latest/..latest"]
+
+        objects["test-Py/latest/..latest"] = json.dumps({"version": "v2"}).encode()
+        assert fetch_latest("test-Py", "latest", url=url) == "v2"
+
+        # Fresh copies are re-used without any request.
+        CACHE_MOD["latest_cache_ttl"] = 60
+        count = len(stand_in.handler.fetched)
+        objects["test-Py/latest/..latest"] = json.dumps({"version": "v3"}).encode()
+        assert fetch_latest("test-Py", "latest", url=url) == "v2"
+        assert len(stand_in.handler.fetched) == count
+
+        # Stale copies are returned while they are revalidated.
+        CACHE_MOD["latest_cache_ttl"] = 0
+        CACHE_MOD["latest_stale_while_revalidate"] = 60
+        assert fetch_latest("test-Py", "latest", url=url) == "v2"
+        for _ in range(100):
+            if len(stand_in.handler.fetched) > count:
+                break
+            time.sleep(0.05)
+        assert len(stand_in.handler.fetched) > count
+
+        CACHE_MOD["latest_stale_while_revalidate"] = 0
+        assert fetch_latest("test-Py", "latest", url=url) == "v3"
+    finally:
+        CACHE_MOD.clear()
+        CACHE_MOD.update(old)
+        _forget_latest(project="test-Py")
@@ -1,9 +1,14 @@
+from gypsum_client.config import CACHE_MOD
 from gypsum_client.list_operations import (
+    invalidate_list_cache,
+    iter_files,
+    iter_versions,
     list_assets,
     list_files,
     list_projects,
     list_versions,
 )
+from gypsum_client.remove_operations import remove_version
 
 __author__ = "Jayaram Kancherla"
 __copyright__ = "Jayaram Kancherla"
@@ -43,3 +48,45 @@ def test_list_files():
 
     in_basic = list_files("test-R", "basic", "v1", prefix="..")
     assert sorted(in_basic) == sorted(["..summary", "..manifest"])
+
+
+def test_iter_versions():
+    versions = list(iter_versions("test-R", "basic"))
+    assert sorted(versions) == sorted(list_versions("test-R", "basic"))
+
+
+def test_iter_files():
+    in_basic = list(iter_files("test-R", "basic", "v1"))
+    assert sorted(in_basic) == sorted(list_files("test-R", "basic", "v1"))
+
+    in_basic = list(iter_files("test-R", "basic", "v1", prefix="foo/"))
+    assert in_basic == ["foo/bar.txt"]
+
+
+def test_list_cache(stand_in):
+    url = f"http://127.0.0.1:{stand_in.server_address[1]}"
+    for ver in ["v1", "v2"]:
+        stand_in.handler.objects[f"test-Py/cached/{ver}/blah.txt"] = b"x"
+
+    old = CACHE_MOD.copy()
+    CACHE_MOD["list_cache_ttl"] = 60
+    try:
+        assert list_versions("test-Py", "cached", url=url) == ["v1", "v2"]
+        assert list_versions("test-Py", "cached", url=url) == ["v1", "v2"]
+        assert list_projects(url=url) == ["test-Py"]
+        assert stand_in.handler.listed == ["test-Py/cached/", ""]
+
+        remove_version("test-Py", "cached", "v1", url=url, token="tok")
+        assert list_versions("test-Py", "cached", url=url) == ["v2"]
+        assert list_projects(url=url) == ["test-Py"]
+        assert stand_in.handler.listed[2:] == ["test-Py/cached/", ""]
+
+        # Changes by other clients are only seen after invalidation.
+        stand_in.handler.objects["test-Py/cached/v3/blah.txt"] = b"x"
+        assert list_versions("test-Py", "cached", url=url) == ["v2"]
+        invalidate_list_cache("test-Py", "cached")
+        assert list_versions("test-Py", "cached", url=url) == ["v2", "v3"]
+    finally:
+        CACHE_MOD.clear()
+        CACHE_MOD.update(old)
+        invalidate_list_cache()
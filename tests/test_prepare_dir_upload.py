@@ -3,7 +3,12 @@ import shutil
 import tempfile
 
 import pytest
-from gypsum_client import clone_version, prepare_directory_upload
+from gypsum_client import (
+    clone_version,
+    link_unchanged_files,
+    prepare_directory_upload,
+    save_version,
+)
 
 __author__ = "Jayaram Kancherla"
 __copyright__ = "Jayaram Kancherla"
@@ -96,3 +101,89 @@ def test_prepare_directory_upload_handles_dangling_links_correctly():
 
     shutil.rmtree(cache)
     shutil.rmtree(dest)
+
+
+def test_prepare_directory_upload_with_checksums():
+    import hashlib
+    import time
+
+    cache = tempfile.mkdtemp()
+    dest = tempfile.mkdtemp()
+    with open(os.path.join(dest, "heanna"), "w") as f:
+        f.write("sumire")
+
+    # Backdate the file so that it is eligible for the hash cache.
+    past = time.time_ns() - 10**10
+    os.utime(os.path.join(dest, "heanna"), ns=(past, past))
+
+    prepped = prepare_directory_upload(dest, cache_dir=cache, checksums=True)
+    assert prepped["files"] == [
+        {"path": "heanna", "size": 6, "md5sum": hashlib.md5(b"sumire").hexdigest()}
+    ]
+    assert os.path.exists(os.path.join(cache, "hashes.sqlite3"))
+
+    again = prepare_directory_upload(dest, cache_dir=cache, checksums=True)
+    assert again == prepped
+
+    with open(os.path.join(dest, "heanna"), "w") as f:
+        f.write("kumiko")
+
+    modified = prepare_directory_upload(dest, cache_dir=cache, checksums=True)
+    assert modified["files"][0]["md5sum"] == hashlib.md5(b"kumiko").hexdigest()
+
+    shutil.rmtree(cache)
+    shutil.rmtree(dest)
+
+
+def test_link_unchanged_files():
+    cache = tempfile.mkdtemp()
+    dest = tempfile.mkdtemp()
+
+    src = save_version("test-R", "basic", "v1", cache_dir=cache)
+    shutil.copy(os.path.join(src, "blah.txt"), os.path.join(dest, "blah.txt"))
+    with open(os.path.join(dest, "heanna"), "w") as f:
+        f.write("sumire")
+
+    prepped = prepare_directory_upload(dest, cache_dir=cache)
+    planned = link_unchanged_files(
+        prepped, dest, "test-R", "basic", version="v1", cache_dir=cache
+    )
+
+    assert [x["path"] for x in planned["files"]] == ["heanna"]
+    assert planned["links"] == [
+        {
+            "from.path": "blah.txt",
+            "to.project": "test-R",
+            "to.asset": "basic",
+            "to.version": "v1",
+            "to.path": "blah.txt",
+        }
+    ]
+
+    shutil.rmtree(cache)
+    shutil.rmtree(dest)
+
+
+def test_prepare_directory_upload_with_sizes():
+    cache = tempfile.mkdtemp()
+    dest = tempfile.mkdtemp()
+
+    os.makedirs(os.path.join(dest, "foo", "bar"))
+    for path, contents in [("heanna", "sumire"), ("foo/bar/kumiko", "oumae")]:
+        with open(os.path.join(dest, path), "w") as f:
+            f.write(contents)
+
+    expected = [
+        {"path": os.path.join("foo", "bar", "kumiko"), "size": 5},
+        {"path": "heanna", "size": 6},
+    ]
+
+    for concurrent in [1, 3]:
+        prepped = prepare_directory_upload(
+            dest, cache_dir=cache, sizes=True, concurrent=concurrent
+        )
+        assert prepped["files"] == expected
+        assert prepped["links"] == []
+
+    shutil.rmtree(cache)
+    shutil.rmtree(dest)
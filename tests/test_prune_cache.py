@@ -0,0 +1,196 @@
+import hashlib
+import json
+import os
+import sqlite3
+import tempfile
+
+from gypsum_client import (
+    CACHE_MOD,
+    cache_usage,
+    is_version_cached,
+    prune_cache,
+    save_file,
+    save_version,
+)
+from gypsum_client._cache_index import _READY
+from gypsum_client._locks import _version_lock
+
+__author__ = "Jayaram Kancherla"
+__copyright__ = "Jayaram Kancherla"
+__license__ = "MIT"
+
+
+def _mock_version(cache, version, files, accessed, complete=True):
+    for name, size in files.items():
+        path = os.path.join(cache, "bucket", "test-Py", "prune", version, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(b"x" * size)
+
+    status = os.path.join(cache, "status", "test-Py", "prune", version)
+    os.makedirs(status, exist_ok=True)
+    with open(os.path.join(status, "ACCESSED"), "w") as f:
+        f.write("1")
+    os.utime(os.path.join(status, "ACCESSED"), (accessed, accessed))
+    if complete:
+        with open(os.path.join(status, "COMPLETE"), "w"):
+            pass
+        os.utime(os.path.join(status, "COMPLETE"), (0, 0))
+
+
+def test_prune_cache():
+    cache = tempfile.mkdtemp()
+    _mock_version(cache, "v1", {"a.txt": 100, "foo/b.txt": 100}, accessed=1000)
+    _mock_version(cache, "v2", {"a.txt": 100}, accessed=3000)
+    _mock_version(cache, "v3", {"a.txt": 100}, accessed=2000)
+    _mock_version(cache, "v4", {"a.txt": 500}, accessed=0, complete=False)
+
+    # Store entries are links, so they do not add to the usage.
+    store = os.path.join(cache, "objects", "ab", "abcdef")
+    os.makedirs(os.path.dirname(store))
+    os.link(os.path.join(cache, "bucket", "test-Py", "prune", "v1", "a.txt"), store)
+
+    # Unused store entries are removed.
+    orphan = os.path.join(cache, "objects", "cd", "cdef01")
+    os.makedirs(os.path.dirname(orphan))
+    with open(orphan, "wb") as f:
+        f.write(b"x" * 50)
+
+    out = prune_cache(cache, max_bytes=None)
+    assert out == {"before": 950, "after": 900, "removed": []}
+    assert not os.path.exists(orphan)
+
+    # The least recently used versions are removed first; incomplete and
+    # locked versions are skipped.
+    with _version_lock(cache, "test-Py", "prune", "v1"):
+        out = prune_cache(cache, max_bytes=800)
+
+    assert out == {"before": 900, "after": 800, "removed": ["test-Py/prune/v3"]}
+    assert not os.path.exists(os.path.join(cache, "bucket", "test-Py", "prune", "v3"))
+    assert not os.path.exists(os.path.join(cache, "status", "test-Py", "prune", "v3"))
+
+    out = prune_cache(cache, max_bytes=600)
+    assert out == {"before": 800, "after": 600, "removed": ["test-Py/prune/v1"]}
+    assert not os.path.exists(store)
+    assert os.path.exists(os.path.join(cache, "bucket", "test-Py", "prune", "v2"))
+    assert os.path.exists(os.path.join(cache, "bucket", "test-Py", "prune", "v4"))
+
+
+def test_cache_index(stand_in):
+    cache = tempfile.mkdtemp()
+    _mock_version(cache, "v1", {"a.txt": 100, "foo/b.txt": 100}, accessed=1000)
+    _mock_version(cache, "v2", {"a.txt": 50}, accessed=0, complete=False)
+
+    # The index is created from the existing contents of the cache.
+    assert is_version_cached("test-Py", "prune", "v1", cache_dir=cache)
+    assert not is_version_cached("test-Py", "prune", "v2", cache_dir=cache)
+    assert cache_usage("test-Py", cache_dir=cache) == 250
+    assert cache_usage("test-Py", "prune", "v2", cache_dir=cache) == 50
+    assert os.path.exists(os.path.join(cache, "index.sqlite3"))
+
+    url = f"http://127.0.0.1:{stand_in.server_address[1]}"
+    objects = stand_in.handler.objects
+    objects["test-Py/index/v1/..manifest"] = json.dumps(
+        {
+            "blah.txt": {"size": 5, "md5sum": hashlib.md5(b"aaaaa").hexdigest()},
+            "foo/bar.txt": {"size": 6, "md5sum": hashlib.md5(b"bbbbbb").hexdigest()},
+        }
+    ).encode()
+    objects["test-Py/index/v1/blah.txt"] = b"aaaaa"
+    objects["test-Py/index/v1/foo/bar.txt"] = b"bbbbbb"
+
+    save_file("test-Py", "index", "v1", "blah.txt", cache_dir=cache, url=url)
+    assert cache_usage("test-Py", "index", cache_dir=cache) == 5
+    assert not is_version_cached("test-Py", "index", "v1", cache_dir=cache)
+
+    save_version("test-Py", "index", "v1", cache_dir=cache, url=url)
+    assert cache_usage("test-Py", "index", cache_dir=cache) == 11
+    assert is_version_cached("test-Py", "index", "v1", cache_dir=cache)
+    assert cache_usage(cache_dir=cache) == 261
+
+    total = prune_cache(cache)["before"]
+    out = prune_cache(cache, max_bytes=total - 1)
+    assert out["removed"] == ["test-Py/prune/v1"]
+    assert not is_version_cached("test-Py", "prune", "v1", cache_dir=cache)
+    assert cache_usage("test-Py", "prune", cache_dir=cache) == 50
+
+    # Lookups do not wait for writers, even in a new process.
+    writer = sqlite3.connect(
+        os.path.join(cache, "index.sqlite3"), timeout=0, isolation_level=None
+    )
+    writer.execute("BEGIN IMMEDIATE")
+    try:
+        _READY.clear()
+        assert is_version_cached("test-Py", "index", "v1", cache_dir=cache)
+        assert cache_usage("test-Py", "index", cache_dir=cache) == 11
+    finally:
+        writer.execute("ROLLBACK")
+        writer.close()
+
+    # Same answers without the index.
+    old = CACHE_MOD.copy()
+    CACHE_MOD["index"] = False
+    try:
+        assert not is_version_cached("test-Py", "prune", "v1", cache_dir=cache)
+        assert is_version_cached("test-Py", "index", "v1", cache_dir=cache)
+        assert cache_usage("test-Py", "prune", cache_dir=cache) == 50
+    finally:
+        CACHE_MOD.clear()
+        CACHE_MOD.update(old)
+
+
+def test_touch_version_skips_recent_accesses():
+    from gypsum_client.cache_operations import _touch_version
+
+    cache = tempfile.mkdtemp()
+    marker = os.path.join(cache, "status", "test-Py", "prune", "v1", "ACCESSED")
+
+    for _ in range(5):
+        _touch_version(cache, "test-Py", "prune", "v1")
+    assert open(marker, "r").read() == "1"
+
+    os.utime(marker, (1000, 1000))
+    _touch_version(cache, "test-Py", "prune", "v1")
+    assert open(marker, "r").read() == "2"
+
+
+def test_cache_index_counts_data_files(stand_in):
+    from gypsum_client._cache_index import _forget_ready, _record_files
+
+    url = f"http://127.0.0.1:{stand_in.server_address[1]}"
+    objects = stand_in.handler.objects
+    objects["test-Py/count/v1/..manifest"] = json.dumps(
+        {"a.txt": {"size": 5, "md5sum": hashlib.md5(b"aaaaa").hexdigest()}}
+    ).encode()
+    objects["test-Py/count/v1/..summary"] = b"{}"
+    objects["test-Py/count/v1/a.txt"] = b"aaaaa"
+
+    cache = tempfile.mkdtemp()
+    save_version("test-Py", "count", "v1", cache_dir=cache, url=url)
+    assert cache_usage("test-Py", "count", cache_dir=cache) == 5
+
+    # Internal files are not counted, whether the index is recorded,
+    # rebuilt from the cache directory or not used at all.
+    index = os.path.join(cache, "index.sqlite3")
+    os.unlink(index)
+    _forget_ready(cache)
+    assert cache_usage("test-Py", "count", cache_dir=cache) == 5
+
+    old = CACHE_MOD.copy()
+    CACHE_MOD["index"] = False
+    try:
+        assert cache_usage("test-Py", "count", cache_dir=cache) == 5
+    finally:
+        CACHE_MOD.clear()
+        CACHE_MOD.update(old)
+
+    # Totals are updated with the change in size of each recorded file.
+    _record_files(cache, "test-Py", "count", "v1", [("a.txt", 3, None)])
+    _record_files(cache, "test-Py", "count", "v1", [("b.txt", 10, None)])
+    assert cache_usage("test-Py", "count", "v1", cache_dir=cache) == 13
+
+    conn = sqlite3.connect(index)
+    try:
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "delete"
+    finally:
+        conn.close()
@@ -1,8 +1,11 @@
+import hashlib
+import json
 import os
 import tempfile
+from concurrent.futures import wait
 
 import pytest
-from gypsum_client import save_file, save_version
+from gypsum_client import fetch_manifest, prefetch, save_file, save_version
 
 __author__ = "Jayaram Kancherla"
 __copyright__ = "Jayaram Kancherla"
@@ -139,3 +142,350 @@ def test_save_version_works_as_expected_with_links():
     # Unless we force it to.
     out = save_version("test-R", "basic", "v3", cache_dir=cache, overwrite=True)
     assert open(path, "r").read() == foobar_contents
+
+
+def test_save_version_with_reusable_executor():
+    from concurrent.futures import ThreadPoolExecutor
+
+    cache = tempfile.mkdtemp()
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        stats = {}
+        out = save_version(
+            "test-R", "basic", "v1", cache_dir=cache, executor=executor, stats=stats
+        )
+        assert open(os.path.join(out, "blah.txt"), "r").read() == blah_contents
+        assert stats["files"] == 3  # ..summary, blah.txt, foo/bar.txt
+        assert stats["bytes"] > len(blah_contents) + len(foobar_contents)
+        assert stats["elapsed"] > 0
+
+        # Executor is still usable afterwards.
+        stats = {}
+        save_version(
+            "test-R",
+            "basic",
+            "v1",
+            cache_dir=cache,
+            overwrite=True,
+            executor=executor,
+            stats=stats,
+        )
+        assert stats["files"] == 3
+        assert stats["skipped"] == 0
+
+
+def test_save_version_rejects_process_executor():
+    from concurrent.futures import ProcessPoolExecutor
+
+    from gypsum_client._download import _download_files
+
+    with ProcessPoolExecutor(max_workers=1) as executor:
+        with pytest.raises(TypeError, match="ThreadPoolExecutor"):
+            _download_files([], overwrite=False, url="", executor=executor)
+
+
+def test_save_version_from_manifest():
+    cache = tempfile.mkdtemp()
+
+    out = save_version("test-R", "basic", "v1", cache_dir=cache, use_manifest=True)
+    assert open(os.path.join(out, "blah.txt"), "r").read() == blah_contents
+    assert open(os.path.join(out, "foo", "bar.txt"), "r").read() == foobar_contents
+    assert not os.path.exists(os.path.join(out, "..summary"))
+
+    # Links are only created by resolving them.
+    cache = tempfile.mkdtemp()
+    out = save_version(
+        "test-R", "basic", "v3", cache_dir=cache, use_manifest=True, relink=False
+    )
+    assert not os.path.exists(os.path.join(out, "blah.txt"))
+
+    out = save_version(
+        "test-R", "basic", "v3", cache_dir=cache, use_manifest=True, overwrite=True
+    )
+    assert open(os.path.join(out, "blah.txt"), "r").read() == blah_contents
+    assert open(os.path.join(out, "foo", "bar.txt"), "r").read() == foobar_contents
+
+
+def test_save_version_restores_from_content_store():
+    import shutil
+
+    cache = tempfile.mkdtemp()
+    save_version("test-R", "basic", "v1", cache_dir=cache)
+    assert os.path.exists(os.path.join(cache, "objects"))
+
+    # Wiping the version directory doesn't require another download.
+    shutil.rmtree(os.path.join(cache, "bucket", "test-R", "basic", "v1"))
+    shutil.rmtree(os.path.join(cache, "status", "test-R", "basic", "v1"))
+
+    stats = {}
+    out = save_version("test-R", "basic", "v1", cache_dir=cache, stats=stats)
+    assert stats["deduplicated"] == 2
+    assert open(os.path.join(out, "blah.txt"), "r").read() == blah_contents
+    assert open(os.path.join(out, "foo", "bar.txt"), "r").read() == foobar_contents
+
+
+def test_save_file_resumes_partial_download():
+    cache = tempfile.mkdtemp()
+    save_version("test-R", "basic", "v1", cache_dir=cache)
+
+    # Simulate an interrupted download by leaving a truncated partial file.
+    dest = os.path.join(cache, "bucket", "test-R", "basic", "v1", "blah.txt")
+    os.unlink(dest)
+    with open(dest + ".partial", "w") as f:
+        f.write(blah_contents[:10])
+
+    out = save_file("test-R", "basic", "v1", "blah.txt", cache_dir=cache)
+    assert out
+    assert open(dest, "r").read() == blah_contents
+    assert not os.path.exists(dest + ".partial")
+
+
+def _stand_in_version(stand_in, asset, files):
+    objects = stand_in.handler.objects
+    manifest = {
+        name: {"size": len(contents), "md5sum": hashlib.md5(contents).hexdigest()}
+        for name, contents in files.items()
+    }
+    objects[f"test-Py/{asset}/v1/..manifest"] = json.dumps(manifest).encode()
+    for name, contents in files.items():
+        objects[f"test-Py/{asset}/v1/{name}"] = contents
+
+    return f"http://127.0.0.1:{stand_in.server_address[1]}"
+
+
+def test_save_file_resumes_partial_download_offline(stand_in):
+    alpha = b"abcdefghijklmnopqrstuvwxyz"
+    digits = b"0123456789" * 3
+    url = _stand_in_version(stand_in, "resume", {"a.txt": alpha, "b.txt": digits})
+
+    cache = tempfile.mkdtemp()
+    fetch_manifest("test-Py", "resume", "v1", cache_dir=cache, url=url)
+    base = os.path.join(cache, "bucket", "test-Py", "resume", "v1")
+    os.makedirs(base, exist_ok=True)
+
+    # Interrupted downloads are resumed from the end of the partial file.
+    dest = os.path.join(base, "a.txt")
+    with open(dest + ".partial", "wb") as f:
+        f.write(alpha[:10])
+
+    save_file("test-Py", "resume", "v1", "a.txt", cache_dir=cache, url=url)
+    assert open(dest, "rb").read() == alpha
+    assert not os.path.exists(dest + ".partial")
+    assert stand_in.handler.ranges == [("test-Py/resume/v1/a.txt", "bytes=10-")]
+
+    # Resumed downloads that fail the MD5 check are restarted from scratch.
+    other = os.path.join(base, "b.txt")
+    with open(other + ".partial", "wb") as f:
+        f.write(b"X" * 10)
+
+    save_file("test-Py", "resume", "v1", "b.txt", cache_dir=cache, url=url)
+    assert open(other, "rb").read() == digits
+    assert not os.path.exists(other + ".partial")
+    assert stand_in.handler.fetched.count("test-Py/resume/v1/b.txt") == 2
+
+    # Partial files are discarded when the file is restored from the store.
+    os.unlink(dest)
+    with open(dest + ".partial", "wb") as f:
+        f.write(alpha[:10])
+
+    save_file("test-Py", "resume", "v1", "a.txt", cache_dir=cache, url=url)
+    assert open(dest, "rb").read() == alpha
+    assert not os.path.exists(dest + ".partial")
+    assert stand_in.handler.fetched.count("test-Py/resume/v1/a.txt") == 1
+
+
+def test_save_file_reuses_memoized_manifest(stand_in, monkeypatch):
+    import gypsum_client._utils as utils
+    from gypsum_client._manifest_cache import _forget_manifests
+
+    url = _stand_in_version(stand_in, "memo", {"a.txt": b"aaaaa", "b.txt": b"bb"})
+    cache = tempfile.mkdtemp()
+    fetch_manifest("test-Py", "memo", "v1", cache_dir=cache, url=url)
+
+    loads = []
+    original = utils.json.load
+    monkeypatch.setattr(
+        utils.json,
+        "load",
+        lambda *args, **kwargs: loads.append(1) or original(*args, **kwargs),
+    )
+
+    # The manifest kept in memory is used instead of parsing the cached file,
+    # and files that are already cached need no manifest at all.
+    for _ in range(2):
+        out = save_file("test-Py", "memo", "v1", "a.txt", cache_dir=cache, url=url)
+        assert open(out, "rb").read() == b"aaaaa"
+    assert loads == []
+    assert stand_in.handler.fetched.count("test-Py/memo/v1/a.txt") == 1
+
+    # Otherwise, the cached manifest is parsed once without another request.
+    _forget_manifests(url=url)
+    save_file("test-Py", "memo", "v1", "b.txt", cache_dir=cache, url=url)
+    assert len(loads) == 1
+    assert stand_in.handler.fetched.count("test-Py/memo/v1/..manifest") == 1
+
+
+def test_save_file_rechecks_after_locking(stand_in):
+    import threading
+
+    from filelock import FileLock
+    from gypsum_client._utils import _save_file
+
+    url = _stand_in_version(stand_in, "lock", {"a.txt": b"aaaaa"})
+    dest = os.path.join(tempfile.mkdtemp(), "a.txt")
+
+    # Files saved by another process while waiting for the lock are not downloaded again.
+    result = []
+    with FileLock(dest + ".LOCK"):
+        thread = threading.Thread(
+            target=lambda: result.append(
+                _save_file("test-Py/lock/v1/a.txt", dest, overwrite=False, url=url)
+            )
+        )
+        thread.start()
+        thread.join(0.5)
+        with open(dest, "wb") as f:
+            f.write(b"aaaaa")
+    thread.join()
+
+    assert result == [True]
+    assert "test-Py/lock/v1/a.txt" not in stand_in.handler.fetched
+
+
+def test_save_file_verifies_md5_offline(stand_in):
+    contents = b"hello world"
+    key = "test-Py/md5/v1/a.txt"
+    url = _stand_in_version(stand_in, "md5", {"a.txt": contents})
+
+    # Corrupted responses are downloaded again.
+    cache = tempfile.mkdtemp()
+    fetch_manifest("test-Py", "md5", "v1", cache_dir=cache, url=url)
+    stand_in.handler.corrupt[key] = 1
+    out = save_file("test-Py", "md5", "v1", "a.txt", cache_dir=cache, url=url)
+    assert open(out, "rb").read() == contents
+    assert stand_in.handler.fetched.count(key) == 2
+
+    # Nothing is left in the cache if the file stays corrupted.
+    cache = tempfile.mkdtemp()
+    fetch_manifest("test-Py", "md5", "v1", cache_dir=cache, url=url)
+    dest = os.path.join(cache, "bucket", "test-Py", "md5", "v1", "a.txt")
+    stand_in.handler.corrupt[key] = 100
+    with pytest.raises(Exception, match="MD5 checksum mismatch"):
+        save_file("test-Py", "md5", "v1", "a.txt", cache_dir=cache, url=url)
+    assert not os.path.exists(dest)
+    assert not os.path.exists(dest + ".partial")
+
+    with pytest.raises(Exception, match="MD5 checksum mismatch"):
+        save_version("test-Py", "md5", "v1", cache_dir=cache, url=url)
+
+    # Verification can be skipped, in which case the file is not stored.
+    out = save_file(
+        "test-Py", "md5", "v1", "a.txt", cache_dir=cache, url=url, check_md5=False
+    )
+    assert open(out, "rb").read() != contents
+    assert not os.path.exists(os.path.join(cache, "objects"))
+
+
+def test_save_version_multipart_download():
+    from gypsum_client import DOWNLOAD_MOD
+
+    old = DOWNLOAD_MOD.copy()
+    DOWNLOAD_MOD["multipart_threshold"] = 10
+    DOWNLOAD_MOD["part_size"] = 8
+
+    try:
+        cache = tempfile.mkdtemp()
+        out = save_version("test-R", "basic", "v1", cache_dir=cache)
+        assert open(os.path.join(out, "blah.txt"), "r").read() == blah_contents
+        assert open(os.path.join(out, "foo", "bar.txt"), "r").read() == foobar_contents
+        assert not os.path.exists(os.path.join(out, "blah.txt.multipart"))
+    finally:
+        DOWNLOAD_MOD.clear()
+        DOWNLOAD_MOD.update(old)
+
+
+def test_save_file_multipart_offline(stand_in):
+    from gypsum_client import DOWNLOAD_MOD
+    from gypsum_client._utils import _save_file
+
+    contents = b"abcdefghijklmnopqrstuvwxyz0123"
+    key = "test-Py/parts/v1/a.txt"
+    url = _stand_in_version(stand_in, "parts", {"a.txt": contents})
+    md5 = hashlib.md5(contents).hexdigest()
+    expected = ["bytes=0-7", "bytes=8-15", "bytes=16-23", "bytes=24-29"]
+
+    old = DOWNLOAD_MOD.copy()
+    DOWNLOAD_MOD["multipart_threshold"] = 10
+    DOWNLOAD_MOD["part_size"] = 8
+    DOWNLOAD_MOD["part_concurrency"] = 2
+
+    try:
+        # Files are downloaded as parallel byte ranges.
+        cache = tempfile.mkdtemp()
+        fetch_manifest("test-Py", "parts", "v1", cache_dir=cache, url=url)
+        out = save_file("test-Py", "parts", "v1", "a.txt", cache_dir=cache, url=url)
+        assert open(out, "rb").read() == contents
+        assert sorted(r for _, r in stand_in.handler.ranges) == sorted(expected)
+        assert not os.path.exists(out + ".multipart")
+        assert not os.path.exists(out + ".multipart.done")
+
+        # Interrupted downloads only fetch the parts missing from the journal.
+        dest = os.path.join(tempfile.mkdtemp(), "a.txt")
+        stand_in.handler.ranges.clear()
+        stand_in.handler.broken_ranges[(key, "bytes=16-23")] = 1
+        with pytest.raises(Exception, match="broken"):
+            _save_file(key, dest, False, url, size=len(contents), md5sum=md5)
+        assert os.path.exists(dest + ".multipart")
+        with open(dest + ".multipart.done", "r") as f:
+            done = [expected[int(x)] for x in f.read().split("\n")[1:] if x]
+        assert "bytes=16-23" not in done
+
+        stand_in.handler.ranges.clear()
+        _save_file(
+            key, dest, False, url, size=len(contents), md5sum=md5, check_md5=True
+        )
+        assert open(dest, "rb").read() == contents
+        assert sorted(r for _, r in stand_in.handler.ranges) == sorted(
+            set(expected) - set(done)
+        )
+        assert not os.path.exists(dest + ".multipart.done")
+
+        # Servers that ignore ranges fall back to a single request.
+        dest = os.path.join(tempfile.mkdtemp(), "a.txt")
+        stand_in.handler.ignore_ranges.add(key)
+        stand_in.handler.fetched.clear()
+        stand_in.handler.ranges.clear()
+        _save_file(
+            key, dest, False, url, size=len(contents), md5sum=md5, check_md5=True
+        )
+        assert open(dest, "rb").read() == contents
+        assert not os.path.exists(dest + ".multipart")
+        assert not os.path.exists(dest + ".partial")
+        assert len(stand_in.handler.fetched) - len(stand_in.handler.ranges) == 1
+    finally:
+        DOWNLOAD_MOD.clear()
+        DOWNLOAD_MOD.update(old)
+
+
+def test_prefetch(stand_in):
+    url = f"http://127.0.0.1:{stand_in.server_address[1]}"
+    objects = stand_in.handler.objects
+    objects["test-Py/prefetch/v1/..manifest"] = json.dumps({}).encode()
+    for name in ["a.txt", "b/c.txt"]:
+        objects[f"test-Py/prefetch/v1/{name}"] = name.encode()
+
+    rows = [
+        {"project": "test-Py", "asset": "prefetch", "version": "v1", "path": p}
+        for p in ["a.txt", "b/c.txt", "a.txt", "missing.txt"]
+    ]
+
+    cache = tempfile.mkdtemp()
+    futures = prefetch(rows, cache_dir=cache, url=url, concurrency=2)
+    assert len(futures) == 4
+    assert futures[0] is futures[2]
+
+    wait(futures, timeout=30)
+    assert open(futures[0].result(), "r").read() == "a.txt"
+    assert open(futures[1].result(), "r").read() == "b/c.txt"
+    assert futures[3].exception() is not None
+    assert stand_in.handler.fetched.count("test-Py/prefetch/v1/a.txt") == 1
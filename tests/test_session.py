@@ -0,0 +1,61 @@
+import threading
+
+from gypsum_client._session import _get_session, _reset_session
+from gypsum_client.config import REQUESTS_MOD
+
+__author__ = "Jayaram Kancherla"
+__copyright__ = "Jayaram Kancherla"
+__license__ = "MIT"
+
+
+def test_session_is_shared():
+    _reset_session()
+    sess = _get_session()
+    assert _get_session() is sess
+
+    other = []
+    thread = threading.Thread(target=lambda: other.append(_get_session()))
+    thread.start()
+    thread.join()
+    assert other[0] is sess
+
+
+def test_session_respects_config():
+    _reset_session()
+    old = REQUESTS_MOD.copy()
+
+    try:
+        sess = _get_session()
+        adapter = sess.get_adapter("https://gypsum.artifactdb.com")
+        assert adapter._pool_maxsize == REQUESTS_MOD["pool_maxsize"]
+        assert "Connection" not in sess.headers or sess.headers["Connection"] != "close"
+
+        REQUESTS_MOD["pool_maxsize"] = 32
+        REQUESTS_MOD["keep_alive"] = False
+        REQUESTS_MOD["verify"] = False
+        sess2 = _get_session()
+        assert sess2 is not sess
+        assert sess2.get_adapter("https://gypsum.artifactdb.com")._pool_maxsize == 32
+        assert sess2.headers["Connection"] == "close"
+        assert sess2.verify is False
+    finally:
+        REQUESTS_MOD.clear()
+        REQUESTS_MOD.update(old)
+        _reset_session()
+
+
+def test_session_tolerates_missing_config():
+    _reset_session()
+    old = REQUESTS_MOD.copy()
+
+    try:
+        REQUESTS_MOD.clear()
+        REQUESTS_MOD["pool_maxsize"] = 16
+        sess = _get_session()
+        assert sess.get_adapter("https://gypsum.artifactdb.com")._pool_maxsize == 16
+        assert sess.verify is True
+        assert _get_session() is sess
+    finally:
+        REQUESTS_MOD.clear()
+        REQUESTS_MOD.update(old)
+        _reset_session()
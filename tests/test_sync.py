@@ -0,0 +1,138 @@
+import hashlib
+import json
+import os
+import tempfile
+
+import gypsum_client.sync_operations as sync_operations
+from gypsum_client import cache_usage, prune_cache, save_version, sync_version
+
+__author__ = "Jayaram Kancherla"
+__copyright__ = "Jayaram Kancherla"
+__license__ = "MIT"
+
+blah_contents = (
+    "A\nB\nC\nD\nE\nF\nG\nH\nI\nJ\nK\nL\nM\nN\nO\nP\nQ\nR\nS\nT\nU\nV\nW\nX\nY\nZ\n"
+)
+foobar_contents = "1 2 3 4 5\n6 7 8 9 10\n"
+
+
+def test_sync_version_works_as_expected():
+    cache = tempfile.mkdtemp()
+    save_version("test-R", "basic", "v1", cache_dir=cache)
+
+    stats = {}
+    out = sync_version(
+        "test-R", "basic", "v2", base_version="v1", cache_dir=cache, stats=stats
+    )
+    assert stats["base_version"] == "v1"
+    assert open(os.path.join(out, "blah.txt"), "r").read() == blah_contents
+    assert open(os.path.join(out, "foo", "bar.txt"), "r").read() == foobar_contents
+    assert os.path.exists(
+        os.path.join(cache, "status", "test-R", "basic", "v2", "COMPLETE")
+    )
+
+
+def test_sync_version_without_base():
+    cache = tempfile.mkdtemp()
+
+    stats = {}
+    out = sync_version("test-R", "basic", "v1", cache_dir=cache, stats=stats)
+    assert stats["base_version"] is None
+    assert stats["reused"] == 0
+    assert open(os.path.join(out, "blah.txt"), "r").read() == blah_contents
+
+    # Re-uses the cached files of another version.
+    stats = {}
+    out = sync_version("test-R", "basic", "v3", cache_dir=cache, stats=stats)
+    assert open(os.path.join(out, "foo", "bar.txt"), "r").read() == foobar_contents
+
+
+def test_sync_version_locks_and_indexes(stand_in, monkeypatch):
+    url = f"http://127.0.0.1:{stand_in.server_address[1]}"
+    objects = stand_in.handler.objects
+    md5 = hashlib.md5(b"aaaaa").hexdigest()
+    objects["test-Py/sync/v1/..manifest"] = json.dumps(
+        {"a.txt": {"size": 5, "md5sum": md5}}
+    ).encode()
+    objects["test-Py/sync/v2/..manifest"] = json.dumps(
+        {
+            "a.txt": {"size": 5, "md5sum": md5},
+            "b.txt": {
+                "size": 5,
+                "md5sum": md5,
+                "link": {
+                    "project": "test-Py",
+                    "asset": "sync",
+                    "version": "v1",
+                    "path": "a.txt",
+                },
+            },
+        }
+    ).encode()
+    objects["test-Py/sync/v1/a.txt"] = b"aaaaa"
+    objects["test-Py/sync/v2/..summary"] = b"{}"
+    objects["test-Py/sync/v2/..links"] = b"{}"
+
+    cache = tempfile.mkdtemp()
+    save_version("test-Py", "sync", "v1", cache_dir=cache, url=url)
+
+    # Pruning while linking from the base version must leave it alone.
+    original = sync_operations._link_or_copy
+    pruned = []
+
+    def _link_and_prune(src, dest):
+        pruned.append(prune_cache(cache, max_bytes=0)["removed"])
+        original(src, dest)
+
+    monkeypatch.setattr(sync_operations, "_link_or_copy", _link_and_prune)
+
+    stats = {}
+    out = sync_version(
+        "test-Py",
+        "sync",
+        "v2",
+        base_version="v1",
+        cache_dir=cache,
+        url=url,
+        relink=False,
+        stats=stats,
+    )
+    assert pruned == [[]]
+    assert stats["reused"] == 1
+    assert open(os.path.join(out, "a.txt"), "rb").read() == b"aaaaa"
+
+    # Internal files are saved, so save_version has nothing left to do.
+    assert os.path.exists(os.path.join(out, "..summary"))
+    assert os.path.exists(os.path.join(out, "..links"))
+
+    # Link entries are not indexed without relinking, as for save_version.
+    assert cache_usage("test-Py", "sync", "v2", cache_dir=cache) == 5
+
+
+def test_sync_version_prunes_the_cache(stand_in):
+    from gypsum_client import CACHE_MOD
+
+    url = f"http://127.0.0.1:{stand_in.server_address[1]}"
+    objects = stand_in.handler.objects
+    md5 = hashlib.md5(b"aaaaa").hexdigest()
+    for asset in ("old", "sync"):
+        objects[f"test-Py/{asset}/v1/..manifest"] = json.dumps(
+            {"a.txt": {"size": 5, "md5sum": md5}}
+        ).encode()
+        objects[f"test-Py/{asset}/v1/..summary"] = b"{}"
+        objects[f"test-Py/{asset}/v1/a.txt"] = b"aaaaa"
+
+    cache = tempfile.mkdtemp()
+    save_version("test-Py", "old", "v1", cache_dir=cache, url=url)
+
+    old = CACHE_MOD.copy()
+    try:
+        CACHE_MOD["max_bytes"] = 0
+        out = sync_version("test-Py", "sync", "v1", cache_dir=cache, url=url)
+    finally:
+        CACHE_MOD.clear()
+        CACHE_MOD.update(old)
+
+    # Only the version that was just synced is kept.
+    assert open(os.path.join(out, "a.txt"), "rb").read() == b"aaaaa"
+    assert not os.path.exists(os.path.join(cache, "bucket", "test-Py", "old", "v1"))
@@ -76,6 +76,53 @@ def test_upload_regular():
     assert all(man[file].get("link") is None for file in man.keys())
 
 
+def test_upload_files_retries(stand_in, monkeypatch):
+    import gypsum_client.upload_file_actions as upload_file_actions
+
+    waits = []
+    monkeypatch.setattr(upload_file_actions.time, "sleep", waits.append)
+
+    url = f"http://127.0.0.1:{stand_in.server_address[1]}"
+    tmp_dir = tempfile.mkdtemp()
+    for name in ["a.txt", "b.txt", "c.txt"]:
+        with open(os.path.join(tmp_dir, name), "w") as f:
+            f.write(name)
+
+    init = start_upload(
+        "test-Py",
+        "retry",
+        "1",
+        files=["a.txt", "b.txt", "c.txt"],
+        directory=tmp_dir,
+        url=url,
+        token="gh",
+        cache_dir=None,
+    )
+
+    # Transient failures are retried with exponential backoff, and all
+    # other files are still attempted if one of them fails for good.
+    stand_in.handler.failures["/put/a.txt"] = 2
+    stand_in.handler.failures["/put/b.txt"] = 10
+
+    report = {}
+    with pytest.raises(Exception, match="1 of 3 files"):
+        upload_files(
+            init, directory=tmp_dir, url=url, concurrent=2, retries=2, report=report
+        )
+
+    assert report["a.txt"]["status"] == "uploaded"
+    assert report["a.txt"]["attempts"] == 3
+    assert report["b.txt"]["status"] == "failed"
+    assert report["b.txt"]["attempts"] == 3
+    assert report["c.txt"] == {"status": "uploaded", "attempts": 1, "error": None}
+    assert stand_in.handler.objects == {"a.txt": b"a.txt", "c.txt": b"c.txt"}
+
+    waits = sorted(waits)
+    assert len(waits) == 4
+    assert all(0.5 <= w < 1 for w in waits[:2])
+    assert all(1 <= w < 1.5 for w in waits[2:])
+
+
 @pytest.mark.skipif(
     "gh_token" not in os.environ, reason="GitHub token not in environment"
 )
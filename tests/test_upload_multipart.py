@@ -0,0 +1,100 @@
+import os
+import tempfile
+import threading
+
+import pytest
+from gypsum_client import UPLOAD_MOD, upload_files
+
+__author__ = "Jayaram Kancherla"
+__copyright__ = "Jayaram Kancherla"
+__license__ = "MIT"
+
+
+def test_upload_files_multipart(stand_in):
+    url = f"http://127.0.0.1:{stand_in.server_address[1]}"
+    tmp_dir = tempfile.mkdtemp()
+
+    contents = {"big.bin": os.urandom(95), "small.txt": b"sumire"}
+    for name, data in contents.items():
+        with open(os.path.join(tmp_dir, name), "wb") as f:
+            f.write(data)
+        stand_in.sizes[name] = len(data)
+
+    # The object store fails the first attempt at one of the parts.
+    stand_in.handler.failures["/part/3/big.bin"] = 1
+
+    init = {
+        "session_token": "tok",
+        "file_urls": [
+            {
+                "path": "big.bin",
+                "method": "multipart",
+                "url": "/upload/multipart-file/big.bin",
+            },
+            {
+                "path": "small.txt",
+                "method": "presigned",
+                "url": "/upload/presigned-file/small.txt",
+            },
+        ],
+    }
+
+    seen = []
+    lock = threading.Lock()
+
+    def progress(path, done, total):
+        with lock:
+            seen.append((path, done, total))
+
+    report = {}
+    old = UPLOAD_MOD.copy()
+    UPLOAD_MOD["part_concurrency"] = 3
+    try:
+        upload_files(
+            init,
+            directory=tmp_dir,
+            url=url,
+            concurrent=2,
+            report=report,
+            progress=progress,
+        )
+    finally:
+        UPLOAD_MOD.clear()
+        UPLOAD_MOD.update(old)
+
+    assert stand_in.handler.objects == contents
+    assert all(x["status"] == "uploaded" for x in report.values())
+
+    big = sorted(x[1] for x in seen if x[0] == "big.bin")
+    assert len(big) == 10
+    assert big[-1] == 95
+    assert ("small.txt", 6, 6) in seen
+
+
+def test_upload_files_multipart_failure(stand_in):
+    url = f"http://127.0.0.1:{stand_in.server_address[1]}"
+    tmp_dir = tempfile.mkdtemp()
+
+    with open(os.path.join(tmp_dir, "big.bin"), "wb") as f:
+        f.write(os.urandom(25))
+    stand_in.sizes["big.bin"] = 25
+
+    stand_in.handler.failures["/part/2/big.bin"] = 100
+
+    init = {
+        "session_token": "tok",
+        "file_urls": [
+            {
+                "path": "big.bin",
+                "method": "multipart",
+                "url": "/upload/multipart-file/big.bin",
+            },
+        ],
+    }
+
+    report = {}
+    with pytest.raises(Exception, match="big.bin"):
+        upload_files(init, directory=tmp_dir, url=url, retries=1, report=report)
+
+    assert report["big.bin"]["status"] == "failed"
+    assert "big.bin" not in stand_in.handler.objects
@@ -0,0 +1,66 @@
+import os
+import tempfile
+
+import pytest
+from gypsum_client import resume_upload, start_upload, upload_files
+
+__author__ = "Jayaram Kancherla"
+__copyright__ = "Jayaram Kancherla"
+__license__ = "MIT"
+
+
+def test_resume_upload(stand_in):
+    url = f"http://127.0.0.1:{stand_in.server_address[1]}"
+    cache = tempfile.mkdtemp()
+    tmp_dir = tempfile.mkdtemp()
+
+    contents = {f"file{i}.txt": f"sumire{i}".encode() for i in range(4)}
+    for name, data in contents.items():
+        with open(os.path.join(tmp_dir, name), "wb") as f:
+            f.write(data)
+
+    init = start_upload(
+        "test-Py",
+        "resume",
+        "1",
+        files=sorted(contents.keys()),
+        directory=tmp_dir,
+        url=url,
+        token="gh",
+        cache_dir=cache,
+        resumable=True,
+    )
+    assert len(os.listdir(os.path.join(cache, "uploads"))) == 1
+
+    # Simulate a worker that was killed after uploading some of the files.
+    partial = dict(init)
+    partial["file_urls"] = init["file_urls"][:2]
+    upload_files(partial, directory=tmp_dir, url=url, cache_dir=cache)
+    stand_in.handler.objects.clear()
+
+    report = {}
+    assert resume_upload("test-Py", "resume", "1", cache_dir=cache, report=report)
+    assert sorted(report.keys()) == ["file2.txt", "file3.txt"]
+    assert stand_in.handler.objects == {
+        "file2.txt": contents["file2.txt"],
+        "file3.txt": contents["file3.txt"],
+    }
+    assert stand_in.handler.completed == [("complete", "test-Py/resume/1")]
+    assert os.listdir(os.path.join(cache, "uploads")) == []
+
+    with pytest.raises(ValueError, match="No unfinished upload session"):
+        resume_upload("test-Py", "resume", "1", cache_dir=cache)
+
+    # Sessions, which include the token, are only recorded on request.
+    other = tempfile.mkdtemp()
+    start_upload(
+        "test-Py",
+        "resume",
+        "2",
+        files=sorted(contents.keys()),
+        directory=tmp_dir,
+        url=url,
+        token="gh",
+        cache_dir=other,
+    )
+    assert not os.path.exists(os.path.join(other, "uploads"))
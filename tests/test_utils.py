@@ -1,4 +1,15 @@
-from gypsum_client._utils import _remove_slash_url
+import hashlib
+import os
+import tempfile
+import threading
+
+import pytest
+
+from filelock import FileLock, Timeout
+from gypsum_client import CACHE_MOD, _locks
+from gypsum_client._hash_cache import _connect, _lookup_hashes, _store_hashes
+from gypsum_client._hashing import _md5_of_file, _md5_of_files
+from gypsum_client._utils import _iter_json_array, _remove_slash_url
 
 __author__ = "Jayaram Kancherla"
 __copyright__ = "Jayaram Kancherla"
@@ -11,3 +22,124 @@ def test_truncating_url():
 
     double_slash = _remove_slash_url("https://jkanche.com//")
     assert double_slash == "https://jkanche.com"
+
+
+def test_md5_of_files():
+    tmp_dir = tempfile.mkdtemp()
+    paths = []
+    for i in range(4):
+        path = os.path.join(tmp_dir, f"file{i}")
+        with open(path, "wb") as f:
+            f.write(os.urandom(100000 * i + 1))
+        paths.append(path)
+
+    expected = [hashlib.md5(open(p, "rb").read()).hexdigest() for p in paths]
+    assert _md5_of_file(paths[0], chunk_size=7) == expected[0]
+    assert _md5_of_files(paths) == expected
+    assert _md5_of_files(paths, concurrent=3) == expected
+
+
+def test_iter_json_array():
+    payload = '[ "a/", "b\\u00e9/", 12345, {"x": [1, 2]} ]'.encode("utf-8")
+    expected = ["a/", "b\u00e9/", 12345, {"x": [1, 2]}]
+
+    # Every split point, including within numbers and escapes.
+    for i in range(len(payload)):
+        chunks = [payload[:i], payload[i:]]
+        assert list(_iter_json_array(chunks)) == expected
+
+    one_byte = [payload[i : i + 1] for i in range(len(payload))]
+    assert list(_iter_json_array(one_byte)) == expected
+
+    assert list(_iter_json_array([b"[]"])) == []
+
+    with pytest.raises(ValueError):
+        list(_iter_json_array([b'["a", "b']))
+
+    with pytest.raises(ValueError):
+        list(_iter_json_array([b'{"a": 1}']))
+
+
+def test_version_lock():
+    cache = tempfile.mkdtemp()
+    lock_path = os.path.join(cache, "status", "test-Py", "locked", "v1.LOCK")
+
+    def held_elsewhere():
+        try:
+            with FileLock(lock_path, timeout=0):
+                return False
+        except Timeout:
+            return True
+
+    entered = threading.Event()
+    leave = threading.Event()
+
+    def other():
+        with _locks._version_lock(cache, "test-Py", "locked", "v1"):
+            entered.set()
+            leave.wait(10)
+
+    thread = threading.Thread(target=other)
+    with _locks._version_lock(cache, "test-Py", "locked", "v1"):
+        assert held_elsewhere()
+
+        # Nested and concurrent callers in this process share the lock.
+        with _locks._version_lock(cache, "test-Py", "locked", "v1"):
+            assert held_elsewhere()
+
+        thread.start()
+        assert entered.wait(10)
+
+    # Released by the last thread to leave.
+    assert held_elsewhere()
+    leave.set()
+    thread.join()
+    assert not held_elsewhere()
+    assert len(_locks._REGISTRY) == 0
+
+    with pytest.raises(ZeroDivisionError):
+        with _locks._version_lock(cache, "test-Py", "locked", "v2"):
+            1 / 0
+    assert len(_locks._REGISTRY) == 0
+
+
+def test_hash_cache():
+    cache = tempfile.mkdtemp()
+
+    def _info(ino, size=10):
+        # Old enough to be cached.
+        return os.stat_result((0, ino, 1, 1, 0, 0, size, 0, 0, 0, 0, 0, 0, 0, 10**9, 0))
+
+    # Lookups are batched, so use more files than fit in one query.
+    infos = [_info(i) for i in range(1000)]
+    _store_hashes(cache, [(info, f"md5-{info.st_ino}") for info in infos])
+    assert _lookup_hashes(cache, infos) == [f"md5-{i}" for i in range(1000)]
+    assert _lookup_hashes(cache, [_info(5, size=11), _info(2000)]) == [None, None]
+
+    # Replacing entries does not change the count.
+    _store_hashes(cache, [(infos[0], "md5-new")])
+    conn = _connect(cache)
+    try:
+        assert conn.execute("SELECT n FROM hash_count").fetchone() == (1000,)
+    finally:
+        conn.close()
+
+    old = CACHE_MOD.copy()
+    CACHE_MOD["hash_cache_max_entries"] = 600
+    try:
+        extra = [_info(i) for i in range(1000, 1100)]
+        _store_hashes(cache, [(info, "md5-extra") for info in extra])
+    finally:
+        CACHE_MOD.clear()
+        CACHE_MOD.update(old)
+
+    conn = _connect(cache)
+    try:
+        assert conn.execute("SELECT n FROM hash_count").fetchone() == (600,)
+        assert conn.execute("SELECT COUNT(*) FROM hashes").fetchone() == (600,)
+    finally:
+        conn.close()
+
+    # The most recently used entries are kept.
+    assert _lookup_hashes(cache, extra) == ["md5-extra"] * 100
+    assert _lookup_hashes(cache, [infos[0]]) == ["md5-new"]